@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Sparse fieldsets: ``?fields=uuid,edv_id`` trims a response to the named fields.
+
+The trim applies twice: the serializer drops the other fields, and the queryset
+loads only the columns (and joins only the tables) the remaining fields read.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAMETER = OpenApiParameter(
+    name="fields",
+    description="Comma-separated list of the fields to return; all fields if omitted.",
+    required=False,
+    type=str,
+)
+
+
+def _columns(model, field):
+    """The ORM paths ``field`` reads on ``model``, or None if they cannot be told.
+
+    Fields that render a related object through its primary key (hyperlinks,
+    pk fields) only need the foreign key column. Nested list serializers read
+    from a prefetch and need no column of their own.
+    """
+    if isinstance(field, serializers.HyperlinkedIdentityField):
+        return [field.lookup_field]
+    if isinstance(field, serializers.ListSerializer):
+        return []
+    if field.source == "*":
+        return None
+
+    path = []
+    for attr in field.source_attrs:
+        try:
+            model_field = model._meta.pk if attr == "pk" else model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        path.append(attr)
+        if model_field.is_relation:
+            model = model_field.related_model
+    return ["__".join(path)]
+
+
+def project(queryset, fields):
+    """``queryset`` reading just what serializer ``fields`` need, if that can be told.
+
+    Each remaining relation is joined with ``select_related`` only as far as a
+    column behind it is read. Falls back to the unchanged queryset when a field
+    reads something other than model fields (a method or property), since
+    deferring columns under it would cost a query per row.
+    """
+    paths = []
+    for field in fields:
+        columns = _columns(queryset.model, field)
+        if columns is None:
+            return queryset
+        paths.extend(columns)
+
+    relations = set()
+    for path in paths:
+        parts = path.split("__")
+        relations.update("__".join(parts[:i]) for i in range(1, len(parts)))
+    return queryset.select_related(None).select_related(*sorted(relations)).only("pk", *paths)
+
+
+class SparseFieldsetMixin:
+    """ViewSet mixin honouring ``?fields=``; unknown names are a 400."""
+
+    def requested_fields(self):
+        if not hasattr(self, "_requested_fields"):
+            raw = self.request.query_params.get("fields", "") if self.request else ""
+            names = [name.strip() for name in raw.split(",") if name.strip()]
+            if names:
+                available = self.get_serializer_class()(context=self.get_serializer_context()).fields
+                unknown = [name for name in names if name not in available]
+                if unknown:
+                    raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}"})
+            self._requested_fields = names
+        return self._requested_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = self.requested_fields()
+        if not names:
+            return queryset
+        fields = self.get_serializer_class()(context=self.get_serializer_context()).fields
+        return project(queryset, [fields[name] for name in names])
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        names = self.requested_fields()
+        if names:
+            target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+            for name in set(target.fields) - set(names):
+                target.fields.pop(name)
+        return serializer
@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over the primary key.
+
+    Each page is an index range scan (``WHERE id > <cursor> ORDER BY id``), so
+    the cost of a page does not grow with how far a client has paged, and rows
+    written while a client pages through cannot shift it onto rows it has
+    already seen. Clients follow ``next`` until it is null.
+    """
+
+    ordering = "pk"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+def oldest_open_transaction(using):
+    """When the oldest transaction still open on database ``using`` started, or None.
+
+    Only PostgreSQL can tell (``pg_stat_activity``, which shows the sessions of
+    the application's own database role). Elsewhere, and when nothing else is
+    open, None.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT min(xact_start) FROM pg_stat_activity"
+            " WHERE datname = current_database() AND backend_type = 'client backend'"
+            " AND pid <> pg_backend_pid() AND xact_start IS NOT NULL"
+        )
+        return cursor.fetchone()[0]
+
+
+class ChangeFeedPagination(BasePagination):
+    """
+    Keyset paging over ``(modified_at, pk)`` for the "changed since" feeds.
+
+    ``?since=`` takes the ``next`` token of the previous response (or, to start
+    from a point in time, an ISO 8601 timestamp; omitted means from the start).
+    Unlike ``KeysetPagination`` the feed never runs out of cursor: ``next`` is
+    always returned -- unchanged when there was nothing new -- and ``more`` says
+    whether to ask again right away or at the next poll.
+
+    A write's ``modified_at`` is taken before its transaction commits, so rows
+    are only released up to a horizon no uncommitted write can fall behind:
+
+    * on PostgreSQL, the start of the oldest transaction still open, so a
+      long-running import holds the feed back until it commits;
+    * elsewhere, ``API_CHANGE_FEED_SETTLE`` seconds ago. A transaction that
+      commits later than that after writing a row is missed by clients whose
+      cursor already passed the row.
+
+    On PostgreSQL the horizon lies ``API_CHANGE_FEED_SETTLE`` seconds before
+    the oldest transaction's start, which covers clock skew between the
+    application servers (``modified_at``) and the database (``xact_start``).
+    """
+
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 5000
+
+    @property
+    def settle(self):
+        return datetime.timedelta(seconds=settings.API_CHANGE_FEED_SETTLE)
+
+    def horizon(self, using):
+        """The newest ``modified_at`` this poll may release; see the class docstring."""
+        horizon = timezone.now()
+        oldest = oldest_open_transaction(using)
+        if oldest is not None:
+            horizon = min(horizon, oldest)
+        return horizon - self.settle
+
+    def paginate_queryset(self, queryset, request, view=None):
+        since = self.decode(request.query_params.get("since"))
+        size = self.get_page_size(request)
+
+        queryset = queryset.filter(modified_at__lte=self.horizon(queryset.db))
+        if since is not None:
+            modified_at, pk = since
+            queryset = queryset.filter(Q(modified_at__gt=modified_at) | Q(modified_at=modified_at, pk__gt=pk))
+        rows = list(queryset.order_by("modified_at", "pk")[: size + 1])
+
+        self.more = len(rows) > size
+        rows = rows[:size]
+        if rows:
+            self.next = self.encode(rows[-1].modified_at, rows[-1].pk)
+        else:
+            self.next = self.encode(*since) if since else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "more": self.more, "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["next", "more", "results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "description": "Pass as ?since= on the next poll."},
+                "more": {"type": "boolean", "description": "More changes are waiting right now."},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": "since",
+                "required": False,
+                "in": "query",
+                "description": "The next token of the previous response, or an ISO 8601 timestamp.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of changes per response (at most {self.max_page_size}).",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    @staticmethod
+    def encode(modified_at, pk):
+        return urlsafe_b64encode(f"{modified_at.isoformat()}|{pk}".encode()).decode()
+
+    @staticmethod
+    def decode(since):
+        """``(modified_at, pk)`` from a ``next`` token or a timestamp; None for no ``since``."""
+        if not since:
+            return None
+        try:
+            timestamp = parse_datetime(since.replace(" ", "+"))  # a "+" arrives unescaped as " "
+            if timestamp is not None:
+                return (timestamp if timezone.is_aware(timestamp) else timezone.make_aware(timestamp)), 0
+            modified_at, pk = urlsafe_b64decode(since.encode()).decode().split("|")
+            return datetime.datetime.fromisoformat(modified_at), int(pk)
+        except ValueError:
+            raise ValidationError({"since": "Neither a change feed token nor an ISO 8601 timestamp."})
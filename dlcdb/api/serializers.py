@@ -4,7 +4,7 @@
 
 from rest_framework import serializers
 
-from ..core.models import Device, Person, LentRecord, Room
+from ..core.models import Device, Person, LentRecord, Record, Room
 
 
 class DeviceSerializer(serializers.HyperlinkedModelSerializer):
@@ -52,6 +52,46 @@ class DeviceSerializer(serializers.HyperlinkedModelSerializer):
         ]
 
 
+class DeviceChangeSerializer(DeviceSerializer):
+    class Meta(DeviceSerializer.Meta):
+        fields = DeviceSerializer.Meta.fields + [
+            "modified_at",
+            "deleted_at",
+        ]
+
+
+class RecordChangeSerializer(serializers.HyperlinkedModelSerializer):
+    device = serializers.HyperlinkedRelatedField(
+        view_name="device-detail",
+        read_only=True,
+        lookup_field="uuid",
+    )
+    room = serializers.StringRelatedField(
+        source="room.number",
+    )
+    person = serializers.HyperlinkedRelatedField(
+        view_name="person-detail",
+        read_only=True,
+    )
+
+    class Meta:
+        model = Record
+        fields = [
+            "pk",
+            "device",
+            "record_type",
+            "is_active",
+            "room",
+            "person",
+            "lent_start_date",
+            "lent_desired_end_date",
+            "lent_end_date",
+            "created_at",
+            "effective_until",
+            "modified_at",
+        ]
+
+
 class LentRecordSerializer(serializers.HyperlinkedModelSerializer):
     device = serializers.HyperlinkedRelatedField(
         view_name="device-detail",
@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""The "changed since" feeds: a poll returns exactly what changed after its token."""
+
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from dlcdb.api import pagination
+from dlcdb.core import lifecycle
+from dlcdb.core.models import Device, Record, Room
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(db):
+    from rest_framework.test import APIClient
+
+    user = get_user_model().objects.create_user(email="api@example.com", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def no_settle(settings):
+    settings.API_CHANGE_FEED_SETTLE = 0
+
+
+def _poll(api_client, feed, since=None, **params):
+    if since:
+        params["since"] = since
+    response = api_client.get(f"/api/v2/changes/{feed}/", params)
+    assert response.status_code == 200
+    return response.data
+
+
+def test_a_first_pull_pages_through_everything_then_rests(api_client, no_settle):
+    devices = [Device.objects.create(edv_id=f"FEED-{i}") for i in range(5)]
+
+    seen, token, more = [], None, True
+    while more:
+        page = _poll(api_client, "devices", token, page_size=2)
+        seen.extend(row["edv_id"] for row in page["results"])
+        token, more = page["next"], page["more"]
+
+    assert seen == [device.edv_id for device in devices]
+    resting = _poll(api_client, "devices", token)
+    assert resting == {"next": token, "more": False, "results": []}
+
+
+def test_a_poll_returns_only_what_changed_since_its_token(api_client, no_settle):
+    unchanged = Device.objects.create(edv_id="FEED-UNCHANGED")
+    changed = Device.objects.create(edv_id="FEED-CHANGED")
+    deleted = Device.objects.create(edv_id="FEED-DELETED")
+    token = _poll(api_client, "devices")["next"]
+
+    changed.series = "Model 2"
+    changed.save()
+    deleted.delete()
+    page = _poll(api_client, "devices", token)
+
+    assert [row["edv_id"] for row in page["results"]] == ["FEED-CHANGED", "FEED-DELETED"]
+    assert page["results"][1]["deleted_at"] is not None
+    assert unchanged.edv_id not in {row["edv_id"] for row in page["results"]}
+
+
+def test_an_append_reports_the_new_and_the_superseded_record(api_client, no_settle, user):
+    room = Room.objects.create(number="FEED-1")
+    device = Device.objects.create(edv_id="FEED-RECORDS")
+    located = lifecycle.transition_locate(device, room=room, user=user)
+    token = _poll(api_client, "records")["next"]
+
+    lost = lifecycle.transition_lose(device, user=user)
+    page = _poll(api_client, "records", token)
+
+    assert [(row["pk"], row["is_active"]) for row in page["results"]] == [(located.pk, False), (lost.pk, True)]
+    assert page["results"][0]["effective_until"] is not None
+    assert page["results"][1]["record_type"] == Record.LOST
+
+
+def test_fresh_writes_are_held_back_until_they_settle(api_client):
+    Device.objects.create(edv_id="FEED-FRESH")
+
+    assert _poll(api_client, "devices")["results"] == []
+
+
+def test_the_settle_time_is_configurable(api_client, settings):
+    Device.objects.create(edv_id="FEED-SETTLING")
+    Device.objects.filter(edv_id="FEED-SETTLING").update(modified_at=timezone.now() - datetime.timedelta(seconds=40))
+
+    settings.API_CHANGE_FEED_SETTLE = 60
+    assert _poll(api_client, "devices")["results"] == []
+    settings.API_CHANGE_FEED_SETTLE = 30
+    assert [row["edv_id"] for row in _poll(api_client, "devices")["results"]] == ["FEED-SETTLING"]
+
+
+def test_an_open_transaction_holds_the_feed_back(api_client, no_settle, monkeypatch):
+    """Whatever it writes will carry a ``modified_at`` after its start."""
+    Device.objects.create(edv_id="FEED-BEFORE")
+    Device.objects.filter(edv_id="FEED-BEFORE").update(modified_at=timezone.now() - datetime.timedelta(hours=2))
+    Device.objects.create(edv_id="FEED-AFTER")
+    Device.objects.filter(edv_id="FEED-AFTER").update(modified_at=timezone.now() - datetime.timedelta(minutes=10))
+    started = timezone.now() - datetime.timedelta(hours=1)
+    monkeypatch.setattr(pagination, "oldest_open_transaction", lambda using: started)
+
+    page = _poll(api_client, "devices")
+
+    assert [row["edv_id"] for row in page["results"]] == ["FEED-BEFORE"]
+
+
+def test_since_accepts_a_timestamp(api_client, no_settle):
+    Device.objects.create(edv_id="FEED-OLD")
+    Device.objects.filter(edv_id="FEED-OLD").update(modified_at=timezone.now() - datetime.timedelta(days=2))
+    Device.objects.create(edv_id="FEED-NEW")
+
+    since = (timezone.now() - datetime.timedelta(days=1)).isoformat()
+    page = _poll(api_client, "devices", since)
+
+    assert [row["edv_id"] for row in page["results"]] == ["FEED-NEW"]
+
+
+def test_a_garbled_token_is_rejected(api_client):
+    response = api_client.get("/api/v2/changes/devices/", {"since": "not-a-token"})
+
+    assert response.status_code == 400
+    assert "since" in response.data
@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""Cursor pagination and ``?fields=`` sparse fieldsets on the list endpoints."""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dlcdb.core.models import Device, InRoomRecord, Room
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(db):
+    from rest_framework.test import APIClient
+
+    user = get_user_model().objects.create_user(email="api@example.com", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def devices(db):
+    room = Room.objects.create(number="PAGE-1", nickname="Paging")
+    devices = [Device.objects.create(edv_id=f"PAGE-{i:02}") for i in range(7)]
+    for device in devices:
+        InRoomRecord.objects.create(device=device, room=room)
+    return devices
+
+
+def test_devices_are_paged_by_cursor_without_gaps_or_repeats(api_client, devices):
+    seen = []
+    url = "/api/v2/devices/?page_size=3"
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert len(response.data["results"]) <= 3
+        seen.extend(row["edv_id"] for row in response.data["results"])
+        url = response.data["next"]
+
+    assert seen == [device.edv_id for device in devices]
+
+
+@pytest.mark.parametrize("endpoint", ["devices", "lent-records", "persons", "rooms"])
+def test_every_list_endpoint_is_paged(api_client, endpoint):
+    response = api_client.get(f"/api/v2/{endpoint}/")
+
+    assert response.status_code == 200
+    assert set(response.data) == {"next", "previous", "results"}
+
+
+def test_fields_trims_the_rows(api_client, devices):
+    response = api_client.get("/api/v2/devices/", {"fields": "uuid,edv_id,room"})
+
+    assert response.status_code == 200
+    assert response.data["results"][0] == {"uuid": str(devices[0].uuid), "edv_id": "PAGE-00", "room": "PAGE-1"}
+
+
+def test_fields_trims_the_query(api_client, devices):
+    with CaptureQueriesContext(connection) as captured:
+        api_client.get("/api/v2/devices/", {"fields": "uuid,edv_id"})
+    (select,) = [query["sql"] for query in captured.captured_queries if '"core_device"."edv_id"' in query["sql"]]
+
+    assert '"core_device"."serial_number"' not in select
+    assert '"core_room"' not in select
+
+
+def test_fields_joins_what_the_remaining_fields_read(api_client, devices):
+    response = api_client.get("/api/v2/devices/", {"fields": "edv_id,room_nickname,record_type"})
+
+    assert response.data["results"][0] == {"edv_id": "PAGE-00", "room_nickname": "Paging", "record_type": "INROOM"}
+
+
+def test_unknown_fields_are_rejected(api_client, devices):
+    response = api_client.get("/api/v2/devices/", {"fields": "uuid,password"})
+
+    assert response.status_code == 400
+    assert "password" in str(response.data["fields"])
+
+
+def test_fields_keeps_hyperlinks_working(api_client, devices):
+    response = api_client.get("/api/v2/devices/", {"fields": "url,lender"})
+
+    row = response.data["results"][0]
+    assert row["url"].endswith(f"/api/v2/devices/{devices[0].uuid}/")
+    assert row["lender"] is None
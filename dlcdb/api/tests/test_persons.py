@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""The person endpoint the UDB polls: lendings included, in a fixed number of queries."""
+
+import datetime
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dlcdb.core.models import Device, InRoomRecord, LentRecord, Manufacturer, Person, Room
+from dlcdb.core.tests.testingutils import establish_state
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def api_client(db):
+    from rest_framework.test import APIClient
+
+    user = get_user_model().objects.create_user(email="api@example.com", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _lend(person, room, manufacturer, edv_id):
+    device = Device.objects.create(edv_id=edv_id, is_lentable=True, manufacturer=manufacturer, series="X1")
+    InRoomRecord.objects.create(device=device, room=room)
+    establish_state(
+        LentRecord,
+        device=device,
+        person=person,
+        room=room,
+        lent_start_date=datetime.date(2026, 1, 1),
+        lent_desired_end_date=datetime.date(2099, 1, 1),
+    )
+
+
+def _queries_for_persons(api_client, count):
+    room = Room.objects.create(number=f"UDB-{count}")
+    manufacturer = Manufacturer.objects.create(name=f"Maker {count}")
+    for i in range(count):
+        person = Person.objects.create(first_name=f"P{count}", last_name=f"Person {i}")
+        for j in range(2):
+            _lend(person, room, manufacturer, f"UDB-{count}-{i}-{j}")
+
+    with CaptureQueriesContext(connection) as captured:
+        response = api_client.get("/api/v2/persons/", {"first_name": f"P{count}"})
+    assert response.status_code == 200
+    assert len(response.data["results"]) == count
+    return len(captured.captured_queries), response.data["results"]
+
+
+def test_persons_endpoint_runs_in_a_fixed_number_of_queries(api_client):
+    few, _ = _queries_for_persons(api_client, 2)
+    many, _ = _queries_for_persons(api_client, 6)
+
+    assert few == many
+
+
+def test_persons_endpoint_describes_each_lending(api_client):
+    _, results = _queries_for_persons(api_client, 1)
+
+    assert sorted(lending["device_desc"] for lending in results[0]["lending"]) == [
+        "EDV-ID: UDB-1-0-0, SAP-ID: -, Manufacturer: Maker 1, Model: X1",
+        "EDV-ID: UDB-1-0-1, SAP-ID: -, Manufacturer: Maker 1, Model: X1",
+    ]
@@ -14,6 +14,8 @@ router.register(r"devices", views.DeviceViewSet)
 router.register(r"lent-records", views.LentRecordViewSet)
 router.register(r"persons", views.PersonViewSet)
 router.register(r"rooms", views.RoomViewSet)
+router.register(r"changes/devices", views.DeviceChangesViewSet, basename="device-change")
+router.register(r"changes/records", views.RecordChangesViewSet, basename="record-change")
 
 urlpatterns = [
     path("", views.api_root, name="api-v2-root"),
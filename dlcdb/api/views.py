@@ -2,7 +2,7 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
-from rest_framework import viewsets
+from rest_framework import mixins, viewsets
 from rest_framework.filters import SearchFilter
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -12,8 +12,10 @@ from django_filters import rest_framework as filters
 
 from django.db.models import Prefetch
 
-from ..core.models import Device, Person, LentRecord, Room
+from ..core.models import Device, Person, LentRecord, Record, Room
 from . import serializers
+from .fieldsets import FIELDS_PARAMETER, SparseFieldsetMixin
+from .pagination import ChangeFeedPagination
 
 
 @extend_schema(exclude=True)
@@ -30,9 +32,10 @@ def api_root(request):
             required=False,
             type=str,
         ),
+        FIELDS_PARAMETER,
     ]
 )
-class DeviceViewSet(viewsets.ReadOnlyModelViewSet):
+class DeviceViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows devices to be viewed.
     """
@@ -64,9 +67,10 @@ class DeviceViewSet(viewsets.ReadOnlyModelViewSet):
             required=False,
             type=str,
         ),
+        FIELDS_PARAMETER,
     ]
 )
-class LentRecordViewSet(viewsets.ReadOnlyModelViewSet):
+class LentRecordViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint that allows active lendings to be viewed.
     """
@@ -80,7 +84,8 @@ class LentRecordViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ["device__series", "device__edv_id", "person__last_name"]
 
 
-class RoomViewSet(viewsets.ReadOnlyModelViewSet):
+@extend_schema(parameters=[FIELDS_PARAMETER])
+class RoomViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for base room data
     """
@@ -90,7 +95,8 @@ class RoomViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = "uuid"
 
 
-class PersonViewSet(viewsets.ReadOnlyModelViewSet):
+@extend_schema(parameters=[FIELDS_PARAMETER])
+class PersonViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to list lended devices for persons. Currently used to
     satisfy requests from the UDB.
@@ -107,7 +113,37 @@ class PersonViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Person.objects.all().prefetch_related(
         Prefetch(
             "record_set",
-            queryset=LentRecord.objects.filter(is_active=True),
+            # ``LendingsSerializer.device_desc`` reads the device and its manufacturer.
+            queryset=LentRecord.objects.filter(is_active=True).select_related("device__manufacturer"),
             to_attr="lent_records",
         ),
     )
+
+
+class DeviceChangesViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoint listing devices created, changed or (soft-)deleted since the
+    ``since`` token, oldest change first. Poll with the ``next`` token of the
+    previous response.
+    """
+
+    queryset = Device.with_softdeleted_objects.select_related(
+        "active_record__person",
+        "active_record__room",
+        "device_type",
+        "manufacturer",
+    )
+    serializer_class = serializers.DeviceChangeSerializer
+    pagination_class = ChangeFeedPagination
+
+
+class RecordChangesViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    API endpoint listing records appended or changed since the ``since`` token,
+    oldest change first. A record is changed when it is superseded (``is_active``
+    and ``effective_until``) or edited in place (a lending moved or returned).
+    """
+
+    queryset = Record.objects.select_related("device", "room")
+    serializer_class = serializers.RecordChangeSerializer
+    pagination_class = ChangeFeedPagination
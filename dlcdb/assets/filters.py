@@ -13,7 +13,7 @@ import django_filters
 from django.db.models import Count, Q
 from django.utils.translation import gettext_lazy as _
 
-from dlcdb.core.models import Device, DeviceType, Inventory, Manufacturer, Record, Room, Supplier
+from dlcdb.core.models import Device, DeviceType, Inventory, Manufacturer, Record, Room, SearchDocument, Supplier
 from dlcdb.core.models.record import DEVICE_DISPOSITION_CHOICES
 
 
@@ -50,7 +50,9 @@ class DeviceFilter(django_filters.FilterSet):
         label=_("Loanable"),
         empty_label=_("Any loanability..."),
     )
+    # Keeps its historical parameter name, which links (rooms/detail.html) use.
     active_record__room = django_filters.ModelChoiceFilter(
+        field_name="current_room",
         queryset=Room.objects.all(),
         label=_("Room"),
         empty_label=_("Any room..."),
@@ -89,8 +91,8 @@ class DeviceFilter(django_filters.FilterSet):
             ("device_type__name", "type"),
             ("manufacturer__name", "manufacturer"),
             ("series", "model"),
-            ("active_record__record_type", "state"),
-            ("active_record__room__number", "room"),
+            ("current_state", "state"),
+            ("current_room__number", "room"),
             ("modified_at", "modified"),
             ("tenant__name", "tenant"),
         ),
@@ -119,26 +121,14 @@ class DeviceFilter(django_filters.FilterSet):
         ]
 
     def search_filter(self, queryset, name, value):
-        return queryset.filter(
-            Q(edv_id__icontains=value)
-            | Q(sap_id__icontains=value)
-            | Q(serial_number__icontains=value)
-            | Q(nick_name__icontains=value)
-            | Q(device_type__name__icontains=value)
-            | Q(manufacturer__name__icontains=value)
-            | Q(series__icontains=value)
-            | Q(order_number__icontains=value)
-            | Q(note__icontains=value)
-            | Q(active_record__person__first_name__icontains=value)
-            | Q(active_record__person__last_name__icontains=value)
-            | Q(active_record__person__email__icontains=value)
-        )
+        # Matches the fields of SEARCH_INDEXES["device"] (core/models/search_document.py).
+        return SearchDocument.objects.search(queryset, "device", value)
 
     def state_filter(self, queryset, name, value):
         if value == STATE_NO_RECORD:
-            return queryset.filter(active_record__isnull=True)
+            return queryset.filter(current_state__isnull=True)
         if value:
-            return queryset.filter(active_record__record_type=value)
+            return queryset.filter(current_state=value)
         return queryset
 
     def lentable_filter(self, queryset, name, value):
@@ -247,19 +237,8 @@ class RecordFilter(django_filters.FilterSet):
         ]
 
     def search_filter(self, queryset, name, value):
-        return queryset.filter(
-            Q(device__edv_id__icontains=value)
-            | Q(device__sap_id__icontains=value)
-            | Q(device__serial_number__icontains=value)
-            | Q(person__first_name__icontains=value)
-            | Q(person__last_name__icontains=value)
-            | Q(person__email__icontains=value)
-            | Q(room__number__icontains=value)
-            # The free-text fields are what make a trail searchable at all
-            # ("why was this scrapped", "where did it go").
-            | Q(note__icontains=value)
-            | Q(removed_info__icontains=value)
-        )
+        # Matches the fields of SEARCH_INDEXES["record"] (core/models/search_document.py).
+        return SearchDocument.objects.search(queryset, "record", value)
 
     def active_filter(self, queryset, name, value):
         return queryset.filter(is_active=value == "true") if value else queryset
@@ -21,12 +21,23 @@ https://docs.pytest.org/en/latest/reference/fixtures.html#conftest-py-sharing-fi
 import pytest
 
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 
 from dlcdb.accounts.models import CustomUser
 from dlcdb.core.models import Device, Room, Inventory
 from dlcdb.tenants.models import Tenant
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty default cache.
+
+    The cache is not rolled back with a test's transaction: entries keyed by
+    primary keys and generations that the next test reuses would leak into it.
+    """
+    cache.clear()
+
+
 @pytest.fixture
 def plain_static(settings):
     """Plain static storage, so rendering tests need no built staticfiles manifest."""
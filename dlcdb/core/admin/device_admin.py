@@ -241,9 +241,17 @@ class DeviceAdmin(TenantScopedAdmin, SoftDeleteModelAdmin, SimpleHistoryAdmin, E
         return (
             super()
             .get_queryset(request)
-            .select_related("active_record", "active_record__room", "device_type", "manufacturer")
+            .select_related(
+                "active_record", "active_record__room", "active_record__person", "device_type", "manufacturer"
+            )
         )
 
+    def get_changelist_instance(self, request):
+        """Decide the offered transitions for the whole page in one go (see ``get_device_actions``)."""
+        changelist = super().get_changelist_instance(request)
+        request.available_transitions = lifecycle.available_for(changelist.result_list, user=request.user)
+        return changelist
+
     def get_view_on_site_url(self, obj=None):
         """
         Returns the URL to view this object on the site.
@@ -289,7 +297,10 @@ class DeviceAdmin(TenantScopedAdmin, SoftDeleteModelAdmin, SimpleHistoryAdmin, E
     @admin.display(description="Actions")
     def get_device_actions(self, obj):
         context = {
-            "state_data": obj.get_state_data(user=self.request.user),
+            "state_data": obj.get_state_data(
+                user=self.request.user,
+                transitions=getattr(self.request, "available_transitions", {}).get(obj.pk),
+            ),
             "size": "sm",
         }
 
@@ -299,7 +310,7 @@ class DeviceAdmin(TenantScopedAdmin, SoftDeleteModelAdmin, SimpleHistoryAdmin, E
     def qrcode_display(self, obj):
         return format_html(
             '<img src="{url}" width="{width}" height="{height}">',
-            url=obj.qrcode.url,
+            url=obj.get_qrcode_url(),
             width=200,
             height=200,
         )
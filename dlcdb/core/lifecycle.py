@@ -37,14 +37,18 @@ imported by ``record.py`` (which imports *it*) without a cycle.
 
 from __future__ import annotations
 
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 
 from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import BooleanField, Case, Q, QuerySet, Value, When
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from simple_history.utils import bulk_update_with_history
 
+from .utils.data_generation import bump_data_generation
 from .utils.helpers import get_denormalized_user
 
 
@@ -283,6 +287,47 @@ def available(device, *, user=None):
     return result
 
 
+def available_for(devices, *, user=None):
+    """``available`` for a page of devices: ``{device.pk: [Transition, ...]}``.
+
+    The same rule as ``available``, evaluated set-wise so a list view does not
+    pay a query per device and transition: each permission is asked of ``user``
+    once, and every ``device_precondition`` in play becomes one ``Case``
+    annotation on a single query over the page. ``devices`` need their
+    ``active_record`` loaded (or at least ``active_record_id`` and a cheap
+    ``active_record``) -- list views select it anyway.
+    """
+    devices = list(devices)
+    candidates = {device.pk: transitions_from(state_of(device)) for device in devices}
+    offered = {t for transitions in candidates.values() for t in transitions}
+    granted = {p for p in {permission_for(t) for t in offered} if user and user.has_perm(p)}
+    conditional = [t for t in offered if t.device_precondition is not None and permission_for(t) in granted]
+
+    met = {}
+    if conditional:
+        Device = apps.get_model("core.Device")
+        annotations = {
+            f"meets_{t.name}": Case(
+                When(t.device_precondition, then=Value(True)), default=Value(False), output_field=BooleanField()
+            )
+            for t in conditional
+        }
+        for row in Device.objects.filter(pk__in=list(candidates)).annotate(**annotations).values("pk", *annotations):
+            for t in conditional:
+                # A precondition across a to-many relation yields a row per match;
+                # any matching row means the device qualifies, as with ``exists()``.
+                met[row["pk"], t.name] = met.get((row["pk"], t.name), False) or row[f"meets_{t.name}"]
+
+    return {
+        pk: [
+            t
+            for t in transitions
+            if permission_for(t) in granted and (t.device_precondition is None or met.get((pk, t.name), False))
+        ]
+        for pk, transitions in candidates.items()
+    }
+
+
 def devices_for(name):
     """Devices for which transition ``name`` is currently possible.
 
@@ -292,9 +337,9 @@ def devices_for(name):
     t = BY_NAME[name]
     Device = apps.get_model("core.Device")
     concrete_sources = [s for s in t.sources if s is not None]
-    qs = Device.objects.filter(active_record__record_type__in=concrete_sources)
+    qs = Device.objects.filter(current_state__in=concrete_sources)
     if None in t.sources:
-        qs = qs | Device.objects.filter(active_record__isnull=True)
+        qs = qs | Device.objects.filter(current_state__isnull=True)
     return qs.filter(t.device_precondition) if t.device_precondition is not None else qs
 
 
@@ -312,15 +357,23 @@ def check(device, name):
     transition = BY_NAME[name]
     current = state_of(device)
     if current not in transition.sources:
-        raise IllegalTransition(
-            _("“%(action)s” is not allowed for a device in state “%(state)s”.")
-            % {"action": transition.label, "state": STATES[current].label if current else _("not yet recorded")}
-        )
+        raise _illegal_source(transition, current)
     if not device_precondition_met(device, transition):
-        raise IllegalTransition(
-            _("“%(action)s” is not allowed for device “%(device)s” in its current configuration.")
-            % {"action": transition.label, "device": device}
-        )
+        raise _unmet_precondition(transition, device)
+
+
+def _illegal_source(transition, current):
+    return IllegalTransition(
+        _("“%(action)s” is not allowed for a device in state “%(state)s”.")
+        % {"action": transition.label, "state": STATES[current].label if current else _("not yet recorded")}
+    )
+
+
+def _unmet_precondition(transition, device):
+    return IllegalTransition(
+        _("“%(action)s” is not allowed for device “%(device)s” in its current configuration.")
+        % {"action": transition.label, "device": device}
+    )
 
 
 def check_state(device, target_state):
@@ -509,3 +562,166 @@ def relocate_lending(record, *, room, user, inventory=None):
     record.user, record.username = actor["user"], actor["username"]
     record.save()
     return record
+
+
+# ── Bulk moves ──────────────────────────────────────────────────────────────
+# ``localise`` costs a handful of queries per device: the append, closing the
+# superseded record, repointing ``Device.active_record`` and the device's history
+# row. Moving a whole floor that way adds up to thousands of round-trips, so
+# ``bulk_localise`` and ``bulk_lose`` write the same result set-wise. They bypass
+# ``Record.save()`` and ``Device.save()``, and therefore repeat in bulk everything
+# those do on an append.
+
+# The transition ``localise`` makes from each state. LENT is missing on purpose:
+# a lent device is moved in place (``relocate_lending``).
+LOCALISE_BY_STATE = {
+    None: "locate",
+    ORDERED: "locate",
+    INROOM: "relocate",
+    LOST: "find",
+    REMOVED: "recover",
+}
+
+
+def _load(devices):
+    """``devices`` as a list, with their active records, read in one query.
+
+    The rows are locked until the end of the transaction, which this must run
+    in: states read and checked here are what the bulk write then supersedes,
+    so no single transition may append to one of these devices in between
+    (``Record.save()`` takes the same lock before it appends).
+    """
+    Device = apps.get_model("core.Device")
+    if not isinstance(devices, QuerySet):
+        devices = Device.objects.filter(pk__in=[device.pk for device in devices])
+    # ``of``: the active record is outer-joined, and PostgreSQL refuses to lock
+    # the nullable side of an outer join.
+    return list(devices.select_related("active_record").select_for_update(of=("self",)))
+
+
+def _check_all(moves):
+    """``check`` for many ``(device, transition)`` pairs: one query per precondition."""
+    Device = apps.get_model("core.Device")
+    by_transition = defaultdict(list)
+    for device, transition in moves:
+        current = state_of(device)
+        if current not in transition.sources:
+            raise _illegal_source(transition, current)
+        by_transition[transition].append(device)
+    for transition, candidates in by_transition.items():
+        if transition.device_precondition is None:
+            continue
+        eligible = set(
+            Device.objects.filter(pk__in=[device.pk for device in candidates])
+            .filter(transition.device_precondition)
+            .values_list("pk", flat=True)
+        )
+        for device in candidates:
+            if device.pk not in eligible:
+                raise _unmet_precondition(transition, device)
+
+
+def _bulk_append(devices, target, *, actor, now, **fields):
+    """Append one ``target`` record with ``fields`` to each of ``devices``.
+
+    Everything ``Record.save()`` and ``Device.save()`` do on an append, set-wise:
+    close the superseded records, insert the new ones, book the rollup deltas,
+    repoint ``Device.active_record`` (with history) and index the new records and
+    the devices for search. Must run inside a transaction.
+    """
+    from .models.device import CURRENT_FIELDS
+    from .models.state_month import append_deltas, month_of
+
+    Device = apps.get_model("core.Device")
+    Record = apps.get_model("core.Record")
+    Proxy = apps.get_model(STATES[target].proxy)
+    DeviceStateMonth = apps.get_model("core.DeviceStateMonth")
+    SearchDocument = apps.get_model("core.SearchDocument")
+
+    previous_states = [state_of(device) for device in devices]
+    Record.objects.filter(device__in=devices, is_active=True).update(
+        is_active=False, effective_until=now, modified_at=now
+    )
+    appended = Proxy.objects.bulk_create(
+        [Proxy(device=device, record_type=target, is_active=True, **fields, **actor) for device in devices]
+    )
+
+    deltas = defaultdict(Counter)
+    for device, state, record in zip(devices, previous_states, appended):
+        deltas[device.tenant_id].update(append_deltas(state, target, month_of(record.created_at)))
+        device.set_current(record)
+        device.modified_at = now
+    for tenant_id, tenant_deltas in deltas.items():
+        DeviceStateMonth.objects.apply(tenant_deltas, tenant_id=tenant_id)
+
+    bulk_update_with_history(
+        devices, Device, ["active_record", *CURRENT_FIELDS, "modified_at"], default_user=actor["user"]
+    )
+    SearchDocument.objects.index(Record, [record.pk for record in appended])
+    SearchDocument.objects.index(Device, [device.pk for device in devices])
+    bump_data_generation()
+    return appended
+
+
+def bulk_localise(devices, *, room, user, inventory=None, note=""):
+    """``localise`` for many devices at once, in a fixed number of queries.
+
+    ``devices`` is a Device queryset or an iterable of devices; their current
+    states are read in one query. Every device must pass the transition
+    ``localise`` would pick for it, otherwise IllegalTransition is raised and
+    nothing is written.
+
+    Returns the written records: a new InRoomRecord per appended device and the
+    moved LentRecord per lent one.
+    """
+    Device = apps.get_model("core.Device")
+    Record = apps.get_model("core.Record")
+
+    actor = _actor(user)
+    now = timezone.now()
+    with transaction.atomic():
+        devices = _load(devices)
+        lent = [device for device in devices if state_of(device) == LENT]
+        appending = [device for device in devices if state_of(device) != LENT]
+        _check_all([(device, BY_NAME[LOCALISE_BY_STATE[state_of(device)]]) for device in appending])
+
+        # Lent devices: the lending continues, only its room changes.
+        moved = [device.active_record for device in lent]
+        changes = {"room": room, "modified_at": now, **actor}
+        if inventory is not None:
+            changes["inventory"] = inventory
+        Record.objects.filter(pk__in=[record.pk for record in moved]).update(**changes)
+        Device.with_softdeleted_objects.filter(pk__in=[device.pk for device in lent]).update(
+            current_room=room, modified_at=now
+        )
+        for record in moved:
+            for field, value in changes.items():
+                setattr(record, field, value)
+        for device in lent:
+            device.current_room, device.modified_at = room, now
+        SearchDocument = apps.get_model("core.SearchDocument")
+        SearchDocument.objects.index(Record, [record.pk for record in moved])
+        # As ``Record.update_current_state_on_device`` does for a single lending.
+        SearchDocument.objects.index(Device, [device.pk for device in lent], ["current_room_id", "modified_at"])
+        bump_data_generation()
+
+        if not appending:
+            return moved
+        appended = _bulk_append(appending, INROOM, actor=actor, now=now, room=room, inventory=inventory, note=note)
+
+    return moved + appended
+
+
+def bulk_lose(devices, *, user, inventory=None, note=""):
+    """``transition_lose`` for many devices at once, in a fixed number of queries.
+
+    Same contract as ``bulk_localise``: all devices pass, or IllegalTransition is
+    raised and nothing is written. Returns the new LostRecords.
+    """
+    with transaction.atomic():
+        devices = _load(devices)
+        _check_all([(device, BY_NAME["lose"]) for device in devices])
+        if not devices:
+            return []
+        # ``LostRecord.save()`` clears the room; ``room`` is simply left unset here.
+        return _bulk_append(devices, LOST, actor=_actor(user), now=timezone.now(), inventory=inventory, note=note)
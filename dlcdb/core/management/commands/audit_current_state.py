@@ -0,0 +1,59 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Check each device's current-state columns against its active record.
+
+``Device.current_state``, ``current_room``, ``current_person`` and
+``current_lent_desired_end_date`` are a copy of the active record that list
+views filter and count on. ``Record.save()`` and the bulk writers keep them in
+step, so a mismatch means something bypassed them -- records edited with
+``QuerySet.update()`` or raw SQL, a restored database dump.
+
+    python manage.py audit_current_state          # report mismatches
+    python manage.py audit_current_state --fix    # ... and repair them
+"""
+
+from django.core.management.base import BaseCommand
+
+from dlcdb.core.models import Device
+from dlcdb.core.models.device import CURRENT_FIELDS
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Report (and optionally repair) devices whose current-state columns disagree with their active record."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", action="store_true", help="Rewrite the mismatching columns from the active record."
+        )
+
+    def handle(self, *args, fix=False, **options):
+        stale = []
+        total = 0
+
+        devices = Device.with_softdeleted_objects.select_related("active_record").order_by("pk")
+        for device in devices.iterator(chunk_size=BATCH_SIZE):
+            total += 1
+            stored = {attname: getattr(device, attname) for attname in Device.current_values(None)}
+            expected = Device.current_values(device.active_record)
+            if stored != expected:
+                differing = ", ".join(
+                    f"{attname} {stored[attname]!r} != {expected[attname]!r}"
+                    for attname in expected
+                    if stored[attname] != expected[attname]
+                )
+                self.stdout.write(f"device {device.pk} ({device}): {differing}")
+                device.set_current(device.active_record)
+                stale.append(device)
+
+        self.stdout.write("")
+        self.stdout.write(f"Scanned {total} devices, {len(stale)} with stale current-state columns.")
+        if not stale:
+            self.stdout.write(self.style.SUCCESS("All current-state columns match the active records."))
+        elif fix:
+            Device.with_softdeleted_objects.bulk_update(stale, CURRENT_FIELDS, batch_size=BATCH_SIZE)
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(stale)} devices."))
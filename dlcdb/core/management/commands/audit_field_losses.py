@@ -38,7 +38,7 @@ from dlcdb.core.models import Device
 # Machine-managed or audit columns: a change here is not a user's data going
 # missing. `qrcode` matters most -- SIMPLE_HISTORY_FILEFIELD_TO_CHARFIELD stores
 # it as a bare filename, which must never be written back into a FileField (and
-# Device.save() regenerates it anyway).
+# the QR code itself is rendered from the uuid anyway).
 EXCLUDED_FIELDS = {
     "id",
     "active_record",
@@ -47,8 +47,7 @@ class Command(BaseCommand):
         print(csv_output_file, type(csv_output_file))
 
         # Get all sap_ids from this running DLCDB instance
-        device_sap_ids = list(Device.objects.values_list("sap_id", flat=True))
-        device_sap_ids = list(filter(None, device_sap_ids))
+        device_sap_ids = set(filter(None, Device.objects.values_list("sap_id", flat=True)))
         # print(device_sap_ids)
 
         with open(csv_input_file_obj, "r") as csvinfile, open(csv_output_file_obj, "w") as csvoutfile:
@@ -0,0 +1,26 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Rebuild the search index behind the free-text search of the device, record,
+lending, person and room lists and the dashboard's global search.
+
+The models' ``save()`` keeps ``SearchDocument`` up to date, so this is only
+needed after something bypassed it -- a queryset ``update()`` of a searched
+field, raw SQL, a restored database dump.
+
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+
+from dlcdb.core.models import SearchDocument
+
+
+class Command(BaseCommand):
+    help = "Rewrite the search documents of every device, record, person and room."
+
+    def handle(self, *args, **options):
+        documents = SearchDocument.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the search index: {documents} documents."))
@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Rebuild the monthly device-state rollup behind the dashboard record timeline.
+
+``Record.save()`` keeps ``DeviceStateMonth`` up to date on every append, so this
+is only needed after something bypassed it -- records written with raw SQL,
+devices hard-deleted, a restored database dump.
+
+    python manage.py rebuild_state_timeline
+"""
+
+from django.core.management.base import BaseCommand
+
+from dlcdb.core.models import DeviceStateMonth
+
+
+class Command(BaseCommand):
+    help = "Recompute the dashboard's monthly device-state rollup from the full record history."
+
+    def handle(self, *args, **options):
+        rows = DeviceStateMonth.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the device state timeline: {rows} rows."))
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.8 on 2026-10-18 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0075_device_url_historicaldevice_url'),
+        ('tenants', '0004_tenant_contact_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceStateMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.', verbose_name='Month')),
+                ('record_type', models.CharField(choices=[('ORDERED', 'Ordered'), ('INROOM', 'In room'), ('LENT', 'Lent'), ('LOST', 'Not locatable'), ('REMOVED', 'Removed')], max_length=20, verbose_name='Record type')),
+                ('delta', models.IntegerField(default=0)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='tenants.tenant')),
+            ],
+            options={
+                'verbose_name': 'Device state per month',
+                'verbose_name_plural': 'Device states per month',
+                'indexes': [models.Index(fields=['tenant', 'month'], name='core_device_tenant__4eb485_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tenant', 'month', 'record_type'), name='core_devicestatemonth_unique_tenant_month_type')],
+            },
+        ),
+    ]
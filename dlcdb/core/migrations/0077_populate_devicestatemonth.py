@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""Fill the dashboard's monthly device-state rollup from the existing records.
+
+From here on ``Record.save()`` books every append itself. The walk below must
+match ``chain_deltas`` in ``dlcdb/core/models/state_month.py``; it is inlined
+because a migration must not depend on the current model code.
+"""
+
+import datetime
+from collections import Counter
+
+from django.db import migrations
+
+SPANNING_STATES = ("INROOM", "LENT", "LOST")
+REMOVED = "REMOVED"
+
+
+def _month_of(timestamp):
+    timestamp = timestamp.astimezone(datetime.timezone.utc)
+    return datetime.date(timestamp.year, timestamp.month, 1)
+
+
+def forwards(apps, schema_editor):
+    Record = apps.get_model("core", "Record")
+    DeviceStateMonth = apps.get_model("core", "DeviceStateMonth")
+
+    totals = Counter()
+    current_device = None
+    previous = None
+    removed_months = set()
+
+    records = Record.objects.order_by("device_id", "created_at", "pk").values_list(
+        "device_id", "device__tenant_id", "record_type", "created_at"
+    )
+    for device_id, tenant_id, record_type, created_at in records.iterator(chunk_size=5000):
+        if device_id != current_device:
+            current_device, previous, removed_months = device_id, None, set()
+        month = _month_of(created_at)
+        if previous in SPANNING_STATES:
+            totals[(tenant_id, month, previous)] -= 1
+        if record_type in SPANNING_STATES:
+            totals[(tenant_id, month, record_type)] += 1
+        elif record_type == REMOVED and month not in removed_months:
+            removed_months.add(month)
+            totals[(tenant_id, month, record_type)] += 1
+        previous = record_type
+
+    DeviceStateMonth.objects.bulk_create(
+        [
+            DeviceStateMonth(tenant_id=tenant_id, month=month, record_type=record_type, delta=delta)
+            for (tenant_id, month, record_type), delta in totals.items()
+            if delta
+        ],
+        batch_size=1000,
+    )
+
+
+def backwards(apps, schema_editor):
+    apps.get_model("core", "DeviceStateMonth").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0076_devicestatemonth"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
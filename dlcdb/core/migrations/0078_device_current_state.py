@@ -0,0 +1,62 @@
+# Generated by Django 6.0.8 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0077_populate_devicestatemonth'),
+        ('dataexchange', '0006_alter_udbsyncconfiguration_options_and_more'),
+        ('tenants', '0004_tenant_contact_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='current_lent_desired_end_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Desired return date'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='current_person',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.person', verbose_name='Current borrower'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='current_room',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.room', verbose_name='Current room'),
+        ),
+        migrations.AddField(
+            model_name='device',
+            name='current_state',
+            field=models.CharField(blank=True, choices=[('ORDERED', 'Ordered'), ('INROOM', 'In room'), ('LENT', 'Lent'), ('LOST', 'Not locatable'), ('REMOVED', 'Removed')], editable=False, max_length=20, null=True, verbose_name='Current state'),
+        ),
+        migrations.AddField(
+            model_name='historicaldevice',
+            name='current_lent_desired_end_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Desired return date'),
+        ),
+        migrations.AddField(
+            model_name='historicaldevice',
+            name='current_person',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.person', verbose_name='Current borrower'),
+        ),
+        migrations.AddField(
+            model_name='historicaldevice',
+            name='current_room',
+            field=models.ForeignKey(blank=True, db_constraint=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.room', verbose_name='Current room'),
+        ),
+        migrations.AddField(
+            model_name='historicaldevice',
+            name='current_state',
+            field=models.CharField(blank=True, choices=[('ORDERED', 'Ordered'), ('INROOM', 'In room'), ('LENT', 'Lent'), ('LOST', 'Not locatable'), ('REMOVED', 'Removed')], editable=False, max_length=20, null=True, verbose_name='Current state'),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['tenant', 'current_state'], name='core_device_tenant__6e7924_idx'),
+        ),
+    ]
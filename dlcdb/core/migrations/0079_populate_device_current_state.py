@@ -0,0 +1,37 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""Copy each device's active record into its new current-state columns.
+
+From here on ``Record.save()`` and the bulk writers keep them in step (see
+``Device.set_current``).
+"""
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def forwards(apps, schema_editor):
+    Device = apps.get_model("core", "Device")
+    Record = apps.get_model("core", "Record")
+
+    def active(field):
+        return Subquery(Record.objects.filter(pk=OuterRef("active_record_id")).values(field)[:1])
+
+    Device.objects.update(
+        current_state=active("record_type"),
+        current_room=active("room_id"),
+        current_person=active("person_id"),
+        current_lent_desired_end_date=active("lent_desired_end_date"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0078_device_current_state"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
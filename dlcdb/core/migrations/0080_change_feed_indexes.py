@@ -0,0 +1,25 @@
+# Generated by Django 6.0.8 on 2026-10-18 17:19
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0079_populate_device_current_state'),
+        ('dataexchange', '0006_alter_udbsyncconfiguration_options_and_more'),
+        ('tenants', '0004_tenant_contact_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['modified_at', 'id'], name='core_device_modifie_162142_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='record',
+            index=models.Index(fields=['modified_at', 'id'], name='core_record_modifie_ef0a1c_idx'),
+        ),
+    ]
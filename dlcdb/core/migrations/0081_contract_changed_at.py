@@ -0,0 +1,31 @@
+# Generated by Django 6.0.8 on 2026-10-18 17:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0080_change_feed_indexes'),
+        ('dataexchange', '0006_alter_udbsyncconfiguration_options_and_more'),
+        ('tenants', '0004_tenant_contact_email'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='contract_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicaldevice',
+            name='contract_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='device',
+            index=models.Index(fields=['contract_changed_at'], name='core_device_contrac_f95450_idx'),
+        ),
+    ]
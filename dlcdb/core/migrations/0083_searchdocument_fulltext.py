@@ -0,0 +1,165 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""Index ``SearchDocument.text`` for substring search and fill it from the existing objects.
+
+SQLite gets an FTS5 table with the trigram tokenizer mirroring the documents,
+kept in step by triggers; PostgreSQL a ``pg_trgm`` GIN index on ``UPPER(text)``,
+the expression its ``icontains`` filters on. Where neither is available
+(SQLite without FTS5 or older than 3.34, no permission to create the extension)
+nothing is created and searches scan the documents instead.
+
+The field lists and conditions must match ``SEARCH_INDEXES`` in
+``dlcdb/core/models/search_document.py``; they are inlined because a migration
+must not depend on the current model code. From here on the models' ``save()``
+keeps the documents up to date.
+"""
+
+import itertools
+
+from django.db import DatabaseError, migrations, transaction
+
+FULLTEXT_TABLE = "core_searchdocument_fts"
+
+SQLITE_FORWARDS = [
+    f"CREATE VIRTUAL TABLE {FULLTEXT_TABLE} USING fts5("
+    "text, content='core_searchdocument', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {FULLTEXT_TABLE}_insert AFTER INSERT ON core_searchdocument BEGIN "
+    f"INSERT INTO {FULLTEXT_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    f"CREATE TRIGGER {FULLTEXT_TABLE}_delete AFTER DELETE ON core_searchdocument BEGIN "
+    f"INSERT INTO {FULLTEXT_TABLE}({FULLTEXT_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); END",
+    f"CREATE TRIGGER {FULLTEXT_TABLE}_update AFTER UPDATE ON core_searchdocument BEGIN "
+    f"INSERT INTO {FULLTEXT_TABLE}({FULLTEXT_TABLE}, rowid, text) VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FULLTEXT_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+]
+SQLITE_BACKWARDS = [
+    f"DROP TRIGGER IF EXISTS {FULLTEXT_TABLE}_insert",
+    f"DROP TRIGGER IF EXISTS {FULLTEXT_TABLE}_delete",
+    f"DROP TRIGGER IF EXISTS {FULLTEXT_TABLE}_update",
+    f"DROP TABLE IF EXISTS {FULLTEXT_TABLE}",
+]
+
+POSTGRESQL_INDEX = "core_searchdocument_text_trgm"
+
+BATCH_SIZE = 1000
+
+SEARCH_INDEXES = {
+    "device": (
+        "Device",
+        (
+            "edv_id",
+            "sap_id",
+            "serial_number",
+            "nick_name",
+            "device_type__name",
+            "manufacturer__name",
+            "series",
+            "order_number",
+            "note",
+            "current_person__first_name",
+            "current_person__last_name",
+            "current_person__email",
+        ),
+    ),
+    "record": (
+        "Record",
+        (
+            "device__edv_id",
+            "device__sap_id",
+            "device__serial_number",
+            "person__first_name",
+            "person__last_name",
+            "person__email",
+            "room__number",
+            "note",
+            "removed_info",
+        ),
+    ),
+    "lending": (
+        "Record",
+        (
+            "device__edv_id",
+            "device__sap_id",
+            "device__manufacturer__name",
+            "device__series",
+            "person__first_name",
+            "person__last_name",
+            "person__email",
+            "lent_note",
+            "lent_accessories",
+        ),
+    ),
+    "person": (
+        "Person",
+        (
+            "last_name",
+            "first_name",
+            "email",
+            "udb_person_last_name",
+            "udb_person_first_name",
+            "udb_person_email_internal_business",
+        ),
+    ),
+    "room": ("Room", ("number", "nickname", "description", "note")),
+}
+
+# The objects that get a document, where not all of them do.
+SEARCH_CONDITIONS = {
+    "lending": {"record_type": "LENT"},
+}
+
+
+def documents(apps):
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    for kind, (model_name, fields) in SEARCH_INDEXES.items():
+        condition = SEARCH_CONDITIONS.get(kind, {})
+        rows = apps.get_model("core", model_name)._base_manager.filter(**condition).values_list("pk", *fields)
+        for pk, *values in rows.iterator(chunk_size=5000):
+            text = "\n".join(str(value) for value in values if value)
+            yield SearchDocument(kind=kind, object_id=pk, text=text)
+
+
+def create_fulltext(schema_editor):
+    vendor = schema_editor.connection.vendor
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            if vendor == "sqlite":
+                for statement in SQLITE_FORWARDS:
+                    schema_editor.execute(statement)
+            elif vendor == "postgresql":
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                schema_editor.execute(
+                    f"CREATE INDEX {POSTGRESQL_INDEX} ON core_searchdocument USING gin (UPPER(text) gin_trgm_ops)"
+                )
+    except DatabaseError:
+        pass
+
+
+def forwards(apps, schema_editor):
+    create_fulltext(schema_editor)
+
+    SearchDocument = apps.get_model("core", "SearchDocument")
+    # Streamed, like SearchDocument.objects.rebuild(): never more than a
+    # batch of documents in memory.
+    for batch in itertools.batched(documents(apps), BATCH_SIZE):
+        SearchDocument.objects.bulk_create(batch)
+
+
+def backwards(apps, schema_editor):
+    apps.get_model("core", "SearchDocument").objects.all().delete()
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_BACKWARDS:
+            schema_editor.execute(statement)
+    elif schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {POSTGRESQL_INDEX}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0082_searchdocument"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
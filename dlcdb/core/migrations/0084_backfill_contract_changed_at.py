@@ -0,0 +1,32 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""Stamp ``contract_changed_at`` on the devices that had a contract date before it existed.
+
+The license notification task reschedules the subscriptions of devices stamped
+after its high-water mark, and on its first run (no mark yet) those of every
+stamped device. Without a stamp the existing contract dates would never be
+picked up, nor the pending messages built from them before the upgrade. The
+device's ``modified_at`` stands in for the unknown time of the change.
+"""
+
+from django.db import migrations
+from django.db.models import F
+
+
+def forwards(apps, schema_editor):
+    Device = apps.get_model("core", "Device")
+    Device._base_manager.filter(contract_expiration_date__isnull=False, contract_changed_at__isnull=True).update(
+        contract_changed_at=F("modified_at")
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0083_searchdocument_fulltext"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
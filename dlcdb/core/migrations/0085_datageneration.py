@@ -0,0 +1,24 @@
+# Generated by Django 6.0.8 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0084_backfill_contract_changed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataGeneration',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Data generation',
+                'verbose_name_plural': 'Data generation',
+            },
+        ),
+    ]
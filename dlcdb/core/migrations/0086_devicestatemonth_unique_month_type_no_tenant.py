@@ -0,0 +1,37 @@
+# Generated by Django 6.0.8 on 2026-10-18 21:05
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_rows(apps, schema_editor):
+    """Fold rows without a tenant that share month and state into one; their deltas add up."""
+    DeviceStateMonth = apps.get_model("core", "DeviceStateMonth")
+    duplicates = (
+        DeviceStateMonth.objects.filter(tenant__isnull=True)
+        .values("month", "record_type")
+        .annotate(rows=Count("pk"), total=Sum("delta"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        rows = DeviceStateMonth.objects.filter(
+            tenant__isnull=True, month=duplicate["month"], record_type=duplicate["record_type"]
+        ).order_by("pk")
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+        DeviceStateMonth.objects.filter(pk=keep.pk).update(delta=duplicate["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0085_datageneration'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='devicestatemonth',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', True)), fields=('month', 'record_type'), name='core_devicestatemonth_unique_month_type_no_tenant'),
+        ),
+    ]
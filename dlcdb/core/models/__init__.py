@@ -8,6 +8,9 @@ from .inventory import Inventory  # noqa
 from .note import Note  # noqa
 from .person import Person, OrganizationalUnit  # noqa
 from .record import Record  # noqa
+from .state_month import DeviceStateMonth  # noqa
+from .data_generation import DataGeneration  # noqa
+from .search_document import SearchDocument  # noqa
 from .room import Room  # noqa
 from .supplier import Supplier  # noqa
 from .misc import Attachment, Link  # noqa
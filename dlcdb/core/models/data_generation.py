@@ -0,0 +1,23 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+from django.db import models
+
+
+class DataGeneration(models.Model):
+    """
+    Generation counters, one row each; the first counts the committed device
+    and record writes, see ``dlcdb.core.utils.data_generation``. Kept in the
+    database rather than in the cache so that every process reads the same
+    value, whichever cache backend is configured.
+    """
+
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Data generation"
+        verbose_name_plural = "Data generation"
+
+    def __str__(self):
+        return str(self.value)
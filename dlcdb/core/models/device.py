@@ -17,15 +17,23 @@ from django.contrib.sites.models import Site
 
 from simple_history.models import HistoricalRecords
 
-from dlcdb.inventory.utils import uuid2qrcode
 from dlcdb.tenants.models import TenantAwareModel
 
+from .. import lifecycle
+from ..utils.data_generation import bump_data_generation
 from ..utils.device_methods import get_device_state_data
 from ..storage import OverwriteStorage
 from .abstracts import SoftDeleteAuditBaseModel
+from .search_document import SearchIndexedModel
+from .state_month import DeviceStateMonth
 from .supplier import Supplier
 
 
+# The denormalized copy of the active record (see ``Device.set_current``). Bulk
+# writers list them in ``update_fields`` next to ``active_record``.
+CURRENT_FIELDS = ("current_state", "current_room", "current_person", "current_lent_desired_end_date")
+
+
 class DeviceManager(models.Manager):
     def get_queryset(self):
         base_qs = super().get_queryset()
@@ -66,7 +74,7 @@ class DeviceManager(models.Manager):
         return annotated_qs
 
 
-class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
+class Device(TenantAwareModel, SoftDeleteAuditBaseModel, SearchIndexedModel):
     objects = DeviceManager()
 
     active_record = models.OneToOneField(
@@ -77,6 +85,42 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
         null=True,
         db_index=True,
     )
+    # A copy of what list views need from ``active_record``, so they can filter
+    # and count on this table alone. Written with ``active_record`` by
+    # ``Record.save()`` and the bulk writers (see ``set_current``); checked by
+    # ``manage.py audit_current_state``.
+    current_state = models.CharField(
+        max_length=20,
+        choices=lifecycle.RECORD_TYPE_LIST,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Current state"),
+    )
+    current_room = models.ForeignKey(
+        "core.Room",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Current room"),
+    )
+    current_person = models.ForeignKey(
+        "core.Person",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Current borrower"),
+    )
+    current_lent_desired_end_date = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Desired return date"),
+    )
     uuid = models.UUIDField(
         default=uuid.uuid4,
         editable=False,
@@ -151,6 +195,9 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
     contract_expiration_date = models.DateField(
         null=True, blank=True, verbose_name=_("Expiry date licence or maintenance contract")
     )
+    # Stamped by save() whenever contract_expiration_date changes, so the
+    # notification task only reschedules subscriptions of changed licenses.
+    contract_changed_at = models.DateTimeField(null=True, blank=True, editable=False)
     contract_termination_date = models.DateField(
         null=True,
         blank=True,
@@ -202,6 +249,8 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
         verbose_name="Importiert via",
         on_delete=models.SET_NULL,
     )
+    # No longer written: the QR code is rendered on request from the uuid
+    # (``get_qrcode_url``). Kept for the files earlier versions stored.
     qrcode = models.FileField(
         upload_to=f"{settings.QRCODE_DIR}/",
         blank=True,
@@ -232,6 +281,10 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
         ordering = ["-modified_at", "edv_id"]
         indexes = [
             models.Index(fields=["edv_id", "sap_id", "modified_at"]),
+            models.Index(fields=["tenant", "current_state"]),
+            # The API change feed pages on (modified_at, id).
+            models.Index(fields=["modified_at", "id"]),
+            models.Index(fields=["contract_changed_at"]),
         ]
 
     def __repr__(self):
@@ -240,12 +293,69 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
     def __str__(self):
         return self.edv_id or self.sap_id or str(self.uuid)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored tenant and contract expiration date, so save()
+        # can tell when they change. Left unset if the field was deferred.
+        if "tenant_id" in instance.__dict__:
+            instance._stored_tenant_id = instance.tenant_id
+        if "contract_expiration_date" in instance.__dict__:
+            instance._stored_contract_expiration_date = instance.contract_expiration_date
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.qrcode:
-            qrcode = uuid2qrcode(self.uuid, infix=settings.QRCODE_INFIXES.get("device"))
-            self.qrcode.save(qrcode.filename, qrcode.fileobj, save=False)
+        update_fields = kwargs.get("update_fields")
+        saves_tenant = update_fields is None or "tenant" in update_fields
+        stored_tenant_id = self.__dict__.get("_stored_tenant_id", self.tenant_id)
+
+        saves_contract = update_fields is None or "contract_expiration_date" in update_fields
+        stored_date = self.__dict__.get("_stored_contract_expiration_date", self.contract_expiration_date)
+        if saves_contract and stored_date != self.contract_expiration_date:
+            self.contract_changed_at = timezone.now()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "contract_changed_at"}
+
         super().save(*args, **kwargs)
 
+        if saves_contract:
+            self._stored_contract_expiration_date = self.contract_expiration_date
+
+        if saves_tenant:
+            if stored_tenant_id != self.tenant_id:
+                # The dashboard timeline is tenant-scoped: carry the device's history along.
+                DeviceStateMonth.objects.move_device(
+                    self.pk, from_tenant_id=stored_tenant_id, to_tenant_id=self.tenant_id
+                )
+            self._stored_tenant_id = self.tenant_id
+        bump_data_generation()
+
+    @staticmethod
+    def current_values(record):
+        """The ``CURRENT_FIELDS`` values, by attname, of a device whose active record is ``record``."""
+        if record is None:
+            return {
+                "current_state": None,
+                "current_room_id": None,
+                "current_person_id": None,
+                "current_lent_desired_end_date": None,
+            }
+        return {
+            "current_state": record.record_type,
+            "current_room_id": record.room_id,
+            "current_person_id": record.person_id,
+            "current_lent_desired_end_date": record.lent_desired_end_date,
+        }
+
+    def set_current(self, record):
+        """Point ``active_record`` at ``record`` and copy its current-state columns (unsaved)."""
+        self.active_record = record
+        for attname, value in self.current_values(record).items():
+            setattr(self, attname, value)
+
+    def get_qrcode_url(self, kind="svg"):
+        return reverse("inventory:qrcode", kwargs={"obj_type": "device", "obj_uuid": self.uuid, "kind": kind})
+
     @property
     def get_human_repr(self):
         return f"EDV-ID: {self.edv_id or '-'}, SAP-ID: {self.sap_id or '-'}, Manufacturer: {self.manufacturer or '-'}, Model: {self.series or '-'}"
@@ -441,5 +551,5 @@ class Device(TenantAwareModel, SoftDeleteAuditBaseModel):
             return f"https://{Site.objects.get_current().domain}{self.get_absolute_url()}"
         return None
 
-    def get_state_data(self, *, user=None, app_name=None):
-        return get_device_state_data(self, user=user, app_name=app_name)
+    def get_state_data(self, *, user=None, app_name=None, transitions=None):
+        return get_device_state_data(self, user=user, app_name=app_name, transitions=transitions)
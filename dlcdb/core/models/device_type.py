@@ -6,9 +6,10 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 
 from .abstracts import SoftDeleteAuditBaseModel
+from .search_document import SearchIndexedModel
 
 
-class DeviceType(SoftDeleteAuditBaseModel):
+class DeviceType(SoftDeleteAuditBaseModel, SearchIndexedModel):
     DEFAULT_ICON = "bi-pc-display"
 
     name = models.CharField(
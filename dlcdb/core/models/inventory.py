@@ -3,14 +3,18 @@
 # SPDX-License-Identifier: EUPL-1.2
 
 import json
-from collections import namedtuple
+import logging
+import time
+from collections import defaultdict, namedtuple
+from uuid import UUID
 
 from django.db import models, transaction
 from django.db.models import Count, Q, OuterRef, Subquery, Exists
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
-from dlcdb.inventory.utils import update_inventory_note
+from dlcdb.inventory.utils import update_inventory_notes
 
 from .. import lifecycle
 from .room import Room
@@ -19,6 +23,12 @@ from .note import Note
 from .record import Record
 
 
+logger = logging.getLogger(__name__)
+
+# The per-device states the inventory UI posts.
+INVENTORY_STATES = ("dev_state_found", "dev_state_notfound", "dev_state_unknown")
+
+
 def _found_inventory_note(active_record):
     """The audit note stamped on the new INROOM record when a device is found,
     describing where it came back from."""
@@ -93,11 +103,7 @@ class InventoryQuerySet(models.QuerySet):
 
         devices_qs = (
             self._devices_qs()
-            .filter(
-                active_record__is_active=True,
-                active_record__room__pk=room_pk,
-                active_record__device__deleted_at__isnull=True,
-            )
+            .filter(current_room=room_pk, deleted_at__isnull=True)
             .annotate(has_inventory_note=Exists(self._current_inventory_device_note()))
             .annotate(already_inventorized=Exists(self._current_inventory_records()))
         )
@@ -119,7 +125,7 @@ class InventoryQuerySet(models.QuerySet):
             qs = Inventory.objects.tenant_unaware_device_objects()
 
         return (
-            qs.exclude(active_record__record_type=Record.REMOVED)
+            qs.exclude(current_state=Record.REMOVED)
             .exclude(sap_id__isnull=True)
             .exclude(sap_id__exact="")
             .annotate(already_inventorized=Exists(self._current_inventory_records()))
@@ -205,7 +211,7 @@ class InventoryQuerySet(models.QuerySet):
         devices = (
             Device.objects
             # Testing if device has a sap_id and is currently lented
-            .exclude(Q(sap_id__isnull=True) | Q(sap_id__exact="") | Q(active_record__person__isnull=True))
+            .exclude(Q(sap_id__isnull=True) | Q(sap_id__exact="") | Q(current_person__isnull=True))
             .annotate(already_inventorized=Exists(self._current_inventory_records()))
             # Testing if device is currently not already inventorized
             .exclude(_exclude_expr)
@@ -217,7 +223,7 @@ class InventoryQuerySet(models.QuerySet):
                     .values("text")
                 )
             )
-            .order_by("active_record__person__email")
+            .order_by("current_person__email")
         )
         return devices
 
@@ -320,9 +326,14 @@ class Inventory(models.Model):
         Main inventorization method: Expects a list of device uuids,
         an inventory status for each uuid and a room and sets an
         appropriate inventory record.
+
+        Works set-wise: all devices are fetched in one query, grouped by the
+        move they need and each group is written with one ``lifecycle.bulk_*``
+        call, so a room costs a fixed number of queries however many devices
+        it holds. Any illegal move rolls back the whole room.
         """
 
-        # print(f"inventorize_uuids_for_room {uuids=}, {room_pk=}, {user=}")
+        started = time.perf_counter()
 
         try:
             room = Room.objects.get(pk=room_pk)
@@ -337,24 +348,44 @@ class Inventory(models.Model):
             raise ObjectDoesNotExist("No room is flagged with 'is_external'. Please contact your it staff.")
 
         current_inventory = Inventory.objects.active_inventory()
-        uuids_states_dict = json.loads(uuids)
+        # Keyed by the canonical form of each uuid, as the devices are below:
+        # a uuid may be submitted upper-case or without hyphens.
+        try:
+            uuids_states_dict = {str(UUID(uuid)): state for uuid, state in json.loads(uuids).items()}
+        except ValueError as invalid_uuid:
+            raise ObjectDoesNotExist(f"No device for uuid! {invalid_uuid}")
 
         for uuid, state in uuids_states_dict.items():
-            try:
-                device = Device.objects.get(uuid=uuid)
-            except Device.DoesNotExist as does_not_exist:
-                raise ObjectDoesNotExist(f"No device for uuid {uuid}! {does_not_exist}")
+            if state not in INVENTORY_STATES:
+                raise RuntimeError(f"This should never happen: given state `{state}` not recognized! Raising 500.")
+
+        devices = {
+            str(device.uuid): device
+            for device in Device.objects.filter(uuid__in=uuids_states_dict).select_related(
+                "active_record", "active_record__room"
+            )
+        }
+        for uuid in uuids_states_dict:
+            if uuid not in devices:
+                raise ObjectDoesNotExist(f"No device for uuid {uuid}!")
+
+        # found: localised here with an inventory stamp, grouped by their audit note
+        found = defaultdict(list)
+        # notfound: lent devices move to the external room, the rest is lost
+        lent_elsewhere, lost = [], []
+        # unknown: localised here without an inventory stamp
+        unknown = []
 
+        for uuid, state in uuids_states_dict.items():
+            device = devices[uuid]
             active_record = device.active_record
 
             if state == "dev_state_found":
                 # The device is here now: localise it in this room and stamp the
-                # inventory. lifecycle.localise picks the right transition for the
-                # device's current state (relocate / find / recover / locate), so
-                # a found LOST/REMOVED device is brought back to INROOM and its
-                # stale removal fields are cleared by the proxy's save().
-                note = _found_inventory_note(active_record)
-                lifecycle.localise(device, room=room, user=user, inventory=current_inventory, note=note)
+                # inventory. lifecycle.bulk_localise picks the right transition for
+                # each device's current state (relocate / find / recover / locate),
+                # so a found LOST/REMOVED device is brought back to INROOM.
+                found[_found_inventory_note(active_record)].append(device)
 
             elif state == "dev_state_notfound":
                 # A lent device missing from its room is with its borrower, not
@@ -362,46 +393,55 @@ class Inventory(models.Model):
                 if (
                     active_record is not None
                     and active_record.record_type == Record.LENT
-                    and active_record.room != external_room
+                    and active_record.room_id != external_room.pk
                 ):
-                    previous_room = active_record.room
-                    lifecycle.relocate_lending(active_record, room=external_room, user=user)
-
-                    lent_not_found_msg = (
-                        f"Lented asset not found in expected location `{previous_room}. "
-                        f"Changed to `{active_record.room}`."
-                    )
-                    note_obj, note_obj_created = Note.objects.get_or_create(
-                        inventory=current_inventory,
-                        device=active_record.device,
-                    )
-                    note_obj.text = f"{note_obj.text} *** {lent_not_found_msg}"
-                    note_obj.save()
+                    lent_elsewhere.append(device)
                 else:
-                    lifecycle.transition_lose(device, inventory=current_inventory, user=user)
+                    lost.append(device)
 
-            elif state == "dev_state_unknown":
+            else:  # dev_state_unknown
                 # A device added to a room but marked neither found nor not-found,
-                # or an already-inventorized device re-marked "unknown": localise
-                # it in the room but WITHOUT an inventory stamp, and strip any
-                # existing stamp so it no longer counts as inventorized.
-                already_inventorized_records = device.get_current_inventory_records
-                if already_inventorized_records:
-                    # Save one at a time (not a bulk update) so Record.save() runs.
-                    for _record in already_inventorized_records:
-                        _record.inventory = None
-                        _record.save()
-
-                    msg = f"Device marked as 'unknown state' during inventory by {user}. Removed existing inventory stamp."
-                    update_inventory_note(inventory=current_inventory, device=device, msg=msg)
-
-                lifecycle.localise(
-                    device,
-                    room=room,
-                    user=user,
-                    inventory=None,
-                    note="Marked as 'unknown state' during inventory.",
-                )
+                # or an already-inventorized device re-marked "unknown".
+                unknown.append(device)
+
+        for note, group in found.items():
+            lifecycle.bulk_localise(group, room=room, user=user, inventory=current_inventory, note=note)
+
+        if lent_elsewhere:
+            previous_rooms = {device.pk: device.active_record.room for device in lent_elsewhere}
+            lifecycle.bulk_localise(lent_elsewhere, room=external_room, user=user)
+            update_inventory_notes(
+                inventory=current_inventory,
+                messages={
+                    pk: f"Lented asset not found in expected location `{previous_room}. Changed to `{external_room}`."
+                    for pk, previous_room in previous_rooms.items()
+                },
+                separator=" *** ",
+            )
 
-            else:
-                raise RuntimeError(f"This should never happen: given state `{state}` not recognized! Raising 500.")
+        lifecycle.bulk_lose(lost, user=user, inventory=current_inventory)
+
+        if unknown:
+            # Strip any existing inventory stamp so the device no longer counts
+            # as inventorized, then localise it in the room without one.
+            if current_inventory is not None:
+                stamped = Record.objects.filter(device__in=unknown, inventory=current_inventory)
+                stamped_device_pks = set(stamped.values_list("device_id", flat=True))
+                stamped.update(inventory=None, modified_at=timezone.now())
+
+                msg = f"Device marked as 'unknown state' during inventory by {user}. Removed existing inventory stamp."
+                update_inventory_notes(inventory=current_inventory, messages=dict.fromkeys(stamped_device_pks, msg))
+
+            lifecycle.bulk_localise(
+                unknown,
+                room=room,
+                user=user,
+                inventory=None,
+                note="Marked as 'unknown state' during inventory.",
+            )
+
+        logger.info(
+            f"Inventorized room {room} in {time.perf_counter() - started:.3f}s: "
+            f"{sum(len(group) for group in found.values())} found, "
+            f"{len(lent_elsewhere)} lent elsewhere, {len(lost)} lost, {len(unknown)} unknown."
+        )
@@ -7,8 +7,10 @@ from django.db.models.functions import Lower
 from django.db.models import UniqueConstraint
 from django.utils.translation import gettext_lazy as _
 
+from .search_document import SearchIndexedModel
 
-class Manufacturer(models.Model):
+
+class Manufacturer(SearchIndexedModel):
     name = models.CharField(
         max_length=255,
         null=True,
@@ -12,6 +12,7 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .abstracts import SoftDeleteAuditBaseModel, AuditBaseModel
+from .search_document import SearchIndexedModel
 
 
 class OrganizationalUnit(AuditBaseModel):
@@ -90,7 +91,7 @@ class ActiveContractObjectsBaseModel(models.Model):
         abstract = True
 
 
-class Person(SoftDeleteAuditBaseModel, ActiveContractObjectsBaseModel):
+class Person(SoftDeleteAuditBaseModel, ActiveContractObjectsBaseModel, SearchIndexedModel):
     first_name = models.CharField(max_length=255, verbose_name=_("First name"))
     last_name = models.CharField(max_length=255, verbose_name=_("Last name"))
     email = models.EmailField(
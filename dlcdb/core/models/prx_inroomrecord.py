@@ -31,6 +31,9 @@ class InRoomRecord(Record):
         if self.room is None:
             raise ValidationError(_("A room must be set!"))
 
-    def save(self, *args, **kwargs):
+    def normalise(self):
         self.record_type = Record.INROOM
+
+    def save(self, *args, **kwargs):
+        self.normalise()
         super().save(*args, **kwargs)
@@ -89,8 +89,11 @@ class LentRecord(Record):
         except Room.DoesNotExist as e:
             raise ValidationError(_('No auto return room set! "%(error)s"') % {"error": e}, code="invalid")
 
-    def save(self, *args, **kwargs):
+    def normalise(self):
         self.record_type = Record.LENT
+
+    def save(self, *args, **kwargs):
+        self.normalise()
         super().save(*args, **kwargs)
 
     class Meta:
@@ -21,9 +21,12 @@ class Manager(models.Manager):
 class LostRecord(Record):
     objects = Manager()
 
-    def save(self, **kwargs):
+    def normalise(self):
         self.record_type = Record.LOST
         self.room = None
+
+    def save(self, **kwargs):
+        self.normalise()
         super().save(**kwargs)
 
     class Meta:
@@ -26,6 +26,9 @@ class OrderedRecord(Record):
 
     objects = OrderedRecordManager()
 
-    def save(self, **kwargs):
+    def normalise(self):
         self.record_type = Record.ORDERED
+
+    def save(self, **kwargs):
+        self.normalise()
         super().save(**kwargs)
@@ -27,13 +27,15 @@ class RemovedRecord(Record):
 
     objects = RemovedRecordManager()
 
-    def save(self, **kwargs):
+    def normalise(self):
         self.record_type = Record.REMOVED
         self.room = None
 
         if not self.removed_date:
             self.removed_date = now()
 
+    def save(self, **kwargs):
+        self.normalise()
         super().save(**kwargs)
 
     def __str__(self):
@@ -7,13 +7,16 @@ from datetime import datetime
 
 from django.core.exceptions import ValidationError
 from django.urls import reverse
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from .abstracts import AuditBaseModel
+from .search_document import SearchDocument, SearchIndexedModel
+from .state_month import DeviceStateMonth
 from .. import lifecycle
+from ..utils.data_generation import bump_data_generation
 
 
 # Whereabouts of the device after decommissioning.
@@ -60,7 +63,7 @@ RECORD_TYPE_KEYS = lifecycle.RECORD_TYPE_KEYS
 LOST_DEVICE_NOT_LENDABLE = _('Device is currently "not locatable". It must be located before it can be lent.')
 
 
-class Record(AuditBaseModel):
+class Record(AuditBaseModel, SearchIndexedModel):
     # New record types/proxys must be added to:
     # * RECORD_TYPE_LIST
     # * RECORD_TYPE_CLASSES
@@ -222,13 +225,32 @@ class Record(AuditBaseModel):
         ]
         indexes = [
             models.Index(fields=["is_active", "record_type", "inventory"]),
+            # The API change feed pages on (modified_at, id).
+            models.Index(fields=["modified_at", "id"]),
         ]
 
     def update_active_record_on_device(self):
         related_device = self.device
-        related_device.active_record = self
+        related_device.set_current(self)
         related_device.save()
 
+    def update_current_state_on_device(self):
+        """Refresh the device's copy of this record (``Device.set_current``) after an in-place edit.
+
+        A no-op unless this is the device's active record. Counts as a change of
+        the device (``modified_at``), as its current room or borrower moved. Also
+        updates a device instance already loaded on this record, so a later full
+        save of it does not write the old values back.
+        """
+        from .device import Device
+
+        values = {**Device.current_values(self), "modified_at": self.modified_at}
+        Device.with_softdeleted_objects.filter(pk=self.device_id, active_record=self.pk).update(**values)
+        if self._meta.get_field("device").is_cached(self) and self.device.active_record_id == self.pk:
+            for attname, value in values.items():
+                setattr(self.device, attname, value)
+        SearchDocument.objects.index(Device, [self.device_id], values)
+
     def __str__(self):
         return str(self.pk)
 
@@ -238,6 +260,11 @@ class Record(AuditBaseModel):
                 "Records must be created via a proxy model. Creating plain records is not allowed. Hint: Create a new record."
             )
 
+    def normalise(self):
+        """Stamp what this proxy's ``save()`` stamps (``record_type``, cleared
+        fields) without saving. Bulk writers call it, as ``bulk_create`` skips
+        ``save()``."""
+
     def save(self, *args, check_transition=True, **kwargs):
         """
         Always set the most recent record (the one which is created) as active for
@@ -246,32 +273,60 @@ class Record(AuditBaseModel):
         On insert, the lifecycle enforces that the new ``record_type`` is a legal
         next state for the device (``check_transition``). Importers and repair
         commands that replay historical chains pass ``check_transition=False``.
-        """
 
-        # set is active if instance is created
-        is_new_record = self._state.adding
-        if is_new_record and check_transition:
-            lifecycle.check_state(self.device, self.record_type)
-        if is_new_record:
-            # Close only the record being superseded (the currently active one).
-            # Scoping by is_active=True keeps already-closed records' original
-            # effective_until intact -- filtering by device alone would rewrite
-            # every prior record's close timestamp on each append.
-            # qs.update() does not call the custom save method, does not
-            # emit any signals and did not update the auto_now field so we
-            # need to explictly set the modified_at field.
-            # https://docs.djangoproject.com/en/4.1/ref/models/querysets/#django.db.models.query.QuerySet.update
-            Record.objects.filter(device=self.device, is_active=True).update(
-                is_active=False,
-                effective_until=timezone.now(),
-            )
-
-            # Set current record as active
-            self.is_active = True
-
-        super().save(*args, **kwargs)
-        if is_new_record:
-            self.update_active_record_on_device()
+        An insert locks the device row until the end of the transaction, as the
+        lifecycle's bulk moves do: the state checked here is the one superseded
+        below, and appends to one device, single or bulk, take turns.
+        """
+        with transaction.atomic():
+            # set is active if instance is created
+            is_new_record = self._state.adding
+            if is_new_record:
+                self._lock_device()
+            if is_new_record and check_transition:
+                lifecycle.check_state(self.device, self.record_type)
+            if is_new_record:
+                # The state being left, booked into the dashboard's monthly rollup
+                # once the new record is stored (see ``state_month``).
+                previous_state = lifecycle.state_of(self.device)
+
+                # Close only the record being superseded (the currently active one).
+                # Scoping by is_active=True keeps already-closed records' original
+                # effective_until intact -- filtering by device alone would rewrite
+                # every prior record's close timestamp on each append.
+                # qs.update() does not call the custom save method, does not
+                # emit any signals and did not update the auto_now field so we
+                # need to explictly set the modified_at field.
+                # https://docs.djangoproject.com/en/4.1/ref/models/querysets/#django.db.models.query.QuerySet.update
+                closed_at = timezone.now()
+                Record.objects.filter(device=self.device, is_active=True).update(
+                    is_active=False,
+                    effective_until=closed_at,
+                    modified_at=closed_at,
+                )
+
+                # Set current record as active
+                self.is_active = True
+
+            super().save(*args, **kwargs)
+            if is_new_record:
+                self.update_active_record_on_device()
+                DeviceStateMonth.objects.record_appended(self, previous_state=previous_state)
+            elif self.is_active:
+                # An in-place edit (``lifecycle.relocate_lending``, a returned lending,
+                # a synced return date): keep the device's current-state columns in step.
+                self.update_current_state_on_device()
+            bump_data_generation()
+
+    def _lock_device(self):
+        """Lock the device row and re-read its active record from it."""
+        from .device import Device
+
+        self.device.active_record_id = (
+            Device.with_softdeleted_objects.select_for_update()
+            .values_list("active_record_id", flat=True)
+            .get(pk=self.device_id)
+        )
 
     def get_proxy_instance(self):
         """
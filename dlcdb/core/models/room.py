@@ -16,9 +16,10 @@ from dlcdb.inventory.utils import uuid2qrcode
 
 from ..storage import OverwriteStorage
 from .abstracts import SoftDeleteAuditBaseModel
+from .search_document import SearchIndexedModel
 
 
-class Room(SoftDeleteAuditBaseModel):
+class Room(SoftDeleteAuditBaseModel, SearchIndexedModel):
     uuid = models.UUIDField(
         default=uuid.uuid4,
         editable=False,
@@ -0,0 +1,373 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Search index behind the free-text ``search`` of the device, record, lending,
+person and room lists, and so behind the dashboard's global search.
+
+Those searches match a term as a case-insensitive substring of any of up to a
+dozen fields, several of them behind joins (a device's borrower is read via
+``current_person``). As an OR of ``icontains`` that is a full scan of
+every joined table per keystroke. Instead each searchable object gets one
+``SearchDocument`` per index holding the text of exactly those fields, and a
+search looks the term up in that single column:
+
+* on SQLite, through an FTS5 table with the ``trigram`` tokenizer mirroring it
+  (kept in step by triggers), which answers substring queries of three or more
+  characters from an index;
+* on PostgreSQL, through a ``pg_trgm`` GIN index on ``UPPER(text)``, which
+  serves the ``icontains`` lookup itself;
+* elsewhere, or for shorter terms, as an ``icontains`` over the one table.
+
+Either way what matches is what the ``icontains`` chain matched before.
+
+The documents are rewritten from ``save()`` of every model a document reads
+(``SearchIndexedModel``), for the fields that changed only, and from the bulk
+writers next to their ``bump_data_generation``. Anything that bypasses those -- a queryset
+``update()`` of a searched field, raw SQL, a restored database dump -- can be
+repaired with ``./manage.py rebuild_search_index``. A document left behind by
+a deleted object is harmless: searches join back on the primary key.
+"""
+
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import cache, reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import connections, models, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# The FTS5 table mirroring ``SearchDocument.text`` on SQLite, created by the
+# migration where SQLite supports it.
+FULLTEXT_TABLE = "core_searchdocument_fts"
+
+# The trigram tokenizer indexes three-character sequences; shorter terms fall
+# back to a plain scan of the documents.
+FULLTEXT_MIN_LENGTH = 3
+
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """The fields one FilterSet's ``search`` matches the term in."""
+
+    model: str  # app label, e.g. "core.Device"
+    fields: tuple[str, ...]  # ORM paths from ``model``, forward relations only
+    # The objects that get a document; the FilterSet's queryset never lists the others.
+    condition: Q = field(default_factory=Q)
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_queryset(self):
+        return self.get_model()._base_manager.filter(self.condition)
+
+    def condition_fields(self):
+        """The lookups ``condition`` filters on."""
+        nodes = [self.condition]
+        while nodes:
+            for child in nodes.pop().children:
+                if isinstance(child, Q):
+                    nodes.append(child)
+                else:
+                    yield child[0]
+
+    def reads_from(self, model):
+        """
+        ``{lookup: attnames}``: the fields of ``model`` this index's documents
+        read, by the path leading from the indexed objects to ``model`` (``""``
+        for their own fields).
+        """
+        reads = defaultdict(set)
+        for path in (*self.fields, *self.condition_fields()):
+            parts = path.split("__")
+            current = self.get_model()
+            for depth, part in enumerate(parts):
+                model_field = current._meta.get_field(part)
+                if current._meta.concrete_model is model:
+                    reads["__".join(parts[:depth])].add(model_field.attname)
+                if not model_field.is_relation:
+                    break  # the rest is a lookup, e.g. ``__in``
+                current = model_field.related_model
+        return reads
+
+
+SEARCH_INDEXES = {
+    # assets.filters.DeviceFilter (and the licences of the global search)
+    "device": SearchIndex(
+        "core.Device",
+        (
+            "edv_id",
+            "sap_id",
+            "serial_number",
+            "nick_name",
+            "device_type__name",
+            "manufacturer__name",
+            "series",
+            "order_number",
+            "note",
+            "current_person__first_name",
+            "current_person__last_name",
+            "current_person__email",
+        ),
+    ),
+    # assets.filters.RecordFilter
+    "record": SearchIndex(
+        "core.Record",
+        (
+            "device__edv_id",
+            "device__sap_id",
+            "device__serial_number",
+            "person__first_name",
+            "person__last_name",
+            "person__email",
+            "room__number",
+            # The free-text fields are what make a trail searchable at all
+            # ("why was this scrapped", "where did it go").
+            "note",
+            "removed_info",
+        ),
+    ),
+    # lending.filters.LentRecordFilter, which lists LentRecords only
+    "lending": SearchIndex(
+        "core.Record",
+        (
+            "device__edv_id",
+            "device__sap_id",
+            "device__manufacturer__name",
+            "device__series",
+            "person__first_name",
+            "person__last_name",
+            "person__email",
+            "lent_note",
+            "lent_accessories",
+        ),
+        Q(record_type="LENT"),
+    ),
+    # persons.filters.PersonFilter; mirrors the admin's search_fields,
+    # including the UDB-mirrored names.
+    "person": SearchIndex(
+        "core.Person",
+        (
+            "last_name",
+            "first_name",
+            "email",
+            "udb_person_last_name",
+            "udb_person_first_name",
+            "udb_person_email_internal_business",
+        ),
+    ),
+    # rooms.filters.RoomFilter
+    "room": SearchIndex(
+        "core.Room",
+        (
+            "number",
+            "nickname",
+            "description",
+            "note",
+        ),
+    ),
+}
+
+
+def document_text(values):
+    """The document of one object from its field ``values``, one per line."""
+    return "\n".join(str(value) for value in values if value)
+
+
+def fulltext_available(using):
+    """True if the FTS5 mirror exists on database ``using``."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    if not hasattr(connection, "_search_fulltext"):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FULLTEXT_TABLE])
+            connection._search_fulltext = cursor.fetchone() is not None
+    return connection._search_fulltext
+
+
+class SearchDocumentManager(models.Manager):
+    def search(self, queryset, index, term):
+        """``queryset`` narrowed to the objects whose ``index`` document contains ``term``."""
+        return queryset.filter(pk__in=self.matching(index, term))
+
+    def matching(self, index, term):
+        """The ``object_id``s of the ``index`` documents containing ``term``, case-insensitively."""
+        documents = self.filter(kind=index)
+        if len(term) >= FULLTEXT_MIN_LENGTH and fulltext_available(self.db):
+            # A quoted FTS5 string is a phrase: its trigrams in sequence, i.e.
+            # the term as a substring. Quotes inside it are doubled.
+            phrase = '"{}"'.format(term.replace('"', '""'))
+            fulltext = RawSQL(f"SELECT rowid FROM {FULLTEXT_TABLE} WHERE {FULLTEXT_TABLE} MATCH %s", [phrase])
+            documents = documents.filter(pk__in=fulltext)
+        else:
+            documents = documents.filter(text__icontains=term)
+        return documents.values("object_id")
+
+    def index(self, model, pks, changed=None, *, dependents=True):
+        """
+        Rewrite the documents of the ``model`` objects ``pks`` and of every
+        object whose document reads from them (a person's name is part of the
+        documents of their records and of the devices they borrow).
+
+        ``changed``, if given, are the attnames of ``model`` that changed: only
+        the documents reading one of them are rewritten, and the dependent
+        objects are looked up only along the relations that read one of them.
+        ``dependents=False`` skips those altogether, for objects just created.
+
+        Called by ``SearchIndexedModel.save()`` and by the bulk writers. Only
+        documents whose text changed are written.
+        """
+        model = model._meta.concrete_model
+        pks = {pk for pk in pks if pk is not None}
+        if not pks:
+            return
+        changed = None if changed is None else set(changed)
+        for kind, search_index in SEARCH_INDEXES.items():
+            affected = set()
+            lookups = []
+            for lookup, attnames in search_index.reads_from(model).items():
+                if changed is not None and not attnames & changed:
+                    continue
+                if not lookup:
+                    affected.update(pks)
+                elif dependents:
+                    lookups.append(lookup)
+            if lookups:
+                related = reduce(or_, (Q(**{f"{lookup}__in": pks}) for lookup in lookups))
+                affected.update(search_index.get_queryset().filter(related).values_list("pk", flat=True))
+            for batch in itertools.batched(sorted(affected), BATCH_SIZE):
+                self._write(kind, search_index, batch)
+
+    def _write(self, kind, search_index, pks):
+        rows = search_index.get_queryset().filter(pk__in=pks).values_list("pk", *search_index.fields)
+        texts = {pk: document_text(values) for pk, *values in rows}
+        stored = {
+            object_id: (pk, text)
+            for object_id, pk, text in self.filter(kind=kind, object_id__in=pks).values_list("object_id", "pk", "text")
+        }
+
+        changed = [
+            self.model(pk=stored[object_id][0], text=text)
+            for object_id, text in texts.items()
+            if object_id in stored and stored[object_id][1] != text
+        ]
+        created = [
+            self.model(kind=kind, object_id=object_id, text=text)
+            for object_id, text in texts.items()
+            if object_id not in stored
+        ]
+        gone = [pk for object_id, (pk, _text) in stored.items() if object_id not in texts]
+
+        if changed:
+            self.bulk_update(changed, ["text"])
+        if created:
+            self.bulk_create(created)
+        if gone:
+            self.filter(pk__in=gone).delete()
+
+    def rebuild(self):
+        """Rewrite every document from scratch. Returns the document count."""
+        count = 0
+        with transaction.atomic():
+            self.all().delete()
+            for kind, search_index in SEARCH_INDEXES.items():
+                rows = search_index.get_queryset().values_list("pk", *search_index.fields)
+                documents = (
+                    self.model(kind=kind, object_id=pk, text=document_text(values))
+                    for pk, *values in rows.iterator(chunk_size=5000)
+                )
+                for batch in itertools.batched(documents, BATCH_SIZE):
+                    self.bulk_create(batch)
+                    count += len(batch)
+        return count
+
+
+def indexed_attnames(model):
+    """The attnames of ``model`` that some search document reads."""
+    return _indexed_attnames(model._meta.concrete_model)
+
+
+@cache
+def _indexed_attnames(model):
+    # Read for every loaded row (``SearchIndexedModel.from_db``), so worked out once per model.
+    return frozenset(
+        attname
+        for search_index in SEARCH_INDEXES.values()
+        for attnames in search_index.reads_from(model).values()
+        for attname in attnames
+    )
+
+
+class SearchIndexedModel(models.Model):
+    """
+    A model some search document reads from: ``save()`` rewrites the documents
+    that read one of the fields it changed.
+
+    The indexed values an object is loaded with are remembered, the way
+    ``Device`` remembers its stored tenant. A new object gets its own
+    documents; an edit of fields no document reads rewrites nothing.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_search_values = instance._search_values(indexed_attnames(cls))
+        return instance
+
+    def _search_values(self, attnames):
+        # Deferred fields are left out; they are not compared.
+        return {attname: self.__dict__[attname] for attname in attnames if attname in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        super().save(*args, **kwargs)
+
+        attnames = indexed_attnames(type(self))
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            attnames &= {self._meta.get_field(name).attname for name in update_fields}
+        values = self._search_values(attnames)
+        stored = self.__dict__.setdefault("_stored_search_values", {})
+        if created:
+            # Nothing reads from an object that did not exist yet.
+            SearchDocument.objects.index(type(self), [self.pk], dependents=False)
+        else:
+            changed = {
+                attname for attname, value in values.items() if attname not in stored or stored[attname] != value
+            }
+            if changed:
+                SearchDocument.objects.index(type(self), [self.pk], changed)
+        stored.update(values)
+
+
+class SearchDocument(models.Model):
+    """The searchable text of one object for one index; see the module docstring."""
+
+    kind = models.CharField(max_length=20)  # a SEARCH_INDEXES key
+    object_id = models.IntegerField()
+    text = models.TextField(blank=True)
+
+    objects = SearchDocumentManager()
+
+    class Meta:
+        verbose_name = "Search document"
+        verbose_name_plural = "Search documents"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id"],
+                name="%(app_label)s_%(class)s_unique_kind_object",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
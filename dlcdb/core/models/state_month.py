@@ -0,0 +1,253 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Monthly device-state rollup behind the dashboard record timeline.
+
+The timeline chart asks "how many devices were in state X at the end of month
+M". Answering that from ``Record`` means walking every record ever written, so
+instead every append (``Record.save()``) books its effect here as signed deltas:
+
+* a device *entering* INROOM, LENT or LOST in month M adds +1 at M;
+* the state it *leaves* gets -1 at M, closing its span from M onwards;
+* a REMOVED record is a one-off event: +1 in the month it happened, at most once
+  per device and month.
+
+The count for a spanning state in month M is then the running sum of its deltas
+up to M, and the chart becomes one aggregate over a table whose size depends on
+tenants x months, not on devices or history. A record superseded within the
+month it was written adds and subtracts in the same row, which is exactly the
+"state at the end of the month" semantics the chart always had.
+
+Rows are keyed by the device's tenant, so a tenant change moves the device's
+whole contribution (``DeviceStateMonthManager.move_device``). Anything that
+bypasses ``Record.save()`` -- raw SQL, a hard delete -- can be repaired with
+``./manage.py rebuild_state_timeline``.
+"""
+
+import datetime
+from collections import Counter
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .. import lifecycle
+
+# States whose count carries over from month to month until the next record.
+SPANNING_STATES = (lifecycle.INROOM, lifecycle.LENT, lifecycle.LOST)
+
+
+def month_of(timestamp):
+    """First day of the (UTC) month ``timestamp`` falls in."""
+    timestamp = timestamp.astimezone(datetime.timezone.utc)
+    return datetime.date(timestamp.year, timestamp.month, 1)
+
+
+def next_month(month):
+    return datetime.date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def append_deltas(previous_state, record_type, month, *, first_removal=True):
+    """The deltas of appending one ``record_type`` record to a device in ``previous_state``.
+
+    ``first_removal`` is False when the device was already removed once in
+    ``month``; a removal counts only once per device and month.
+    """
+    deltas = Counter()
+    if previous_state in SPANNING_STATES:
+        deltas[(month, previous_state)] -= 1
+    if record_type in SPANNING_STATES:
+        deltas[(month, record_type)] += 1
+    elif record_type == lifecycle.REMOVED and first_removal:
+        deltas[(month, record_type)] += 1
+    return deltas
+
+
+def chain_deltas(chain):
+    """The deltas one device's record chain contributes to the rollup.
+
+    ``chain`` is the device's ``(record_type, created_at)`` pairs in the order
+    they were written. Returns a Counter keyed by ``(month, record_type)``: the
+    sum of ``append_deltas`` over the chain, so a rebuild books exactly what
+    the appends booked one by one.
+    """
+    deltas = Counter()
+    removed_months = set()
+    previous = None
+    for record_type, created_at in chain:
+        month = month_of(created_at)
+        deltas.update(append_deltas(previous, record_type, month, first_removal=month not in removed_months))
+        if record_type == lifecycle.REMOVED:
+            removed_months.add(month)
+        previous = record_type
+    return deltas
+
+
+class DeviceStateMonthManager(models.Manager):
+    def apply(self, deltas, *, tenant_id, sign=1):
+        """Add ``deltas`` (as returned by ``chain_deltas``) to ``tenant_id``'s rows."""
+        for (month, record_type), delta in deltas.items():
+            delta *= sign
+            if not delta:
+                continue
+            row = self.filter(tenant_id=tenant_id, month=month, record_type=record_type)
+            if row.update(delta=F("delta") + delta):
+                continue
+            try:
+                # In a savepoint: a concurrent first append of the month may
+                # create the row between the update and here, and losing that
+                # race must leave the caller's transaction usable.
+                with transaction.atomic():
+                    self.create(tenant_id=tenant_id, month=month, record_type=record_type, delta=delta)
+            except IntegrityError:
+                row.update(delta=F("delta") + delta)
+
+    def record_appended(self, record, *, previous_state):
+        """Book a freshly inserted ``record`` that superseded ``previous_state``.
+
+        Called by ``Record.save()`` on insert. ``previous_state`` is the device's
+        state before the append (None for its first record).
+        """
+        from .record import Record
+
+        month = month_of(record.created_at)
+        first_removal = record.record_type == lifecycle.REMOVED and not (
+            Record.objects.filter(
+                device_id=record.device_id,
+                record_type=lifecycle.REMOVED,
+                created_at__gte=datetime.datetime.combine(month, datetime.time(), tzinfo=datetime.timezone.utc),
+            )
+            .exclude(pk=record.pk)
+            .exists()
+        )
+        deltas = append_deltas(previous_state, record.record_type, month, first_removal=first_removal)
+        self.apply(deltas, tenant_id=record.device.tenant_id)
+
+    def device_deltas(self, device_id):
+        from .record import Record
+
+        chain = Record.objects.filter(device_id=device_id).order_by("created_at", "pk")
+        return chain_deltas(chain.values_list("record_type", "created_at"))
+
+    def move_device(self, device_id, *, from_tenant_id, to_tenant_id):
+        """Move a device's whole contribution to another tenant."""
+        deltas = self.device_deltas(device_id)
+        with transaction.atomic():
+            self.apply(deltas, tenant_id=from_tenant_id, sign=-1)
+            self.apply(deltas, tenant_id=to_tenant_id)
+
+    def rebuild(self):
+        """Recompute every row from the full record history. Returns the row count."""
+        from .record import Record
+
+        totals = Counter()
+        chain = []
+        current = None
+        records = Record.objects.order_by("device_id", "created_at", "pk").values_list(
+            "device_id", "device__tenant_id", "record_type", "created_at"
+        )
+
+        def _flush():
+            for (month, record_type), delta in chain_deltas(chain).items():
+                totals[(current[1], month, record_type)] += delta
+
+        for device_id, tenant_id, record_type, created_at in records.iterator(chunk_size=5000):
+            if current is None or current[0] != device_id:
+                if current is not None:
+                    _flush()
+                current = (device_id, tenant_id)
+                chain = []
+            chain.append((record_type, created_at))
+        if current is not None:
+            _flush()
+
+        rows = [
+            self.model(tenant_id=tenant_id, month=month, record_type=record_type, delta=delta)
+            for (tenant_id, month, record_type), delta in totals.items()
+            if delta
+        ]
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    def monthly_counts(self, tenant=None, *, until=None):
+        """Devices per state and month: ``{record_type: {"YYYY-MM": count}}``.
+
+        Spanning states are summed up to ``until`` (default: the current month),
+        REMOVED counts only the month of the removal. Months without any device
+        in a state are left out, as the chart never showed them.
+        """
+        until = until or month_of(timezone.now())
+        qs = self.all() if tenant is None else self.filter(tenant=tenant)
+        rows = qs.values("record_type", "month").annotate(total=Sum("delta")).order_by("month")
+
+        deltas = {}
+        for row in rows:
+            deltas.setdefault(row["record_type"], {})[row["month"]] = row["total"]
+
+        counts = {}
+        for record_type, by_month in deltas.items():
+            series = counts.setdefault(record_type, {})
+            if record_type not in SPANNING_STATES:
+                series.update({f"{m:%Y-%m}": total for m, total in by_month.items() if total > 0})
+                continue
+            running, month = 0, min(by_month)
+            while month <= until:
+                running += by_month.get(month, 0)
+                if running > 0:
+                    series[f"{month:%Y-%m}"] = running
+                month = next_month(month)
+        return counts
+
+
+class DeviceStateMonth(models.Model):
+    """One signed delta per tenant, month and state; see the module docstring."""
+
+    # SET_NULL like ``Device.tenant``: the devices of a deleted tenant fall back
+    # to no tenant, and so do their rows.
+    tenant = models.ForeignKey(
+        "tenants.Tenant",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+    )
+    month = models.DateField(
+        verbose_name=_("Month"),
+        help_text=_("First day of the month."),
+    )
+    record_type = models.CharField(
+        max_length=20,
+        choices=lifecycle.RECORD_TYPE_LIST,
+        verbose_name=_("Record type"),
+    )
+    delta = models.IntegerField(default=0)
+
+    objects = DeviceStateMonthManager()
+
+    class Meta:
+        verbose_name = "Device state per month"
+        verbose_name_plural = "Device states per month"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant", "month", "record_type"],
+                name="%(app_label)s_%(class)s_unique_tenant_month_type",
+            ),
+            # NULLs compare as distinct, so the constraint above never applies
+            # to rows without a tenant. ``apply`` relies on both to notice a
+            # concurrent first append of the month.
+            models.UniqueConstraint(
+                fields=["month", "record_type"],
+                condition=Q(tenant__isnull=True),
+                name="%(app_label)s_%(class)s_unique_month_type_no_tenant",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["tenant", "month"]),
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.record_type}: {self.delta:+d}"
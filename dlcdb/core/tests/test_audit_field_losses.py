@@ -59,7 +59,7 @@ def test_a_value_re_entered_after_the_loss_is_reported_but_not_restorable():
 def test_booleans_and_machine_managed_fields_are_not_losses():
     device = Device.objects.create(edv_id="EDV-FLAGS", is_lentable=True)
     device.is_lentable = False  # False is a value, not a missing one
-    device.qrcode = ""  # regenerated by Device.save(), never user data
+    device.qrcode = ""  # a machine-managed file path, never user data
     device.save()
 
     assert find_field_losses(device_pk=device.pk) == []
@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+The current-state columns on ``Device``: every write path that moves
+``active_record`` -- or edits it in place -- must leave them equal to it.
+"""
+
+import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dlcdb.assets.filters import DeviceFilter
+from dlcdb.core import lifecycle
+from dlcdb.core.models import Device, Person, Record, Room
+from dlcdb.dashboard.stats import get_record_fraction_data
+
+pytestmark = pytest.mark.django_db
+
+
+def _current(device):
+    device = Device.with_softdeleted_objects.select_related("active_record").get(pk=device.pk)
+    stored = {attname: getattr(device, attname) for attname in Device.current_values(None)}
+    assert stored == Device.current_values(device.active_record)
+    return stored
+
+
+@pytest.fixture
+def return_room(db):
+    return Room.objects.create(number="Return", is_auto_return_room=True)
+
+
+def test_a_device_without_records_has_no_current_state(plain_device):
+    assert _current(plain_device)["current_state"] is None
+
+
+def test_appends_and_in_place_moves_keep_the_columns_in_step(lentable_device, room, return_room, user):
+    person = Person.objects.create(first_name="Erika", last_name="Musterfrau")
+    other = Room.objects.create(number="CS-2")
+
+    lifecycle.transition_locate(lentable_device, room=room, user=user)
+    assert _current(lentable_device)["current_room_id"] == room.pk
+
+    lending = lifecycle.transition_lend(
+        lentable_device,
+        person=person,
+        room=room,
+        lent_start_date=datetime.date(2026, 1, 1),
+        lent_desired_end_date=datetime.date(2026, 6, 30),
+        user=user,
+    )
+    assert _current(lentable_device) == {
+        "current_state": Record.LENT,
+        "current_room_id": room.pk,
+        "current_person_id": person.pk,
+        "current_lent_desired_end_date": datetime.date(2026, 6, 30),
+    }
+
+    lifecycle.relocate_lending(lending, room=other, user=user)
+    assert _current(lentable_device)["current_room_id"] == other.pk
+
+    lifecycle.transition_return_lending(lending, user=user, lent_end_date=datetime.date(2026, 2, 1))
+    assert _current(lentable_device) == {
+        "current_state": Record.INROOM,
+        "current_room_id": return_room.pk,
+        "current_person_id": None,
+        "current_lent_desired_end_date": None,
+    }
+
+
+def test_a_stale_device_instance_does_not_write_old_values_back(lentable_device, room, user):
+    person = Person.objects.create(first_name="Max", last_name="Mustermann")
+    other = Room.objects.create(number="CS-3")
+    lifecycle.transition_locate(lentable_device, room=room, user=user)
+    lending = lifecycle.transition_lend(
+        lentable_device, person=person, room=room, lent_start_date=None, lent_desired_end_date=None, user=user
+    )
+
+    lifecycle.relocate_lending(lending, room=other, user=user)
+    lending.device.save()
+
+    assert _current(lentable_device)["current_room_id"] == other.pk
+
+
+def test_bulk_moves_keep_the_columns_in_step(room, user):
+    person = Person.objects.create(first_name="Max", last_name="Mustermann")
+    target = Room.objects.create(number="CS-BULK")
+    in_room = Device.objects.create(edv_id="CS-IN-ROOM")
+    lent = Device.objects.create(edv_id="CS-LENT", is_lentable=True)
+    lifecycle.transition_locate(in_room, room=room, user=user)
+    lifecycle.transition_locate(lent, room=room, user=user)
+    lifecycle.transition_lend(
+        lent, person=person, room=room, lent_start_date=None, lent_desired_end_date=None, user=user
+    )
+
+    lifecycle.bulk_localise([in_room, lent], room=target, user=user)
+    assert _current(in_room)["current_room_id"] == target.pk
+    assert _current(lent)["current_room_id"] == target.pk
+    assert _current(lent)["current_person_id"] == person.pk
+
+    lifecycle.bulk_lose([in_room, lent], user=user)
+    assert _current(in_room)["current_state"] == Record.LOST
+    assert _current(lent)["current_person_id"] is None
+
+
+def test_audit_current_state_reports_and_repairs_stale_columns(lentable_device, room, user):
+    lifecycle.transition_locate(lentable_device, room=room, user=user)
+    Device.objects.filter(pk=lentable_device.pk).update(current_state=Record.LOST, current_room=None)
+
+    out = StringIO()
+    call_command("audit_current_state", stdout=out)
+    assert "1 with stale current-state columns" in out.getvalue()
+    assert Device.objects.get(pk=lentable_device.pk).current_state == Record.LOST
+
+    call_command("audit_current_state", "--fix", stdout=StringIO())
+    assert _current(lentable_device)["current_state"] == Record.INROOM
+
+    out = StringIO()
+    call_command("audit_current_state", stdout=out)
+    assert "0 with stale current-state columns" in out.getvalue()
+
+
+def test_device_list_filters_and_counts_read_the_columns(lentable_device, room, user):
+    """State, room and ordering of the device list, and the dashboard's state counts, need no join."""
+    lifecycle.transition_locate(lentable_device, room=room, user=user)
+    params = {"state": Record.INROOM, "active_record__room": room.pk, "ordering": "-room"}
+    devices = DeviceFilter(params, queryset=Device.objects.all()).qs
+
+    assert list(devices) == [lentable_device]
+    assert "core_record" not in str(devices.query)
+    with CaptureQueriesContext(connection) as queries:
+        # "Verliehen" counts every lentable device in a state (see the function).
+        assert get_record_fraction_data()["counts"] == [1, 1, 0, 0]
+    assert "core_record" not in queries[0]["sql"]
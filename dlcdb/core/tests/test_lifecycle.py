@@ -8,6 +8,7 @@ and the enforcement it drives.
 """
 
 import pytest
+from django.contrib.auth import get_user_model
 
 from dlcdb.core import lifecycle
 from dlcdb.core.models import InRoomRecord, LentRecord, Record, Room
@@ -354,3 +355,111 @@ def test_return_lending_is_atomic(lentable_device, room):
     # ...and roll back cleanly: the lending is still open.
     record.refresh_from_db()
     assert record.lent_end_date is None
+
+
+# --- Bulk moves ----------------------------------------------------------
+
+
+@pytest.mark.django_db
+def test_bulk_localise_matches_localise_device_by_device(room, user):
+    """Every state ends up where ``localise`` would have put it, with one active record per device."""
+    from dlcdb.core.models import Device, DeviceStateMonth, LostRecord, OrderedRecord, RemovedRecord
+
+    target = Room.objects.create(number="BULK-TARGET")
+    fresh = Device.objects.create(edv_id="BULK-FRESH")
+    ordered = Device.objects.create(edv_id="BULK-ORDERED")
+    OrderedRecord.objects.create(device=ordered)
+    inroom = Device.objects.create(edv_id="BULK-INROOM")
+    InRoomRecord.objects.create(device=inroom, room=room)
+    lost = Device.objects.create(edv_id="BULK-LOST")
+    InRoomRecord.objects.create(device=lost, room=room)
+    LostRecord.objects.create(device=lost)
+    removed = Device.objects.create(edv_id="BULK-REMOVED")
+    RemovedRecord.objects.create(device=removed)
+    lent = Device.objects.create(edv_id="BULK-LENT", is_lentable=True)
+    InRoomRecord.objects.create(device=lent, room=room)
+    lending = LentRecord.objects.create(device=lent, room=room)
+
+    devices = Device.objects.filter(edv_id__startswith="BULK-")
+    records = lifecycle.bulk_localise(devices, room=target, user=user, note="floor move")
+
+    assert len(records) == 6
+    for device in devices:
+        device.refresh_from_db()
+        assert device.active_record.room == target
+        assert Record.objects.filter(device=device, is_active=True).count() == 1
+        assert device.history.count() >= 2  # the bulk repoint wrote a history row too
+
+    lending.refresh_from_db()
+    assert lending.is_active and lending.record_type == Record.LENT
+    assert InRoomRecord.objects.get(device=fresh, is_active=True).note == "floor move"
+
+    counts = DeviceStateMonth.objects.monthly_counts()
+    incremental = sorted(DeviceStateMonth.objects.exclude(delta=0).values_list("month", "record_type", "delta"))
+    DeviceStateMonth.objects.rebuild()
+    assert sorted(DeviceStateMonth.objects.exclude(delta=0).values_list("month", "record_type", "delta")) == incremental
+    assert sum(counts[Record.INROOM].values()) == 5  # all but the lent device
+
+
+@pytest.mark.django_db
+def test_bulk_localise_runs_in_a_fixed_number_of_queries(room, user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from dlcdb.core.models import Device
+
+    def _move(count):
+        devices = [Device.objects.create(edv_id=f"Q{count}-{i}") for i in range(count)]
+        for device in devices:
+            InRoomRecord.objects.create(device=device, room=room)
+        with CaptureQueriesContext(connection) as captured:
+            lifecycle.bulk_localise(devices, room=Room.objects.create(number=f"Q{count}"), user=user)
+        return len(captured.captured_queries)
+
+    assert _move(3) == _move(30)
+
+
+@pytest.mark.django_db
+def test_available_for_matches_available_device_by_device(room):
+    from dlcdb.core.models import Device, LostRecord, RemovedRecord
+
+    # A superuser is offered every legal transition, so what varies is state and precondition.
+    user = get_user_model().objects.create(username="admin", is_superuser=True)
+    devices = [
+        Device.objects.create(edv_id="AF-new"),
+        Device.objects.create(edv_id="AF-lentable", is_lentable=True),
+        Device.objects.create(edv_id="AF-plain"),
+        Device.objects.create(edv_id="AF-lost"),
+        Device.objects.create(edv_id="AF-removed"),
+    ]
+    for device in devices[1:]:
+        InRoomRecord.objects.create(device=device, room=room)
+    LostRecord.objects.create(device=devices[3])
+    RemovedRecord.objects.create(device=devices[4])
+    devices = list(Device.objects.filter(pk__in=[d.pk for d in devices]).select_related("active_record"))
+
+    bulk = lifecycle.available_for(devices, user=user)
+
+    assert bulk == {device.pk: lifecycle.available(device, user=user) for device in devices}
+    assert lifecycle.available_for(devices) == {device.pk: [] for device in devices}
+
+
+@pytest.mark.django_db
+def test_available_for_runs_in_a_fixed_number_of_queries(room):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from dlcdb.core.models import Device
+
+    user = get_user_model().objects.create(username="admin", is_superuser=True)
+
+    def _offer(count):
+        for i in range(count):
+            device = Device.objects.create(edv_id=f"AQ{count}-{i}", is_lentable=bool(i % 2))
+            InRoomRecord.objects.create(device=device, room=room)
+        devices = Device.objects.filter(edv_id__startswith=f"AQ{count}-").select_related("active_record")
+        with CaptureQueriesContext(connection) as captured:
+            lifecycle.available_for(devices, user=user)
+        return len(captured.captured_queries)
+
+    assert _offer(3) == _offer(30)
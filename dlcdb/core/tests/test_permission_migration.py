@@ -54,7 +54,11 @@ def at_0072(transactional_db):
         content_type__app_label="core",
     ).delete()
     yield
-    _migrate(AFTER)
+    # Back to head, not just to AFTER: later migrations' tables are gone too,
+    # and transactional tests running after this one need them.
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    _migrate(executor.loader.graph.leaf_nodes())
 
 
 def _core_permission(codename):
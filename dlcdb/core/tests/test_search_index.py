@@ -0,0 +1,188 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+The search index behind the list searches: what the models' ``save()`` and the
+bulk writers keep up to date must equal a full rebuild, and a search over it
+must find exactly what the ``icontains`` chain over its fields finds.
+"""
+
+import datetime
+import importlib
+from functools import reduce
+from io import StringIO
+from operator import or_
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from dlcdb.assets.filters import DeviceFilter
+from dlcdb.core import lifecycle
+from dlcdb.core.models import Device, DeviceType, Manufacturer, Person, Record, Room, SearchDocument
+from dlcdb.core.models.search_document import SEARCH_INDEXES, fulltext_available
+from dlcdb.lending.filters import LentRecordFilter
+
+pytestmark = pytest.mark.django_db
+
+# The module name is not a valid identifier, so it cannot be imported directly.
+_fulltext_migration = importlib.import_module("dlcdb.core.migrations.0083_searchdocument_fulltext")
+
+
+def _documents():
+    return sorted(SearchDocument.objects.values_list("kind", "object_id", "text"))
+
+
+def _icontains(kind, term):
+    """The pks the ``icontains`` chain over the index's fields finds."""
+    search_index = SEARCH_INDEXES[kind]
+    query = reduce(or_, (Q(**{f"{field}__icontains": term}) for field in search_index.fields))
+    return set(search_index.get_queryset().filter(query).values_list("pk", flat=True))
+
+
+@pytest.fixture
+def lending(room, user):
+    manufacturer = Manufacturer.objects.create(name="Lenovo")
+    device_type = DeviceType.objects.create(name="Notebook")
+    device = Device.objects.create(
+        edv_id="NB-0042",
+        serial_number="PF-3X9Q",
+        series='Thinkpad X1 "Carbon"',
+        manufacturer=manufacturer,
+        device_type=device_type,
+        is_lentable=True,
+    )
+    person = Person.objects.create(first_name="Erika", last_name="Musterfrau", email="erika@example.org")
+    lifecycle.transition_locate(device, room=room, user=user)
+    return lifecycle.transition_lend(
+        device,
+        person=person,
+        room=room,
+        lent_start_date=datetime.date.today(),
+        lent_desired_end_date=None,
+        user=user,
+    )
+
+
+def test_incremental_documents_match_a_rebuild(lending, room, user):
+    lending.person.last_name = "Mustermann"
+    lending.person.save()
+    lending.device.manufacturer.name = "Lenovo Group"
+    lending.device.manufacturer.save()
+    others = [Device.objects.create(edv_id=f"BULK-{index}") for index in range(3)]
+    lifecycle.bulk_localise([lending.device, *others], room=Room.objects.create(number="B2.07"), user=user)
+
+    incremental = _documents()
+    SearchDocument.objects.rebuild()
+    assert _documents() == incremental
+
+
+def test_a_search_finds_what_icontains_finds(lending, room):
+    Room.objects.create(number="A1.01", description="Server room")
+    Person.objects.create(first_name="Max", last_name="Mustermann")
+
+    terms = ["nb-00", "0042", "mUSTER", "X1", "carbon", '"Carbon"', "example.org", "8887", "server", "zz-nothing"]
+    for kind, search_index in SEARCH_INDEXES.items():
+        queryset = search_index.get_model()._base_manager.all()
+        for term in terms:
+            found = set(SearchDocument.objects.search(queryset, kind, term).values_list("pk", flat=True))
+            assert found == _icontains(kind, term), (kind, term)
+
+
+def test_a_borrower_is_found_through_the_device_and_the_lending(lending):
+    devices = DeviceFilter({"search": "musterfrau"}, queryset=Device.objects.all()).qs
+    lendings = LentRecordFilter({"search": "musterfrau"}, queryset=Record.objects.all()).qs
+
+    assert list(devices) == [lending.device]
+    assert list(lendings) == [lending]
+
+
+def test_only_lendings_have_a_lending_document(lending):
+    located = Record.objects.filter(device=lending.device).exclude(pk=lending.pk).get()
+
+    assert set(SearchDocument.objects.filter(kind="lending").values_list("object_id", flat=True)) == {lending.pk}
+    assert SearchDocument.objects.filter(kind="record", object_id=located.pk).exists()
+
+
+def test_the_migration_fills_what_a_rebuild_writes(lending):
+    SearchDocument.objects.rebuild()
+    rebuilt = [document[:2] for document in _documents()]
+
+    documents = _fulltext_migration.documents(apps)
+
+    assert sorted((document.kind, document.object_id) for document in documents) == rebuilt
+
+
+def test_a_renamed_borrower_is_found_under_the_new_name(lending):
+    lending.person.last_name = "Gabler"
+    lending.person.save()
+
+    assert list(DeviceFilter({"search": "gabler"}, queryset=Device.objects.all()).qs) == [lending.device]
+    assert not DeviceFilter({"search": "musterfrau"}, queryset=Device.objects.all()).qs.exists()
+
+
+def _document_queries(queries):
+    return [query["sql"] for query in queries if "core_searchdocument" in query["sql"]]
+
+
+def test_an_edit_of_unsearched_fields_leaves_the_documents_alone(lending):
+    device = Device.objects.get(pk=lending.device.pk)
+    device.is_lentable = False
+
+    with CaptureQueriesContext(connection) as queries:
+        device.save()
+
+    assert _document_queries(queries) == []
+
+
+def test_the_cost_of_a_move_does_not_grow_with_the_history(room, user):
+    device = Device.objects.create(edv_id="MOVE-1")
+    lifecycle.transition_locate(device, room=room, user=user)
+
+    def relocate(number):
+        with CaptureQueriesContext(connection) as queries:
+            lifecycle.transition_relocate(device, room=Room.objects.create(number=number), user=user)
+        return len(queries)
+
+    relocate("M1")
+    second = relocate("M2")
+    for number in ("M3", "M4", "M5"):
+        relocate(number)
+
+    assert relocate("M6") == second
+
+
+def test_a_renamed_room_is_found_in_its_records(lending):
+    room = Room.objects.get(pk=lending.room.pk)
+    room.number = "Z9.99"
+    room.save()
+
+    assert set(SearchDocument.objects.search(Record.objects.all(), "record", "Z9.99")) == set(
+        Record.objects.filter(room=room)
+    )
+
+
+def test_the_fulltext_table_serves_the_search_on_sqlite(lending):
+    if connection.vendor != "sqlite":
+        pytest.skip("SQLite only")
+    assert fulltext_available(connection.alias)
+
+    sql = str(SearchDocument.objects.matching("device", "carbon").query)
+    assert "MATCH" in sql
+    # Shorter than a trigram: scanned instead.
+    assert "MATCH" not in str(SearchDocument.objects.matching("device", "x1").query)
+
+
+def test_rebuild_search_index():
+    Room.objects.create(number="C3.14")
+    SearchDocument.objects.all().delete()
+    out = StringIO()
+
+    call_command("rebuild_search_index", stdout=out)
+
+    assert "Rebuilt the search index: 1 documents." in out.getvalue()
+    assert SearchDocument.objects.filter(kind="room").count() == 1
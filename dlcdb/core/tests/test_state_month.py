@@ -0,0 +1,142 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+The monthly device-state rollup behind the dashboard timeline: what
+``Record.save()`` books incrementally must equal a full rebuild from history.
+"""
+
+import datetime
+from collections import Counter
+from unittest import mock
+
+import pytest
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from dlcdb.core import lifecycle
+from dlcdb.core.models import Device, DeviceStateMonth, Record, Room
+from dlcdb.core.models.state_month import month_of
+from dlcdb.tenants.models import Tenant
+
+pytestmark = pytest.mark.django_db
+
+
+def _rows():
+    return sorted(
+        (row.tenant_id or 0, row.month, row.record_type, row.delta) for row in DeviceStateMonth.objects.exclude(delta=0)
+    )
+
+
+def _this_month():
+    return f"{month_of(timezone.now()):%Y-%m}"
+
+
+@pytest.fixture
+def return_room(db):
+    return Room.objects.create(number="Return", is_auto_return_room=True)
+
+
+def test_incremental_bookings_match_a_rebuild(room, return_room, user):
+    tenant_a = Tenant.objects.create(name="A")
+    tenant_b = Tenant.objects.create(name="B")
+
+    lent = Device.objects.create(tenant=tenant_a, is_lentable=True)
+    lifecycle.transition_locate(lent, room=room, user=user)
+    lending = lifecycle.transition_lend(
+        lent,
+        person=None,
+        room=room,
+        lent_start_date=datetime.date.today(),
+        lent_desired_end_date=None,
+        user=user,
+    )
+    lifecycle.transition_return_lending(lending, user=user, lent_end_date=datetime.date.today())
+
+    removed = Device.objects.create(tenant=tenant_b)
+    lifecycle.transition_order(removed, user=user)
+    lifecycle.transition_remove(removed, user=user)
+    lifecycle.transition_restore(removed, user=user)
+    lifecycle.transition_remove(removed, user=user)
+
+    lost = Device.objects.create()
+    lifecycle.transition_locate(lost, room=room, user=user)
+    lifecycle.transition_lose(lost, user=user)
+
+    incremental = _rows()
+    DeviceStateMonth.objects.rebuild()
+    assert _rows() == incremental
+
+
+def test_a_state_superseded_within_the_month_is_not_counted(room, lentable_device, user):
+    lifecycle.transition_locate(lentable_device, room=room, user=user)
+    lifecycle.transition_lend(
+        lentable_device,
+        person=None,
+        room=room,
+        lent_start_date=datetime.date.today(),
+        lent_desired_end_date=None,
+        user=user,
+    )
+
+    counts = DeviceStateMonth.objects.monthly_counts()
+    assert counts[Record.LENT] == {_this_month(): 1}
+    assert counts.get(Record.INROOM, {}) == {}
+
+
+def test_a_removal_counts_once_per_device_and_month(plain_device, user):
+    lifecycle.transition_remove(plain_device, user=user)
+    lifecycle.transition_restore(plain_device, user=user)
+    lifecycle.transition_remove(plain_device, user=user)
+
+    assert DeviceStateMonth.objects.monthly_counts()[Record.REMOVED] == {_this_month(): 1}
+
+
+def test_a_state_carries_over_until_the_current_month(room, plain_device, user):
+    lifecycle.transition_locate(plain_device, room=room, user=user)
+    # Backdate the history, as an import of an old database would leave it.
+    Record.objects.filter(device=plain_device).update(created_at=timezone.now() - datetime.timedelta(days=95))
+    DeviceStateMonth.objects.rebuild()
+
+    counts = DeviceStateMonth.objects.monthly_counts()[Record.INROOM]
+    assert len(counts) in (4, 5)  # 95 days span four or five calendar months
+    assert set(counts.values()) == {1}
+    assert max(counts) == _this_month()
+
+
+def test_a_tenant_change_moves_the_device_history(room, plain_device, user):
+    tenant = Tenant.objects.create(name="New home")
+    lifecycle.transition_locate(plain_device, room=room, user=user)
+    assert DeviceStateMonth.objects.monthly_counts(tenant=tenant) == {}
+
+    device = Device.objects.get(pk=plain_device.pk)
+    device.tenant = tenant
+    device.save()
+
+    assert DeviceStateMonth.objects.monthly_counts(tenant=tenant)[Record.INROOM] == {_this_month(): 1}
+    # Unscoped, the device is still counted exactly once.
+    assert DeviceStateMonth.objects.monthly_counts()[Record.INROOM] == {_this_month(): 1}
+
+
+@pytest.mark.parametrize("with_tenant", [True, False], ids=["tenant", "no tenant"])
+def test_losing_the_race_for_a_new_row_adds_to_the_winner(tenant, with_tenant):
+    """A concurrent first append created the row after our update found none."""
+    tenant = tenant if with_tenant else None
+    month = month_of(timezone.now())
+    row = DeviceStateMonth.objects.create(tenant=tenant, month=month, record_type=Record.INROOM, delta=1)
+    update = QuerySet.update
+    calls = []
+
+    def update_missing_the_row_once(queryset, **kwargs):
+        calls.append(kwargs)
+        return 0 if len(calls) == 1 else update(queryset, **kwargs)
+
+    with mock.patch.object(QuerySet, "update", update_missing_the_row_once), transaction.atomic():
+        DeviceStateMonth.objects.apply(Counter({(month, Record.INROOM): 2}), tenant_id=tenant.pk if tenant else None)
+        # The outer transaction is still usable.
+        assert DeviceStateMonth.objects.count() == 1
+
+    row.refresh_from_db()
+    assert row.delta == 3
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+A counter advanced on every committed device or record write.
+
+Caches of figures derived from devices and records (the dashboard) store the
+generation they were built under: a different one means something was written
+since, without tracking which rows each figure read. ``Record.save()``,
+``Device.save()`` and the bulk writers advance it.
+
+The counter lives in the database (``core.DataGeneration``), not in the cache:
+the default cache is per process, and a write made by another web worker or
+the task queue must invalidate this process's entries too. Other caches that
+need the same guarantee keep a counter of their own in another row of that
+table (``advance_generation`` / ``read_generation``), e.g. the tenant
+resolutions in ``dlcdb.tenants.shortcuts``.
+"""
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+GENERATION_PK = 1
+
+
+def advance_generation(pk):
+    """Advance the counter in row ``pk`` by one, creating the row on first use."""
+    DataGeneration = apps.get_model("core.DataGeneration")
+    if DataGeneration.objects.filter(pk=pk).update(value=F("value") + 1):
+        return
+    try:
+        with transaction.atomic():
+            DataGeneration.objects.create(pk=pk, value=1)
+    except IntegrityError:  # created concurrently
+        DataGeneration.objects.filter(pk=pk).update(value=F("value") + 1)
+
+
+def read_generation(pk):
+    """The counter in row ``pk``; 0 while nothing has advanced it yet."""
+    DataGeneration = apps.get_model("core.DataGeneration")
+    return DataGeneration.objects.filter(pk=pk).values_list("value", flat=True).first() or 0
+
+
+def _advance_generation():
+    advance_generation(GENERATION_PK)
+
+
+def bump_data_generation():
+    """
+    Mark the device and record data as changed.
+
+    Advanced once the transaction commits, in a statement of its own: a cache
+    filled before that reads the old generation and a snapshot without the
+    write, so it is rebuilt afterwards; and the row is never locked for the
+    length of a writing transaction.
+    """
+    transaction.on_commit(_advance_generation)
+
+
+def get_data_generation():
+    """The current generation; read it before computing what gets cached under it."""
+    return read_generation(GENERATION_PK)
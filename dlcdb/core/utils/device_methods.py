@@ -36,7 +36,7 @@ class DeviceStateData:
     actions: list
 
 
-def get_device_state_data(device, *, user=None, app_name=None):
+def get_device_state_data(device, *, user=None, app_name=None, transitions=None):
     """
     Return a data structure with the current information about the device and
     currently possible actions that can be performed on it.
@@ -55,7 +55,8 @@ def get_device_state_data(device, *, user=None, app_name=None):
 
     Which actions are possible is decided by the state machine in
     ``dlcdb.core.lifecycle`` (via ``lifecycle.available``); this function only
-    presents them for the requesting app.
+    presents them for the requesting app. List views pass ``transitions`` from
+    ``lifecycle.available_for`` to decide a whole page at once.
     """
 
     active_record = device.active_record
@@ -100,7 +101,9 @@ def get_device_state_data(device, *, user=None, app_name=None):
     # ``lifecycle.available``. This function only maps each offered transition
     # to a URL and label for the requesting app.
     actions = []
-    for transition in lifecycle.available(device, user=user):
+    if transitions is None:
+        transitions = lifecycle.available(device, user=user)
+    for transition in transitions:
         proxy_model = lifecycle.proxy_for(transition.target)
 
         # Default target: the target proxy model's admin add-view. Admin
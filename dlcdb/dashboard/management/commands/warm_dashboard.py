@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Fill the dashboard cache for every tenant and language.
+
+Run after a deploy (or a cache restart), so the first users landing on the
+dashboard do not each pay for building it:
+
+    python manage.py warm_dashboard
+
+The entries are only useful to other processes if ``CACHES["default"]`` is
+shared between them; with a per-process backend the command fails.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import translation
+
+from dlcdb.dashboard.views import FRAGMENTS, get_fragment
+from dlcdb.tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = "Build and cache the dashboard fragments for every tenant and language."
+
+    def handle(self, *args, **options):
+        if isinstance(caches["default"], (LocMemCache, DummyCache)):
+            raise CommandError(
+                f"The default cache ({settings.CACHES['default']['BACKEND']}) is not shared between processes, "
+                "so the entries would be gone when this command exits. Configure a shared backend, "
+                "e.g. memcached or a file-based cache."
+            )
+        tenants = [None, *Tenant.objects.all()]
+        # Requests without a language preference get LANGUAGE_CODE.
+        languages = dict.fromkeys([settings.LANGUAGE_CODE, *(code for code, _name in settings.LANGUAGES)])
+        for tenant in tenants:
+            for language in languages:
+                with translation.override(language):
+                    for name in FRAGMENTS:
+                        get_fragment(name, tenant, refresh=True)
+
+        self.stdout.write(f"Warmed {len(tenants) * len(languages) * len(FRAGMENTS)} dashboard entries.")
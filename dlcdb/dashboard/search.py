@@ -21,12 +21,17 @@ lending/licenses/smallstuff URL names), so a plain module-level tuple costs
 nothing and hides nothing.
 """
 
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from typing import Callable
 
+from django.conf import settings
+from django.db import connection, connections
 from django.db.models import Q, QuerySet
 from django.http import HttpRequest
 from django.urls import reverse
+from django.utils import translation
 from django.utils.http import urlencode
 from django.utils.translation import gettext_lazy as _
 
@@ -39,6 +44,8 @@ from dlcdb.rooms.filters import RoomFilter
 from dlcdb.smallstuff.models import AssignedThing
 from dlcdb.theme.lifecycle_display import active_record_color_case
 
+logger = logging.getLogger(__name__)
+
 # Rows shown per group before the "show all" link takes over. The global search
 # is triage; the per-model list view is the full result set.
 RESULTS_PER_SOURCE = 8
@@ -238,26 +245,96 @@ SEARCH_SOURCES = (
 )
 
 
+def _evaluate(results):
+    """The first ``RESULTS_PER_SOURCE`` rows of ``results`` and their total."""
+    total = results.count()
+    return (list(results[:RESULTS_PER_SOURCE]) if total else []), total
+
+
+def _evaluate_in_worker(results, language):
+    """``_evaluate`` on a worker thread, which has a database connection of its own.
+
+    The thread lives for one search only, so that connection is opened for
+    this source and closed right after it, whatever ``CONN_MAX_AGE`` says.
+    """
+    try:
+        with translation.override(language):
+            return _evaluate(results)
+    finally:
+        connections.close_all()
+
+
+def _evaluate_all(searches):
+    """Evaluate the ``(source, results)`` pairs of ``searches``, concurrently if possible.
+
+    Returns one ``(rows, total)`` per pair, in order, or ``None`` for a source
+    that did not answer within ``GLOBAL_SEARCH_TIMEOUT`` seconds. Its query is
+    not interrupted (no backend offers that portably) but no longer waited
+    for; one still queued behind a busy worker is dropped.
+
+    Each search gets its own pool of at most ``GLOBAL_SEARCH_WORKERS``
+    threads, so a query left running by a timed-out source holds up nothing
+    but the search it belongs to. The cost is a database connection per
+    source and search: up to ``GLOBAL_SEARCH_WORKERS`` besides the request's
+    own for every search in progress.
+
+    Inside a transaction the worker threads would not see its uncommitted
+    writes, so there -- and with ``GLOBAL_SEARCH_WORKERS = 0`` -- the sources
+    are evaluated one after another on the request's own connection.
+    """
+    if not settings.GLOBAL_SEARCH_WORKERS or connection.in_atomic_block or not searches:
+        return [_evaluate(results) for _source, results in searches]
+
+    language = translation.get_language()
+    executor = ThreadPoolExecutor(
+        max_workers=min(settings.GLOBAL_SEARCH_WORKERS, len(searches)),
+        thread_name_prefix="global-search",
+    )
+    try:
+        futures = [executor.submit(_evaluate_in_worker, results, language) for _source, results in searches]
+        done, _pending = wait(futures, timeout=settings.GLOBAL_SEARCH_TIMEOUT)
+    finally:
+        # Queued sources are dropped; running ones finish on their own.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    outcomes = []
+    for (source, _results), future in zip(searches, futures):
+        if future in done:
+            outcomes.append(future.result())
+        else:
+            logger.warning("Global search: %s took longer than %ss", source.key, settings.GLOBAL_SEARCH_TIMEOUT)
+            outcomes.append(None)
+    return outcomes
+
+
 def run_search(request, term):
     """Search every source the user may see; return one group per non-empty result.
 
-    Two queries per permitted source (a COUNT and a LIMIT), so at most a dozen
-    for a fully privileged user -- acceptable for an endpoint the client
-    debounces. If it ever stops being acceptable, drop the COUNT and fetch
-    ``RESULTS_PER_SOURCE + 1`` rows to render "8+" instead of an exact total.
+    Two queries per permitted source (a COUNT and a LIMIT), at most a dozen for
+    a fully privileged user. The sources are evaluated concurrently (see
+    ``_evaluate_all``), so the answer takes as long as the slowest source
+    rather than all of them together, and never much longer than
+    ``GLOBAL_SEARCH_TIMEOUT``: a source that runs out of time is returned as a
+    group with ``timed_out`` set and no rows, linking to its own list.
+
+    The querysets are built here, on the request thread; only their evaluation
+    is handed off, so neither the request nor the user is read by a worker.
     """
     term = (term or "").strip()
     if len(term) < MIN_TERM_LENGTH:
         return []
 
-    groups = []
-    for source in SEARCH_SOURCES:
-        if not source.grants_access(request.user):
-            continue
+    searches = [
+        (source, source.search(source.get_queryset(request), term, request))
+        for source in SEARCH_SOURCES
+        if source.grants_access(request.user)
+    ]
 
-        results = source.search(source.get_queryset(request), term, request)
-        total = results.count()
-        if not total:
+    groups = []
+    for (source, _results), outcome in zip(searches, _evaluate_all(searches)):
+        timed_out = outcome is None
+        rows, total = ([], None) if timed_out else outcome
+        if not timed_out and not total:
             continue
 
         # Deep link into the model's own list with the same term prefilled --
@@ -269,9 +346,10 @@ def run_search(request, term):
         groups.append(
             {
                 "source": source,
-                "rows": results[:RESULTS_PER_SOURCE],
+                "rows": rows,
                 "total": total,
-                "has_more": total > RESULTS_PER_SOURCE,
+                "has_more": not timed_out and total > RESULTS_PER_SOURCE,
+                "timed_out": timed_out,
                 "show_all_href": show_all_href,
             }
         )
@@ -0,0 +1,159 @@
+// SPDX-FileCopyrightText: Thomas Breitner
+//
+// SPDX-License-Identifier: EUPL-1.2
+
+// Dashboard charts, drawn from the bare data of their fragment endpoint.
+//
+// Each `.dashboard-chart[data-chart]` element fetches its `data-src` (JSON, see
+// dashboard/stats.py for the shapes) and is replaced by a Plotly figure built
+// from it. Colours and layout live here, shared by all charts, so the server
+// only ever counts. The endpoint sends an ETag; the browser revalidates and
+// gets a 304 while the numbers are unchanged.
+
+(function () {
+  "use strict";
+
+  // Hide the modebar entirely.
+  const CONFIG = { displayModeBar: false, responsive: true };
+
+  // Shared layout defaults.
+  const LAYOUT = {
+    font: { family: "Roboto, sans-serif" },
+    plot_bgcolor: "rgba(0,0,0,0)",
+    paper_bgcolor: "rgba(0,0,0,0)",
+  };
+
+  const COLORS = {
+    primary: "#5b69bc",
+    primary_light: "#8b96d4",
+    accent: "#e8634a",
+    accent_light: "#f09a88",
+    muted: "#9e9e9e",
+  };
+
+  // Line and bar styles of the timeline, by record type.
+  const TIMELINE_STYLES = {
+    LENT: { line: { color: COLORS.accent, width: 2.5 } },
+    INROOM: {
+      line: { color: COLORS.primary, width: 2.5 },
+      fill: "tozeroy",
+      fillcolor: "rgba(91,105,188,0.12)",
+    },
+    LOST: { line: { color: COLORS.accent_light, width: 2.5 } },
+    REMOVED: { marker: { color: COLORS.muted, cornerradius: 3, opacity: 0.6 } },
+  };
+
+  const FIGURES = {
+    "record-fraction": function (data) {
+      return {
+        traces: [
+          {
+            type: "bar",
+            x: data.counts,
+            y: data.labels,
+            orientation: "h",
+            marker: {
+              color: [COLORS.primary, COLORS.accent, COLORS.muted, COLORS.accent_light],
+              cornerradius: 4,
+            },
+            text: data.counts,
+            textposition: "auto",
+            textfont: { color: "white", size: 13 },
+          },
+        ],
+        layout: {
+          height: 250,
+          margin: { l: 10, r: 30, t: 10, b: 10 },
+          xaxis: { showgrid: false, showticklabels: false, zeroline: false },
+          yaxis: { showgrid: false },
+          bargap: 0.3,
+        },
+      };
+    },
+
+    "device-types": function (data) {
+      return {
+        traces: [
+          {
+            type: "bar",
+            x: data.counts,
+            y: data.labels,
+            orientation: "h",
+            marker: {
+              color: data.counts,
+              colorscale: [
+                [0, COLORS.primary_light],
+                [1, COLORS.primary],
+              ],
+              cornerradius: 4,
+            },
+            text: data.counts,
+            textposition: "outside",
+            textfont: { size: 11 },
+          },
+        ],
+        layout: {
+          height: Math.max(300, data.labels.length * 28),
+          margin: { l: 10, r: 50, t: 10, b: 10 },
+          xaxis: { showgrid: false, showticklabels: false, zeroline: false },
+          yaxis: { showgrid: false, tickfont: { size: 11 } },
+          bargap: 0.2,
+        },
+      };
+    },
+
+    "record-timeline": function (data) {
+      return {
+        traces: data.series.map(function (series) {
+          const trace = Object.assign(
+            { x: series.months, y: series.counts, name: series.name },
+            TIMELINE_STYLES[series.type],
+          );
+          if (series.type === "REMOVED") {
+            trace.type = "bar";
+          } else {
+            trace.type = "scatter";
+            trace.mode = "lines";
+          }
+          return trace;
+        }),
+        layout: {
+          xaxis: { title: { text: "Monat" }, showgrid: false },
+          yaxis: { title: { text: "Anzahl Geräte" }, gridcolor: "rgba(0,0,0,0.06)", zeroline: false },
+          height: 350,
+          margin: { l: 50, r: 20, t: 10, b: 40 },
+          legend: { orientation: "h", yanchor: "bottom", y: 1.02, xanchor: "left", x: 0 },
+        },
+      };
+    },
+  };
+
+  function drawChart(el) {
+    const build = FIGURES[el.dataset.chart];
+    if (!build) {
+      return;
+    }
+    fetch(el.dataset.src, { headers: { Accept: "application/json" } })
+      .then(function (response) {
+        // A redirect means the session expired: the login page is no JSON.
+        if (!response.ok || response.redirected) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      })
+      .then(function (data) {
+        const figure = build(data);
+        el.replaceChildren();
+        Plotly.newPlot(el, figure.traces, Object.assign({}, LAYOUT, figure.layout), CONFIG);
+      })
+      .catch(function () {
+        el.replaceChildren();
+        const message = document.createElement("p");
+        message.className = "text-body-secondary mb-0";
+        message.textContent = el.dataset.errorLabel || "Could not load the chart.";
+        el.append(message);
+      });
+  }
+
+  document.querySelectorAll(".dashboard-chart[data-chart]").forEach(drawChart);
+})();
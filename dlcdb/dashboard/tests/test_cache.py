@@ -0,0 +1,172 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""The dashboard fragment cache: reused until a device or record write, pre-warmed by ``warm_dashboard``."""
+
+import json
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+
+from dlcdb.core.models import DataGeneration, Device, InRoomRecord, Room
+from dlcdb.core.utils.data_generation import GENERATION_PK
+from dlcdb.dashboard import views
+from dlcdb.dashboard.views import FRAGMENTS, get_fragment
+from dlcdb.tenants.models import Tenant
+
+
+def _device_count(tenant, **kwargs):
+    tiles, _cached = get_fragment("tiles", tenant, **kwargs)
+    return next(tile["count"] for tile in tiles if tile["url"] == "assets:device_index")
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Dashboard tenant")
+        self.room = Room.objects.create(number="D1.01")
+        self.create_device("DASH-1")
+
+    def create_device(self, edv_id):
+        # The data generation advances when the write commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            device = Device.objects.create(edv_id=edv_id, tenant=self.tenant)
+            InRoomRecord.objects.create(device=device, room=self.room)
+
+    def test_a_cached_fragment_costs_only_the_generation_query(self):
+        self.assertEqual(_device_count(self.tenant), 1)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(_device_count(self.tenant), 1)
+
+    def test_a_write_rebuilds_the_fragment(self):
+        _device_count(self.tenant)
+
+        self.create_device("DASH-2")
+
+        self.assertEqual(_device_count(self.tenant), 2)
+
+    @override_settings(DASHBOARD_CACHE_GRACE=60)
+    def test_within_the_grace_period_writes_are_not_shown_yet(self):
+        _device_count(self.tenant)
+
+        self.create_device("DASH-2")
+
+        self.assertEqual(_device_count(self.tenant), 1)
+        self.assertEqual(_device_count(self.tenant, refresh=True), 2)
+
+    def test_entries_are_kept_per_tenant(self):
+        other = Tenant.objects.create(name="Other tenant")
+
+        self.assertEqual(_device_count(self.tenant), 1)
+        self.assertEqual(_device_count(other), 0)
+
+    def test_a_write_from_another_process_rebuilds_the_fragment(self):
+        _device_count(self.tenant)
+
+        # Written and committed by another process, which advances the
+        # generation in the database and leaves this process's cache alone.
+        with self.captureOnCommitCallbacks(execute=False):
+            device = Device.objects.create(edv_id="DASH-2", tenant=self.tenant)
+            InRoomRecord.objects.create(device=device, room=self.room)
+        DataGeneration.objects.filter(pk=GENERATION_PK).update(value=F("value") + 1)
+
+        self.assertEqual(_device_count(self.tenant), 2)
+
+    def test_warm_dashboard_fills_the_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {
+                "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location},
+                "select2": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            }
+            with override_settings(CACHES=shared):
+                out = StringIO()
+                call_command("warm_dashboard", stdout=out)
+
+                # 2 tenants, 3 languages, 4 fragments
+                self.assertIn(f"Warmed {2 * 3 * len(FRAGMENTS)} dashboard entries", out.getvalue())
+                for name in FRAGMENTS:
+                    self.assertTrue(get_fragment(name, self.tenant)[1])
+                    self.assertTrue(get_fragment(name, None)[1])
+
+    def test_warm_dashboard_refuses_a_per_process_cache(self):
+        with self.assertRaisesMessage(CommandError, "not shared between processes"):
+            call_command("warm_dashboard", stdout=StringIO())
+
+
+class DashboardFragmentViewTests(TestCase):
+    """
+    Called directly with a RequestFactory request, the way the tenant
+    middleware leaves it; the responses are checked unrendered.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_superuser(email="fragments@example.com", password="secret")
+        self.tenant = Tenant.objects.create(name="Fragment tenant")
+
+    def get(self, view, *args, **headers):
+        request = RequestFactory().get("/dashboard/", headers=headers)
+        request.user = self.user
+        request.tenant = self.tenant
+        request.htmx = False
+        return view(request, *args)
+
+    def test_the_page_itself_builds_no_fragment(self):
+        with self.assertNumQueries(0):
+            response = self.get(views.index)
+
+        self.assertEqual(response.template_name, "dashboard/index.html")
+        self.assertNotIn("content", response.context_data)
+
+    def test_the_tiles_fragment_renders_its_partial(self):
+        response = self.get(views.fragment, "tiles")
+
+        self.assertEqual(response.template_name, "dashboard/index.html#tiles")
+        self.assertTrue(response.context_data["content"])
+
+    def test_a_chart_fragment_is_its_bare_data(self):
+        room = Room.objects.create(number="D1.02")
+        device = Device.objects.create(edv_id="CHART-1", tenant=self.tenant)
+        InRoomRecord.objects.create(device=device, room=room)
+
+        response = self.get(views.fragment, "record-fraction")
+
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(response.content),
+            {"labels": ["Lokalisiert", "Verliehen", "Nicht auffindbar", "Entfernt"], "counts": [1, 0, 0, 0]},
+        )
+
+    def test_an_unchanged_chart_is_not_sent_again(self):
+        first = self.get(views.fragment, "record-timeline")
+        self.assertIn("no-cache", first["Cache-Control"])
+
+        again = self.get(views.fragment, "record-timeline", if_none_match=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            device = Device.objects.create(edv_id="CHART-2", tenant=self.tenant)
+            InRoomRecord.objects.create(device=device, room=Room.objects.create(number="D1.03"))
+        changed = self.get(views.fragment, "record-timeline", if_none_match=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_a_fragment_reports_its_build_time(self):
+        built = self.get(views.fragment, "tiles")
+        cached = self.get(views.fragment, "tiles")
+
+        self.assertRegex(built["Server-Timing"], r'^tiles;desc="built";dur=\d+\.\d$')
+        self.assertRegex(cached["Server-Timing"], r'^tiles;desc="cached";dur=\d+\.\d$')
+
+    def test_an_unknown_fragment_is_a_404(self):
+        with self.assertRaises(Http404):
+            self.get(views.fragment, "nope")
@@ -5,14 +5,17 @@
 """Integration tests for the dashboard's global search."""
 
 import re
+import threading
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group, Permission
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 
 from dlcdb.core.models import Device, DeviceType, InRoomRecord, Manufacturer, Person, Room
-from dlcdb.dashboard.search import SEARCH_SOURCES
+from dlcdb.dashboard import search
+from dlcdb.dashboard.search import SEARCH_SOURCES, run_search
 from dlcdb.smallstuff.models import AssignedThing, Thing
 from dlcdb.tenants.models import Tenant
 
@@ -218,8 +221,8 @@ class GlobalSearchTests(TestCase):
         # The results, rendered server-side rather than waiting for HTMX.
         self.assertIn("devices", self._group_keys(response))
         self.assertIn(reverse("assets:device_detail", args=[self.device.pk]), body)
-        # ... and the dashboard's own content, still there below them.
-        self.assertTrue(response.context["tiles"])
+        # ... and the dashboard's own content, still loaded below them.
+        self.assertIn(reverse("dashboard:fragment", args=["tiles"]), body)
         self.assertIn("plotly", body.lower())
 
     def test_the_term_is_reflected_back_into_the_search_input(self):
@@ -257,7 +260,7 @@ class GlobalSearchTests(TestCase):
         self.assertContains(response, 'id="global-search-results"')
         self.assertEqual(response.context["groups"], [])
         # The landing page is still the landing page.
-        self.assertTrue(response.context["tiles"])
+        self.assertContains(response, reverse("dashboard:fragment", args=["tiles"]))
 
     def test_the_search_box_is_wired_to_take_the_cursor_on_load(self):
         """`autofocus` for the no-JS case, plus the script that puts the caret at the end."""
@@ -289,3 +292,81 @@ class GlobalSearchTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.headers.get("HX-Refresh"), "true")
         self.assertNotIn(b"csrfmiddlewaretoken", response.content)
+
+
+class ConcurrentSearchTests(TransactionTestCase):
+    """The sources evaluated on the pool. A ``TestCase`` keeps everything in one
+    transaction, which ``run_search`` answers sequentially, so these commit."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(email="helpdesk@example.com", password="secret")
+        manufacturer = Manufacturer.objects.create(name="Zebra Computers")
+        room = Room.objects.create(number="Z1.42", nickname="Zebra Lab")
+        for index in range(10):
+            device = Device.objects.create(edv_id=f"ZEBRA-DEVICE-{index}", manufacturer=manufacturer)
+            InRoomRecord.objects.create(device=device, room=room)
+        Device.objects.create(edv_id="ZEBRA-LICENCE-1", manufacturer=manufacturer, is_licence=True)
+        Person.objects.create(first_name="Zora", last_name="Zebra")
+
+        self.request = RequestFactory().get(reverse("dashboard:index"))
+        self.request.user = self.user
+
+    def _summary(self, groups):
+        return [
+            (group["source"].key, [row.pk for row in group["rows"]], group["total"], group["timed_out"])
+            for group in groups
+        ]
+
+    def test_concurrent_results_equal_sequential_ones(self):
+        with override_settings(GLOBAL_SEARCH_WORKERS=0):
+            sequential = self._summary(run_search(self.request, "zebra"))
+
+        concurrent = self._summary(run_search(self.request, "zebra"))
+
+        self.assertEqual(concurrent, sequential)
+        self.assertEqual([key for key, *_rest in concurrent], ["devices", "licenses", "persons", "rooms"])
+        self.assertEqual(concurrent[0][2], 10)
+
+    @override_settings(GLOBAL_SEARCH_TIMEOUT=0.2)
+    def test_a_slow_source_is_returned_as_timed_out(self):
+        evaluate = search._evaluate
+        # Holds the rooms back until the test is over, and then answers without
+        # touching the database the test is being torn down from.
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def slow_rooms(results):
+            if results.model is Room:
+                released.wait(timeout=5)
+                return [], 0
+            return evaluate(results)
+
+        with mock.patch.object(search, "_evaluate", slow_rooms), self.assertLogs(search.logger, "WARNING"):
+            groups = {group["source"].key: group for group in run_search(self.request, "zebra")}
+
+        self.assertTrue(groups["rooms"]["timed_out"])
+        self.assertEqual(groups["rooms"]["rows"], [])
+        self.assertEqual(groups["rooms"]["show_all_href"], f"{reverse('rooms:index')}?search=zebra")
+        self.assertFalse(groups["devices"]["timed_out"])
+        self.assertEqual(groups["devices"]["total"], 10)
+
+    @override_settings(GLOBAL_SEARCH_WORKERS=1, GLOBAL_SEARCH_TIMEOUT=0.5)
+    def test_a_slow_source_holds_up_only_its_own_search(self):
+        evaluate = search._evaluate
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        def slow_rooms(results):
+            if results.model is Room:
+                released.wait(timeout=5)
+                return [], 0
+            return evaluate(results)
+
+        with mock.patch.object(search, "_evaluate", slow_rooms), self.assertLogs(search.logger, "WARNING"):
+            run_search(self.request, "zebra")
+            # The rooms query of the first search is still running.
+            groups = {group["source"].key: group for group in run_search(self.request, "zebra")}
+
+        self.assertFalse(groups["devices"]["timed_out"])
+        self.assertEqual(groups["devices"]["total"], 10)
+        self.assertTrue(groups["rooms"]["timed_out"])
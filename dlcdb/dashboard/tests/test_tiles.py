@@ -2,13 +2,20 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
-"""The dashboard tiles carry the class names their styling and future JS hang on."""
+"""The dashboard tiles carry the class names their styling and future JS hang on.
+
+The tiles are their own fragment (see ``views.fragment``), so that is what is
+requested here rather than the dashboard page.
+"""
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
-from django.urls import reverse
+from django.urls import reverse, reverse_lazy
 
 from dlcdb.core.models import Device, DeviceType, InRoomRecord, Room
+from dlcdb.dashboard.views import build_tiles
+
+TILES_URL = reverse_lazy("dashboard:fragment", args=["tiles"])
 
 _PLAIN_STATIC_STORAGE = {
     "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
@@ -32,7 +39,7 @@ class DashboardTileTests(TestCase):
         self.client.force_login(self.user)
 
     def test_the_tile_grid_and_tiles_are_targetable(self):
-        response = self.client.get(reverse("dashboard:index"))
+        response = self.client.get(TILES_URL)
 
         self.assertContains(response, "dashboard-tiles")
         self.assertContains(response, "dashboard-tile ")
@@ -42,11 +49,31 @@ class DashboardTileTests(TestCase):
 
     def test_the_note_badge_is_targetable(self):
         """Rendered only for a model with notes, hence the device type seeded above."""
-        self.assertContains(self.client.get(reverse("dashboard:index")), "dashboard-tile-badge")
+        self.assertContains(self.client.get(TILES_URL), "dashboard-tile-badge")
 
     def test_a_tile_is_still_a_link_wearing_the_card_utilities(self):
         """The new names are additive: the Bootstrap classes and the href must survive."""
-        response = self.client.get(reverse("dashboard:index"))
+        response = self.client.get(TILES_URL)
 
         self.assertContains(response, 'class="dashboard-tile card h-100 text-decoration-none text-reset text-center"')
         self.assertContains(response, f'href="{reverse("assets:device_index")}"')
+
+
+class DashboardTileNoteCountTests(TestCase):
+    """Built directly, without a request: the note badge counts notes that are there."""
+
+    @classmethod
+    def setUpTestData(cls):
+        DeviceType.objects.create(name="Notebook", prefix="NTB", note="a note")
+        Device.objects.create(edv_id="TILE-1", note=None)
+        Device.objects.create(edv_id="TILE-2", note="")
+
+    def test_a_missing_note_is_not_counted_as_one(self):
+        tiles = build_tiles()
+        device_tile = next(tile for tile in tiles if tile["url"] == "assets:device_index")
+        type_tile = next(tile for tile in tiles if tile["url"] == "admin:core_devicetype_changelist")
+
+        self.assertEqual(device_tile["note_count"], 0)
+        self.assertEqual(device_tile["query_params"], "")
+        self.assertEqual(type_tile["note_count"], 1)
+        self.assertEqual(type_tile["query_params"], "has_note=has_note")
@@ -10,4 +10,5 @@ app_name = "dashboard"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("fragments/<slug:name>/", views.fragment, name="fragment"),
 ]
@@ -2,14 +2,23 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import hashlib
+import time
 from datetime import date
 
 from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
 from django.template.response import TemplateResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
 from dlcdb.core.models import Inventory, LentRecord, Record
+from dlcdb.core.utils.data_generation import get_data_generation
 from dlcdb.core.utils.helpers import get_icon_for_class
 from dlcdb.core.utils.htmx import htmx_login_required
 
@@ -62,7 +71,9 @@ def _build_tile(*, model_name, url, tenant):
     distinct = model_name in TENANT_DISTINCT and tenant is not None
     agg = {"total": Count("pk", distinct=distinct)}
     if hasattr(ModelClass, "note"):
-        agg["with_note"] = Count("pk", filter=~Q(note__exact=""), distinct=distinct)
+        # A NULL note is no note either; ~Q(note="") alone would count it.
+        has_note = ~Q(note__isnull=True) & ~Q(note="")
+        agg["with_note"] = Count("pk", filter=has_note, distinct=distinct)
     if model_name == "core.lentrecord":
         agg["lent"] = Count("pk", filter=Q(record_type=Record.LENT), distinct=distinct)
 
@@ -88,34 +99,8 @@ def _build_tile(*, model_name, url, tenant):
     }
 
 
-@htmx_login_required
-def index(request):
-    """
-    Dashboard on the theme frontend: model tiles (counts + note badges) and
-    Plotly stats, scoped to the current tenant, plus the global search.
-
-    Search results are served from this same URL so that ``hx-push-url`` puts
-    ``/dashboard/?q=…`` in the address bar: a search is then shareable and
-    bookmarkable, and reloading it renders the very same page server-side. HTMX
-    gets only the results fragment -- the tile aggregates and the three Plotly
-    figures are far too expensive to rebuild on every keystroke.
-
-    Guarded HTMX-aware rather than with plain ``login_required``: on an expired
-    session a 302 would otherwise swap the whole login page into the results
-    panel. Per-source permissions are applied inside ``run_search``.
-    """
-    term = (request.GET.get(GLOBAL_SEARCH_PARAM) or "").strip()
-    search_context = {
-        "search_param": GLOBAL_SEARCH_PARAM,
-        "search_term": term,
-        "groups": run_search(request, term),
-    }
-
-    if request.htmx:
-        return TemplateResponse(request, "dashboard/index.html#search-results", search_context)
-
-    tenant = request.tenant
-
+def build_tiles(tenant=None):
+    """The dashboard's model tiles for ``tenant``."""
     tile_specs = [
         ("core.device", "assets:device_index"),
         ("core.lentrecord", "lending:index"),
@@ -151,11 +136,112 @@ def index(request):
         },
     )
 
-    context = {
-        "tiles": tiles,
-        "record_fraction_html": stats.get_record_fraction_html(tenant=tenant),
-        "device_type_html": stats.get_device_type_html(tenant=tenant),
-        "record_timeline_html": stats.get_record_timeline_html(tenant=tenant),
-        **search_context,
+    return tiles
+
+
+# The dashboard's pieces, each loaded into the page as its own fragment:
+# name -> (builder, partial of dashboard/index.html rendering it). Charts have
+# no partial: their data goes out as JSON and dashboard/charts.js draws them.
+FRAGMENTS = {
+    "tiles": (build_tiles, "tiles"),
+    "record-fraction": (stats.get_record_fraction_data, None),
+    "record-timeline": (stats.get_record_timeline_data, None),
+    "device-types": (stats.get_device_type_data, None),
+}
+
+
+def get_fragment(name, tenant, *, refresh=False):
+    """
+    The content of fragment ``name`` for ``tenant``, cached per tenant and
+    language, and whether it came from the cache.
+
+    An entry is reused while no device or record has been written since it
+    was built (see ``dlcdb.core.utils.data_generation``), and in any case
+    while it is younger than ``DASHBOARD_CACHE_GRACE`` seconds. Entries expire after
+    ``DASHBOARD_CACHE_TIMEOUT`` seconds regardless, which bounds how long
+    counts not tied to devices and records (rooms, device types, small stuff)
+    can lag. ``refresh`` rebuilds the entry unconditionally.
+    """
+    key = f"dashboard:{name}:{tenant.pk if tenant else 'all'}:{get_language()}"
+    generation = get_data_generation()
+
+    entry = None if refresh else cache.get(key)
+    if entry is not None and (
+        entry["generation"] == generation or time.time() - entry["built_at"] < settings.DASHBOARD_CACHE_GRACE
+    ):
+        return entry["content"], True
+
+    build, _partial = FRAGMENTS[name]
+    content = build(tenant=tenant)
+    cache.set(
+        key,
+        {"generation": generation, "built_at": time.time(), "content": content},
+        settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+    return content, False
+
+
+@htmx_login_required
+def index(request):
+    """
+    Dashboard on the theme frontend: model tiles (counts + note badges) and
+    charts, scoped to the current tenant, plus the global search.
+
+    The page itself does no aggregation: the tiles are a fragment and each
+    chart's data a JSON payload (see ``fragment``), both loaded once the page
+    is shown; the charts are drawn in the browser.
+
+    Search results are served from this same URL so that ``hx-push-url`` puts
+    ``/dashboard/?q=…`` in the address bar: a search is then shareable and
+    bookmarkable, and reloading it renders the very same page server-side. HTMX
+    gets only the results fragment.
+
+    Guarded HTMX-aware rather than with plain ``login_required``: on an expired
+    session a 302 would otherwise swap the whole login page into the results
+    panel. Per-source permissions are applied inside ``run_search``.
+    """
+    term = (request.GET.get(GLOBAL_SEARCH_PARAM) or "").strip()
+    search_context = {
+        "search_param": GLOBAL_SEARCH_PARAM,
+        "search_term": term,
+        "groups": run_search(request, term),
     }
-    return TemplateResponse(request, "dashboard/index.html", context)
+
+    if request.htmx:
+        return TemplateResponse(request, "dashboard/index.html#search-results", search_context)
+
+    return TemplateResponse(request, "dashboard/index.html", search_context)
+
+
+@htmx_login_required
+def fragment(request, name):
+    """
+    One piece of the dashboard (see ``FRAGMENTS``), loaded by the page once
+    the page itself is shown, so a slow chart holds up only its own card.
+
+    The tiles come as HTML for HTMX to swap in. A chart comes as its bare
+    data in JSON, with an ETag of that JSON: the browser revalidates on every
+    load and gets a 304 while the numbers are unchanged.
+
+    The time spent getting the content is reported in a ``Server-Timing``
+    header (visible in the browser's network panel), with whether it came from
+    the cache.
+    """
+    if name not in FRAGMENTS:
+        raise Http404(f"No dashboard fragment {name!r}")
+
+    started = time.perf_counter()
+    content, cached = get_fragment(name, request.tenant)
+    duration = (time.perf_counter() - started) * 1000
+
+    _build, partial = FRAGMENTS[name]
+    if partial:
+        response = TemplateResponse(request, f"dashboard/index.html#{partial}", {"content": content})
+    else:
+        response = JsonResponse(content)
+        etag = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+        response = get_conditional_response(request, etag=etag, response=response)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    response["Server-Timing"] = f'{name};desc="{"cached" if cached else "built"}";dur={duration:.1f}'
+    return response
@@ -7,8 +7,10 @@ Importer für Device-Listen im CSV-Format
 """
 
 import csv
+import datetime
 import logging
 import secrets
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from io import StringIO
 
@@ -19,8 +21,11 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.formats import date_format
 from django.utils.translation import gettext as _
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
 
 from dlcdb.core.models import Device, Record
+from dlcdb.core.models.device import CURRENT_FIELDS
+from dlcdb.core.utils.data_generation import bump_data_generation
 from dlcdb.core.utils.helpers import rollback_atomic
 
 from .models import ImporterList
@@ -43,8 +48,8 @@ def _describe_records(records):
     Deliberately terse: the import preview should say what kind of record a row
     produces plus the one or two facts that identify it, not repeat the row.
 
-    Call this only after the records have been saved -- the record proxies stamp
-    ``record_type`` in their ``save()``, so before that the type is still empty.
+    Call this only after the records have been normalised -- the record proxies
+    stamp ``record_type`` in ``normalise()``, so before that the type is still empty.
     """
     if not records:
         return _("new device, no record")
@@ -67,7 +72,7 @@ def _describe_records(records):
     if record.record_type == Record.LOST:
         return _("new device, not locatable")
 
-    # RemovedRecord.save() always stamps a removed_date, so a saved removal has one.
+    # RemovedRecord.normalise() always stamps a removed_date, so a removal has one.
     if record.record_type == Record.REMOVED and record.removed_date:
         removed_date = date_format(timezone.localtime(record.removed_date), format="DATE_FORMAT")
         return _("new device, removed on %(date)s") % {"date": removed_date}
@@ -75,26 +80,141 @@ def _describe_records(records):
     return _("new device, record %(record_type)s") % {"record_type": record.get_record_type_display()}
 
 
-def _import_transaction(*, import_objs, import_format, report, device_objs, tenant=None):
+# Rows per INSERT/UPDATE statement of the bulk writes.
+BATCH_SIZE = 1000
+
+
+class _BulkWrite:
+    """
+    Collects the devices and records an import writes, then writes them
+    set-wise: devices and records with one ``bulk_create`` each, the active
+    records with one ``bulk_update``.
+
+    ``bulk_create`` skips ``save()``, so ``write()`` repeats what
+    ``Device.save()`` and ``Record.save(check_transition=False)`` do on insert:
+    the proxies stamp their fields (``Record.normalise``), the superseded record
+    is closed, the device points at its newest record, the dashboard rollup is
+    booked, the device history gets its rows and everything written is indexed
+    for search.
+    """
+
+    def __init__(self):
+        self.new_devices = []
+        # id(device) -> (device, records in the order they are appended). Keyed
+        # by identity, as new devices have no pk (and no hash) yet.
+        self.chains = {}
+
+    def create(self, device, records):
+        self.new_devices.append(device)
+        self.append(device, records)
+
+    def append(self, device, records):
+        for record in records:
+            record.normalise()
+        self.chains.setdefault(id(device), (device, []))[1].extend(records)
+
+    def write(self, *, user=None):
+        from dlcdb.core import lifecycle
+        from dlcdb.core.models import DeviceStateMonth, SearchDocument
+        from dlcdb.core.models.state_month import append_deltas, month_of
+
+        now = timezone.now()
+        month = month_of(now)
+        chains = [(device, records) for device, records in self.chains.values() if records]
+        existing = [device for device, _records in chains if device.pk is not None]
+        previous_states = {id(device): lifecycle.state_of(device) for device, _records in chains}
+        removed_this_month = set(
+            Record.objects.filter(
+                device__in=existing,
+                record_type=Record.REMOVED,
+                created_at__gte=datetime.datetime.combine(month, datetime.time(), tzinfo=datetime.timezone.utc),
+            ).values_list("device_id", flat=True)
+        )
+
+        bulk_create_with_history(self.new_devices, Device, batch_size=BATCH_SIZE, default_user=user)
+
+        Record.objects.filter(device__in=existing, is_active=True).update(
+            is_active=False, effective_until=now, modified_at=now
+        )
+        for device, records in chains:
+            for record in records:
+                record.device = device  # picks up the pk bulk_create just assigned
+                record.is_active = False
+                record.effective_until = now
+            records[-1].is_active = True
+            records[-1].effective_until = None
+        Record.objects.bulk_create([record for _device, records in chains for record in records], batch_size=BATCH_SIZE)
+
+        deltas = defaultdict(Counter)
+        for device, records in chains:
+            state = previous_states[id(device)]
+            for record in records:
+                first_removal = record.record_type == Record.REMOVED and device.pk not in removed_this_month
+                if first_removal:
+                    removed_this_month.add(device.pk)
+                deltas[device.tenant_id].update(
+                    append_deltas(state, record.record_type, month, first_removal=first_removal)
+                )
+                state = record.record_type
+            device.set_current(records[-1])
+            device.modified_at = now
+        for tenant_id, tenant_deltas in deltas.items():
+            DeviceStateMonth.objects.apply(tenant_deltas, tenant_id=tenant_id)
+
+        bulk_update_with_history(
+            [device for device, _records in chains],
+            Device,
+            ["active_record", *CURRENT_FIELDS, "modified_at"],
+            batch_size=BATCH_SIZE,
+            default_user=user,
+        )
+        # The chains' devices too: their current borrower is part of their document.
+        SearchDocument.objects.index(
+            Device, {device.pk for device in self.new_devices} | {device.pk for device, _records in chains}
+        )
+        SearchDocument.objects.index(Record, [record.pk for _device, records in chains for record in records])
+        bump_data_generation()
+
+
+def _import_transaction(*, import_objs, import_format, report, device_objs, tenant=None, user=None):
+    bulk_write = _BulkWrite()
+
     if import_format == "SAPCSV":
+        # Cases for SAP import:
+        # - sap_id already exists in other tenant -> do nothing, DLCDB data is the leading system
+        # - sap_id does not exist -> create new device for tenant "Foo" and set new record
+        # - sap_id already exists in tenant "Foo" -> update room only (if not already set)
+        # - sap_id exists but deactivated -> set new RemovedRecord (if not already set)
+
+        # One lookup per kind instead of one per row. Devices created by earlier
+        # rows are added as they are planned, so a sap_id or edv_id repeated in
+        # the file behaves as if the rows were written one by one.
+        # The existing devices are locked until the import commits, as
+        # ``lifecycle._load`` locks them for a bulk move: the states read here
+        # are what ``_BulkWrite.write`` then supersedes. ``of``: PostgreSQL
+        # refuses to lock the nullable side of the outer joins.
+        devices_by_sap_id = {
+            device.sap_id: device
+            for device in Device.objects.filter(sap_id__in={import_obj.device.sap_id for import_obj in import_objs})
+            .select_related("tenant", "active_record")
+            .select_for_update(of=("self",))
+        }
+        taken_edv_ids = set(
+            Device.objects.filter(edv_id__in={import_obj.device.edv_id for import_obj in import_objs}).values_list(
+                "edv_id", flat=True
+            )
+        )
+
         for import_obj in import_objs:
             device_obj = import_obj.device
             # SAP imports never produce LENT rows, so records holds 0 or 1 record.
             records = import_obj.records
 
-            # Cases for SAP import:
-            # - sap_id already exists in other tenant -> do nothing, DLCDB data is the leading system
-            # - sap_id does not exist -> create new device for tenant "Foo" and set new record
-            # - sap_id already exists in tenant "Foo" -> update room only (if not already set)
-            # - sap_id exists but deactivated -> set new RemovedRecord (if not already set)
-
-            already_existing_device = Device.objects.filter(sap_id=device_obj.sap_id).first()
+            already_existing_device = devices_by_sap_id.get(device_obj.sap_id)
 
             if already_existing_device and all([already_existing_device.tenant.name == tenant.name, records]):
                 logger.debug("Device %s already exists in tenant %s. Updating record only.", device_obj, tenant)
-                for record_obj in records:
-                    record_obj.device = already_existing_device
-                    record_obj.save(check_transition=False)
+                bulk_write.append(already_existing_device, records)
                 report.add(
                     row=import_obj.row,
                     identifier=import_obj.identifier,
@@ -106,16 +226,18 @@ def _import_transaction(*, import_objs, import_format, report, device_objs, tena
                 logger.debug("Device %s does not exist. Creating new device.", device_obj)
                 detail = ""
 
-                if Device.objects.filter(edv_id=device_obj.edv_id).exists():
+                if device_obj.edv_id in taken_edv_ids:
                     new_edv_id = f"{device_obj.edv_id}-UNIQ{secrets.token_hex(4)}"
                     logger.debug("edv_id %s already exists. Renaming to %s.", device_obj.edv_id, new_edv_id)
                     detail = _("edv_id collision -> %(new_edv_id)s") % {"new_edv_id": new_edv_id}
                     device_obj.edv_id = new_edv_id
 
-                device_obj.save()
+                bulk_write.create(device_obj, records)
+                if device_obj.sap_id:
+                    devices_by_sap_id[device_obj.sap_id] = device_obj
+                if device_obj.edv_id:
+                    taken_edv_ids.add(device_obj.edv_id)
                 device_objs.append(device_obj)
-                for record_obj in records:
-                    record_obj.save(check_transition=False)
                 report.add(
                     row=import_obj.row,
                     identifier=import_obj.identifier,
@@ -139,15 +261,13 @@ def _import_transaction(*, import_objs, import_format, report, device_objs, tena
 
     else:
         for import_obj in import_objs:
-            import_obj.device.save()
-            device_objs.append(import_obj.device)
-            # Save records in order; the last one saved becomes the active record
+            # Records are written in order; the last one becomes the active record
             # (e.g. for a completed loan: LENT first, then the active INROOM).
-            # check_transition=False: the import replays arbitrary historical
-            # chains (a device may be imported straight into any state), which the
-            # live lifecycle would reject.
-            for record_obj in import_obj.records:
-                record_obj.save(check_transition=False)
+            # No lifecycle check: the import replays arbitrary historical chains
+            # (a device may be imported straight into any state), which the live
+            # lifecycle would reject.
+            bulk_write.create(import_obj.device, import_obj.records)
+            device_objs.append(import_obj.device)
             report.add(
                 row=import_obj.row,
                 identifier=import_obj.identifier,
@@ -155,6 +275,7 @@ def _import_transaction(*, import_objs, import_format, report, device_objs, tena
                 detail=_describe_records(import_obj.records),
             )
 
+    bulk_write.write(user=user)
     return device_objs
 
 
@@ -166,8 +287,8 @@ class ImportObject:
 
     A single CSV row usually maps to one record, but a completed loan (a LENT
     row with a lent_end_date) maps to two ordered records: the LENT record
-    followed by an INROOM record. Records are saved in list order; the last
-    one saved becomes the device's active record.
+    followed by an INROOM record. Records are written in list order; the last
+    one becomes the device's active record.
     """
 
     device: Device
@@ -263,7 +384,6 @@ def create_devices(*, rows, report, importer_inst_pk=None, import_format=None, t
         import_objs.append(ImportObject(device=device_obj, records=record_objs, row=idx, identifier=identifier))
 
     try:
-        # As bulk_create() does not call model.save() method, we do not use it for now
         logger.debug("%s transaction...", "Write" if write else "Simulate")
         device_objs = _import_transaction(
             import_objs=import_objs,
@@ -271,6 +391,7 @@ def create_devices(*, rows, report, importer_inst_pk=None, import_format=None, t
             report=report,
             device_objs=device_objs,
             tenant=tenant,
+            user=user_obj,
         )
     except IntegrityError as integrity_error:
         raise IntegrityError(f"IntegrityError {integrity_error}")
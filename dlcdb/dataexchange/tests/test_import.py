@@ -490,3 +490,43 @@ def test_import_report_details_describe_the_records(tenant):
             "new device, not locatable",
             "new device, no record",
         ]
+
+
+@pytest.mark.django_db
+def test_bulk_import_writes_devices_and_records_set_wise(tenant):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from dlcdb.core.models import DeviceStateMonth
+
+    csv_path = TEST_DATA_DIR / "devices.correct.csv"
+
+    with CaptureQueriesContext(connection) as queries:
+        with open(csv_path, "rb") as csv_file:
+            import_data(
+                csv_file,
+                importer_inst_pk=None,
+                valid_col_headers=ImporterList.VALID_COL_HEADERS,
+                import_format=ImporterList.ImportFormatChoices.INTERNALCSV,
+                tenant=tenant,
+                username="pytestuser",
+                write=True,
+            )
+
+    def inserts_into(table):
+        return sum(query["sql"].startswith(f'INSERT INTO "{table}"') for query in queries)
+
+    assert inserts_into("core_device") == 1
+    assert inserts_into("core_record") == 1
+
+    # Each device points at its last record, which is the only active one, and
+    # carries its current-state columns.
+    for device in Device.objects.all():
+        assert list(device.record_set.filter(is_active=True)) == [device.active_record]
+        assert device.current_state == device.active_record.record_type
+        assert device.current_room_id == device.active_record.room_id
+
+    # The dashboard rollup was booked as if every record had been saved singly.
+    booked = sorted(DeviceStateMonth.objects.exclude(delta=0).values_list("tenant_id", "month", "record_type", "delta"))
+    DeviceStateMonth.objects.rebuild()
+    assert sorted(DeviceStateMonth.objects.values_list("tenant_id", "month", "record_type", "delta")) == booked
@@ -47,9 +47,7 @@ class DeviceFilter(django_filters.FilterSet):
 
     q = django_filters.CharFilter(method="string_search_filter", label="Search devices")
     device_type = django_filters.ModelChoiceFilter(queryset=DeviceType.objects.all(), label="Geräteklasse")
-    record = django_filters.ChoiceFilter(
-        field_name="active_record__record_type", choices=Record.RECORD_TYPE_CHOICES, label="Record"
-    )
+    record = django_filters.ChoiceFilter(field_name="current_state", choices=Record.RECORD_TYPE_CHOICES, label="Record")
     not_already_inventorized = django_filters.ChoiceFilter(
         field_name="not_already_inventorized",
         method="filter_not_already_inventorized",
@@ -49,7 +49,7 @@ class Command(BaseCommand):
         )
 
     def get_lenders_qs(self, devices_qs):
-        lenders_pks = set(devices_qs.values_list("active_record__person__pk", flat=True))
+        lenders_pks = set(devices_qs.values_list("current_person_id", flat=True))
         lenders_qs = Person.objects.filter(pk__in=lenders_pks).order_by("email")
         return lenders_qs
 
@@ -59,7 +59,7 @@ class Command(BaseCommand):
 
         for lender in self.get_lenders_qs(devices):
             logger.debug(f"Processing lender: {lender}")
-            lent_devices = devices.filter(active_record__person=lender).order_by("device_type")
+            lent_devices = devices.filter(current_person=lender).order_by("device_type")
 
             lender_email = lender.get_email
             if not lender_email:
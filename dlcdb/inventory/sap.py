@@ -4,10 +4,10 @@
 
 import csv
 import os
+from collections import defaultdict
 
 from django.conf import settings
 from django.db import transaction
-from django.core.exceptions import ValidationError
 
 from .utils import unique_seq
 
@@ -15,6 +15,7 @@ from .utils import unique_seq
 def get_match_for_sap_id(sap_ids, sap_anlagennummer, sap_anlagenunternummer=None, return_type=None):
     """
     Return_type: None (message) or "device_sap_id"
+    sap_ids: pass a set (or dict), each row does up to three lookups in it.
     Note: This should not be needed any more, since we should now only have valid
     and complete SAP IDs in our system. Notation: `Hauptnummer-Unternummer`.
     """
@@ -92,6 +93,112 @@ def create_sap_list_comparison(sap_list_obj):
             comparison.save()
 
 
+class SapComparison:
+    """
+    The lookup tables behind ``compare_sap``, each loaded with one query:
+    devices by sap_id, the latest current-inventory record, the last-found
+    timestamp and the inventory notes by device. ``compare_row`` then needs
+    no further queries, so a comparison is linear in the size of the SAP list
+    plus the size of the DLCDB.
+    """
+
+    def __init__(self, current_inventory):
+        from django.db.models import Max
+
+        from dlcdb.core.models import Device, Note, Record
+
+        self.current_inventory = current_inventory
+
+        devices = Device.objects.exclude(sap_id__isnull=True).exclude(sap_id="")
+        self.devices = {
+            device.sap_id: device for device in devices.select_related("tenant", "active_record", "active_record__room")
+        }
+
+        self.inventorized_records = {}
+        records = Record.objects.filter(inventory=current_inventory, device__in=devices)
+        for record in records.select_related("room").order_by("device_id", "pk"):
+            self.inventorized_records[record.device_id] = record  # the latest one wins
+
+        self.last_found = dict(
+            Record.objects.filter(device__in=devices, record_type__in=[Record.INROOM, Record.LENT])
+            .values("device_id")
+            .annotate(last_found=Max("created_at"))
+            .values_list("device_id", "last_found")
+        )
+
+        self.notes = defaultdict(list)
+        for device_id, text in (
+            Note.objects.filter(inventory=current_inventory, device__in=devices)
+            .order_by("pk")
+            .values_list("device_id", "text")
+        ):
+            self.notes[device_id].append(text)
+
+    def compare_row(self, row):
+        """Enrich a row of the SAP list with the device's state in the DLCDB."""
+        new_row = row
+        sap_id = get_match_for_sap_id(self.devices, row["Anlage"], row["Unternummer"], return_type="device_sap_id")
+
+        if not sap_id:
+            # SAP-ID not found in DLDB
+            new_row.update({"IN_DLCDB?": "NOT IN DLCDB", "NOTE": ""})
+            return new_row
+
+        device = self.devices[sap_id]
+        active_record = device.active_record
+        inventorized_record = self.inventorized_records.get(device.pk)
+
+        # Defaults
+        record_for_sap = None
+        record_inventory = "FALSE"
+
+        # Find the record to be listed in sap comparison
+        if inventorized_record and active_record and inventorized_record.id < active_record.id:
+            # This device has an inventorized record but newer records
+            # exist so we pick the newest (active) record for sap
+            # compare sheet.
+            record_for_sap = active_record
+            record_inventory = self.current_inventory.name
+        elif inventorized_record and active_record:
+            # The inventorized record is the active record, no newer
+            # records exist
+            record_for_sap = inventorized_record
+            record_inventory = self.current_inventory.name
+        elif active_record and not inventorized_record:
+            # This device has no inventorized record but an active
+            # record.
+            record_for_sap = active_record
+
+        # Finally set data for sap comparison csv file
+        if record_for_sap:
+            old_room = row["Raum"]
+            new_room = record_for_sap.room.number if record_for_sap.room else ""
+            last_found = self.last_found.get(device.pk)
+
+            new_row.update(
+                {
+                    "TENANT": device.tenant,
+                    "CURRENT INVENTORY": record_inventory,
+                    # The stable record-type key, not the display label:
+                    # this column must not change with the UI language.
+                    "TYPE": record_for_sap.record_type,
+                    "LAST_FOUND": f"{last_found:%Y-%m-%d}" if last_found else "",
+                    "OLD ROOM": old_room,
+                    "NEW ROOM": new_room,
+                    "ROOM NEQ": old_room != new_room,
+                    "REC CREATED_AT": f"{record_for_sap.created_at:%Y-%m-%d}",
+                    "REC CREATED BY": record_for_sap.username,
+                }
+            )
+        else:
+            # there is no record for this device
+            new_row.update({"CURRENT RECORD?": "NO RECORD"})
+
+        # Append inventory notes for this device
+        new_row.update({"NOTE": "; ".join(self.notes.get(device.pk, []))})
+        return new_row
+
+
 def compare_sap(sap_list_obj):
     """
     Compare the current state of the DLCDB with an Excel spreadsheet:
@@ -99,97 +206,12 @@ def compare_sap(sap_list_obj):
     information (row) of the given SAP_ID in the spreadsheet (basically)
     appending columns).
     """
-    from dlcdb.core.models import Inventory, Device
+    from dlcdb.core.models import Inventory
 
     file_path = sap_list_obj.file.path
     current_inventory = Inventory.objects.get(is_active=True)
-
-    device_sap_ids = list(Device.objects.values_list("sap_id", flat=True))
-    device_sap_ids = list(filter(None, device_sap_ids))
-
-    new_rows = []
+    comparison = SapComparison(current_inventory)
 
     with open(file_path, "r", encoding="utf-8") as f:
         rows = csv.DictReader(f, delimiter=",")
-
-        for row in rows:
-            new_row = row
-            sap_id = get_match_for_sap_id(
-                device_sap_ids, row["Anlage"], row["Unternummer"], return_type="device_sap_id"
-            )
-
-            if sap_id:
-                obj = Device.objects.get(sap_id=sap_id)
-                inventorized_records = obj.get_current_inventory_records
-                active_record = obj.active_record
-
-                # inventorized_records is a queryset off all inventorized records
-                # for this device. We need to check if the latest inventorized record.
-                inventorized_record = inventorized_records.last() if inventorized_records else None
-
-                if inventorized_record:
-                    if inventorized_record.inventory != current_inventory:
-                        raise ValidationError(
-                            f"{inventorized_record.inventory.name=} does not match {current_inventory.name=}. Exit!"
-                        )
-
-                # Defaults
-                record_for_sap = None
-                record_inventory = "FALSE"
-
-                # Find the record to be listed in sap comparison
-                if inventorized_records and active_record and inventorized_record.id < active_record.id:
-                    # This device has an inventorized record but newer records
-                    # exist so we pick the newest (active) record for sap
-                    # compare sheet.
-                    record_for_sap = active_record
-                    record_inventory = inventorized_record.inventory.name
-                elif inventorized_record and active_record:
-                    # The inventorized record is the active record, no newer
-                    # records exist
-                    record_for_sap = inventorized_record
-                    record_inventory = inventorized_record.inventory.name
-                elif active_record and not inventorized_record:
-                    # This device has no inventorized record but an active
-                    # record.
-                    record_for_sap = active_record
-
-                # Finally set data for sap comparison csv file
-                if record_for_sap:
-                    old_room = row["Raum"]
-                    new_room = record_for_sap.room.number if record_for_sap.room else ""
-                    last_found = record_for_sap.get_last_found()
-
-                    new_row.update(
-                        {
-                            "TENANT": record_for_sap.device.tenant,
-                            "CURRENT INVENTORY": record_inventory,
-                            # The stable record-type key, not the display label:
-                            # this column must not change with the UI language.
-                            "TYPE": record_for_sap.record_type,
-                            "LAST_FOUND": f"{last_found:%Y-%m-%d}",
-                            "OLD ROOM": old_room,
-                            "NEW ROOM": new_room,
-                            "ROOM NEQ": old_room != new_room,
-                            "REC CREATED_AT": f"{record_for_sap.created_at:%Y-%m-%d}",
-                            "REC CREATED BY": record_for_sap.username,
-                        }
-                    )
-                else:
-                    # there is no record for this device
-                    new_row.update({"CURRENT RECORD?": "NO RECORD"})
-
-            else:
-                # SAP-ID not found in DLDB
-                new_row.update({"IN_DLCDB?": "NOT IN DLCDB"})
-
-            # Append inventory notes for this device
-            # A DLCDB inventory note could exists even if the given device does not
-            # exist in the SAP file.
-            if current_inventory:
-                notes = obj.device_notes.filter(inventory=current_inventory).values_list("text", flat=True)
-                new_row.update({"NOTE": "; ".join(notes)})
-
-            new_rows.append(new_row)
-
-    return new_rows
+        return [comparison.compare_row(row) for row in rows]
@@ -2,12 +2,15 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+import datetime
 import json
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from dlcdb.core.lifecycle import IllegalTransition
-from dlcdb.core.models import Inventory, InRoomRecord, Record, Note
+from dlcdb.core.models import Device, Inventory, InRoomRecord, LentRecord, Record, Note
 from dlcdb.inventory.utils import update_inventory_note
 
 
@@ -183,3 +186,46 @@ def test_inventorize_uuids_unknown(device_1, room_1, external_room, inventory_1,
     assert inventory_note.count() == 1
 
     assert f"Device marked as 'unknown state' during inventory by {user}." in inventory_note.get().text
+
+
+@pytest.mark.django_db
+def test_inventorize_uuids_lent_device_not_found(lentable_device, room_1, external_room, inventory_1, user):
+    InRoomRecord.objects.create(device=lentable_device, room=room_1)
+    lending = LentRecord.objects.create(device=lentable_device, room=room_1, lent_start_date=datetime.date.today())
+
+    uuids_states = {str(lentable_device.uuid): "dev_state_notfound"}
+    Inventory.inventorize_uuids_for_room(uuids=json.dumps(uuids_states), room_pk=room_1.pk, user=user)
+
+    # The lending continues, it just moved to the external room.
+    lentable_device.refresh_from_db()
+    assert lentable_device.active_record.pk == lending.pk
+    assert lentable_device.active_record.room == external_room
+    note = Note.objects.get(device=lentable_device, inventory=inventory_1)
+    assert f"not found in expected location `{room_1}" in note.text
+
+
+@pytest.mark.django_db
+def test_inventorize_uuids_accepts_any_uuid_form(device_1, room_1, external_room, inventory_1, user):
+    uuids_states = {device_1.uuid.hex.upper(): "dev_state_found"}
+    Inventory.inventorize_uuids_for_room(uuids=json.dumps(uuids_states), room_pk=room_1.pk, user=user)
+
+    device_1.refresh_from_db()
+    assert device_1.active_record.room == room_1
+    assert device_1.active_record.inventory == inventory_1
+
+
+@pytest.mark.django_db
+def test_inventorize_uuids_query_count_is_independent_of_room_size(room_1, external_room, inventory_1, user):
+    def _inventorize(count):
+        uuids_states = {}
+        for state in ("dev_state_found", "dev_state_notfound", "dev_state_unknown"):
+            for _ in range(count):
+                device = Device.objects.create()
+                InRoomRecord.objects.create(device=device, room=room_1, inventory=inventory_1)
+                uuids_states[str(device.uuid)] = state
+        with CaptureQueriesContext(connection) as queries:
+            Inventory.inventorize_uuids_for_room(uuids=json.dumps(uuids_states), room_pk=room_1.pk, user=user)
+        return len(queries)
+
+    _inventorize(1)  # creates this month's rollup rows, which later runs only update
+    assert _inventorize(2) == _inventorize(10)
@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from dlcdb.core.models import Device
+from dlcdb.inventory.views import qrcode_image
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    cache.clear()
+
+
+def _get(user, url, **headers):
+    request = RequestFactory().get(url, headers=headers)
+    request.user = user
+    match = resolve(url)
+    return qrcode_image(request, **match.kwargs)
+
+
+@pytest.mark.django_db
+def test_device_save_writes_no_qrcode_file():
+    device = Device.objects.create()
+    assert not device.qrcode
+
+
+@pytest.mark.django_db
+def test_qrcode_is_rendered_cached_and_revalidated(user, django_assert_num_queries):
+    device = Device.objects.create()
+    url = device.get_qrcode_url()
+
+    with django_assert_num_queries(0):
+        response = _get(user, url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/svg+xml"
+    assert "max-age=" in response["Cache-Control"]
+
+    # Served from the cache, and a browser holding the ETag gets a 304.
+    assert _get(user, url).content == response.content
+    assert _get(user, url, if_none_match=response["ETag"]).status_code == 304
+
+
+@pytest.mark.django_db
+def test_qrcode_png_for_printing(user):
+    device = Device.objects.create()
+    response = _get(user, device.get_qrcode_url(kind="png"))
+    assert response["Content-Type"] == "image/png"
+    assert response.content.startswith(b"\x89PNG")
+
+
+@pytest.mark.django_db
+def test_qrcode_unknown_type_or_format(user, plain_device):
+    for obj_type, kind in (("person", "svg"), ("device", "gif")):
+        url = reverse("inventory:qrcode", kwargs={"obj_type": obj_type, "obj_uuid": plain_device.uuid, "kind": kind})
+        with pytest.raises(Http404):
+            _get(user, url)
@@ -0,0 +1,41 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from dlcdb.core.models import Device, InRoomRecord, Note, Record
+from dlcdb.inventory.sap import SapComparison
+
+
+def _row(anlage, unternummer, raum="456"):
+    return {"Anlage": anlage, "Unternummer": unternummer, "Raum": raum}
+
+
+@pytest.mark.django_db
+def test_sap_comparison(room_1, room_2, inventory_1):
+    exact = Device.objects.create(sap_id="100-0")
+    InRoomRecord.objects.create(device=exact, room=room_1, inventory=inventory_1)
+    main_number_only = Device.objects.create(sap_id="200")
+    InRoomRecord.objects.create(device=main_number_only, room=room_1, inventory=inventory_1)
+    InRoomRecord.objects.create(device=main_number_only, room=room_2)
+    Note.objects.create(device=main_number_only, inventory=inventory_1, text="behind the rack")
+
+    comparison = SapComparison(inventory_1)
+    with CaptureQueriesContext(connection) as queries:
+        rows = [comparison.compare_row(row) for row in (_row("100", "0"), _row("200", "7"), _row("300", "0"))]
+    assert len(queries) == 0
+
+    assert rows[0]["TYPE"] == Record.INROOM
+    assert rows[0]["CURRENT INVENTORY"] == inventory_1.name
+    assert rows[0]["ROOM NEQ"] is False
+
+    # A newer record than the inventorized one is listed, the inventory still is.
+    assert rows[1]["NEW ROOM"] == room_2.number
+    assert rows[1]["CURRENT INVENTORY"] == inventory_1.name
+    assert rows[1]["NOTE"] == "behind the rack"
+
+    assert rows[2]["IN_DLCDB?"] == "NOT IN DLCDB"
+    assert rows[2]["NOTE"] == ""
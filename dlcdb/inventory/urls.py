@@ -10,6 +10,7 @@ app_name = "inventory"
 urlpatterns = [
     path("", views.InventorizeRoomListView.as_view(), name="inventorize-room-list"),
     path("room/<int:pk>/qrs/", views.QrCodesForRoomDetailView.as_view(), name="qr-room-printout"),
+    path("qrcode/<str:obj_type>/<uuid:obj_uuid>.<str:kind>", views.qrcode_image, name="qrcode"),
     path("room/<int:pk>/", views.InventorizeRoomView.as_view(), name="inventorize-room"),
     path("note-btn/<str:obj_type>/<uuid:obj_uuid>/", views.get_note_btn, name="get_note_btn"),
     path("note/<int:pk>/delete/", views.delete_note_view, name="note-delete"),
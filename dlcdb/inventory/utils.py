@@ -11,20 +11,28 @@ from django.conf import settings
 from django.core.files.base import ContentFile
 
 
-def uuid2qrcode(uuid, infix=None):
-    qrcode = namedtuple("qrcode", ["filename", "fileobj"])
-
-    uuid = str(uuid)  # Ensure uuid is a string and not an instance of UUID
-    qr_text = "{prefix}{infix}{uuid}".format(
-        uuid=uuid,
+def qrcode_text(uuid, infix=None):
+    """The text encoded in the QR code for ``uuid``, as the scanner expects it."""
+    return "{prefix}{infix}{uuid}".format(
+        uuid=str(uuid),  # Ensure uuid is a string and not an instance of UUID
         prefix=settings.QRCODE_PREFIX,
         infix=infix if infix else "",
     )
-    qr_filename = "{0}.svg".format(qr_text)
+
+
+def uuid2qrcode(uuid, infix=None, kind="svg", scale=1):
+    """
+    Render the QR code for ``uuid``. ``kind`` is "svg" or "png"; ``scale`` is
+    the size of one module in pixels (PNG) or user units (SVG).
+    """
+    qrcode = namedtuple("qrcode", ["filename", "fileobj"])
+
+    qr_text = qrcode_text(uuid, infix)
+    qr_filename = "{0}.{1}".format(qr_text, kind)
     qr_fileobj = segno.make(qr_text)
 
     _fileobj_io = BytesIO()
-    qr_fileobj.save(_fileobj_io, "SVG")
+    qr_fileobj.save(_fileobj_io, kind=kind, scale=scale)
     qr_fileobj = ContentFile(_fileobj_io.getvalue())
 
     return qrcode(qr_filename, qr_fileobj)
@@ -57,3 +65,37 @@ def update_inventory_note(*, inventory, device, msg):
     inventory_note_obj.save()
 
     return inventory_note_obj
+
+
+def update_inventory_notes(*, inventory, messages, separator="; "):
+    """
+    ``update_inventory_note`` for many devices at once: ``messages`` maps
+    device pks to the message to append. Existing notes are read in one query
+    and written back in one bulk update, missing ones are bulk-created.
+    """
+
+    from django.utils import timezone
+
+    from dlcdb.core.models import Note
+
+    if not messages:
+        return []
+
+    notes = {}
+    for note in Note.objects.filter(inventory=inventory, device__in=messages).order_by("-pk"):
+        notes[note.device_id] = note  # the oldest note per device wins, like get_or_create
+
+    now = timezone.now()
+    for note in notes.values():
+        note.text = f"{note.text}{separator if note.text else ''}{messages[note.device_id]}"
+        note.updated_at = now  # bulk_update skips auto_now
+    Note.objects.bulk_update(notes.values(), ["text", "updated_at"])
+
+    created = Note.objects.bulk_create(
+        [
+            Note(inventory=inventory, device_id=device_pk, text=msg)
+            for device_pk, msg in messages.items()
+            if device_pk not in notes
+        ]
+    )
+    return [*notes.values(), *created]
@@ -26,9 +26,12 @@ TODO:
 * Refactor some CBVs to be FBVs
 """
 
+import hashlib
 import json
 from datetime import date
 
+import segno
+
 from django.conf import settings
 from django.shortcuts import render
 from django.urls import reverse
@@ -36,7 +39,15 @@ from django.views import View
 from django.views.generic import DetailView, FormView
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.base import TemplateView
-from django.http import HttpResponse, HttpResponseForbidden, HttpResponseServerError, HttpResponseRedirect, JsonResponse
+from django.core.cache import cache
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponseServerError,
+    HttpResponseRedirect,
+    JsonResponse,
+)
 from django.template.response import TemplateResponse
 from django.template.loader import render_to_string
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -44,12 +55,15 @@ from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.decorators import permission_required
 from django.contrib import messages
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.core.paginator import Paginator
 from django.core.exceptions import ObjectDoesNotExist
 
 from django_filters.views import FilterView
 
+from dlcdb.core import lifecycle
 from dlcdb.core.lifecycle import IllegalTransition
 from dlcdb.core.models import Room, Device, Inventory, Note
 from dlcdb.core.utils.helpers import get_user_email
@@ -59,6 +73,7 @@ from .sap import create_sap_list_comparison
 from .filters import RoomFilter, DeviceFilter
 from .forms import InventorizeRoomForm, DeviceAddForm, NoteForm
 from .models import SapList
+from .utils import qrcode_text, uuid2qrcode
 
 
 @login_required
@@ -109,7 +124,7 @@ def inventorize_room(request, pk):
         # Allow only adding devices which are not already present in this room:
         add_devices_qs = Inventory.objects.tenant_aware_device_objects(
             tenant=tenant, is_superuser=is_superuser
-        ).exclude(active_record__room=pk)
+        ).exclude(current_room=pk)
 
         device_add_form = DeviceAddForm(
             add_devices_qs=add_devices_qs,
@@ -242,16 +257,21 @@ def search_devices(request):
     request_copy = request.GET.copy()
     parameters = request_copy.pop("page", True) and request_copy.urlencode()
 
-    paginator = Paginator(filter_devices.qs, 25)
+    paginator = Paginator(
+        filter_devices.qs.select_related("active_record", "active_record__room", "active_record__person"), 25
+    )
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
     # Add a custom attribute to each device in the current page
+    available = lifecycle.available_for(page_obj, user=request.user)
     for device in page_obj:
         device.state_data_rendered = render_to_string(
             "core/device/state_btn_group.html",
             {
-                "state_data": device.get_state_data(user=request.user, app_name="inventory"),
+                "state_data": device.get_state_data(
+                    user=request.user, app_name="inventory", transitions=available[device.pk]
+                ),
                 "size": "sm",
             },
         )
@@ -276,10 +296,62 @@ class QrCodesForRoomDetailView(LoginRequiredMixin, DetailView):
             self.object.pk, tenant=self.request.tenant, is_superuser=self.request.user.is_superuser
         )
         context = super().get_context_data(**kwargs)
-        context["devices"] = devices
+        # One query for count and rows; the codes themselves are separate,
+        # cached image requests (qrcode_image).
+        context["devices"] = list(devices)
         return context
 
 
+# A QR code is a pure function of its text, format and scale, so the rendered
+# bytes are cached under a hash of exactly those and never go stale.
+QRCODE_CACHE_TIMEOUT = 60 * 60 * 24 * 30
+QRCODE_CONTENT_TYPES = {"svg": "image/svg+xml", "png": "image/png"}
+# Pixels per module for PNGs: ~370 px per code, sharp on a 300 dpi label printer.
+QRCODE_PNG_SCALE = 10
+
+
+def _qrcode_key(obj_type, obj_uuid, kind):
+    infix = settings.QRCODE_INFIXES[obj_type]
+    scale = QRCODE_PNG_SCALE if kind == "png" else 1
+    return hashlib.sha256(f"{qrcode_text(obj_uuid, infix)}:{kind}:{scale}:{segno.__version__}".encode()).hexdigest()
+
+
+def _qrcode_etag(request, obj_type, obj_uuid, kind):
+    if obj_type not in settings.QRCODE_INFIXES or kind not in QRCODE_CONTENT_TYPES:
+        return None
+    return _qrcode_key(obj_type, obj_uuid, kind)
+
+
+@login_required
+@condition(etag_func=_qrcode_etag)
+def qrcode_image(request, obj_type, obj_uuid, kind):
+    """
+    The QR code of a device or room, rendered from its uuid on first request.
+
+    Nothing is read from the database or the disk: the code depends on the
+    uuid alone. Browsers revalidate with the ETag (a 304, no rendering) and
+    otherwise keep the image for a month.
+    """
+    if obj_type not in settings.QRCODE_INFIXES or kind not in QRCODE_CONTENT_TYPES:
+        raise Http404
+
+    cache_key = f"qrcode:{_qrcode_key(obj_type, obj_uuid, kind)}"
+    content = cache.get(cache_key)
+    if content is None:
+        qrcode = uuid2qrcode(
+            obj_uuid,
+            infix=settings.QRCODE_INFIXES[obj_type],
+            kind=kind,
+            scale=QRCODE_PNG_SCALE if kind == "png" else 1,
+        )
+        content = qrcode.fileobj.read()
+        cache.set(cache_key, content, QRCODE_CACHE_TIMEOUT)
+
+    response = HttpResponse(content, content_type=QRCODE_CONTENT_TYPES[kind])
+    patch_cache_control(response, private=True, max_age=QRCODE_CACHE_TIMEOUT, immutable=True)
+    return response
+
+
 class InventoryReportView(TemplateView):
     template_name = "inventory/inventorize_report.html"
 
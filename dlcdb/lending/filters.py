@@ -8,7 +8,7 @@ import django_filters
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
-from dlcdb.core.models import LentRecord, Record, DeviceType, Person
+from dlcdb.core.models import LentRecord, Record, DeviceType, Person, SearchDocument
 
 # Lending state keys. This filter is the single source of truth for lending
 # state in the standalone lending app; it intentionally does not import from
@@ -73,17 +73,8 @@ class LentRecordFilter(django_filters.FilterSet):
         fields = ["search", "state", "device__device_type", "person", "ordering"]
 
     def search_filter_method(self, queryset, name, value):
-        return queryset.filter(
-            Q(device__edv_id__icontains=value)
-            | Q(device__sap_id__icontains=value)
-            | Q(device__manufacturer__name__icontains=value)
-            | Q(device__series__icontains=value)
-            | Q(person__first_name__icontains=value)
-            | Q(person__last_name__icontains=value)
-            | Q(person__email__icontains=value)
-            | Q(lent_note__icontains=value)
-            | Q(lent_accessories__icontains=value)
-        )
+        # Matches the fields of SEARCH_INDEXES["lending"] (core/models/search_document.py).
+        return SearchDocument.objects.search(queryset, "lending", value)
 
     def state_filter_method(self, queryset, name, value):
         if value == STATE_OVERDUE:
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.8 on 2026-10-18 17:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('licenses', '0002_licenseasset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='licensesconfiguration',
+            name='subscriptions_synced_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
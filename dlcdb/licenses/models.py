@@ -26,6 +26,9 @@ class LicensesConfiguration(SingletonBaseModel):
         blank=True,
         help_text=_("These subscribers will be added to all new licenses by default."),
     )
+    # High-water mark of Device.contract_changed_at: contract changes up to
+    # here have been applied to the license subscriptions.
+    subscriptions_synced_until = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return "Licenses configuration"
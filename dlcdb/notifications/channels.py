@@ -7,7 +7,7 @@ import os
 
 from django.conf import settings
 from django.utils import timezone
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 
 from .models import Message
 
@@ -40,47 +40,67 @@ class NotificationChannel:
         """
         raise NotImplementedError("Subclasses must implement send method")
 
+    @classmethod
+    def send_batch(cls, messages):
+        """
+        Send several notifications via this channel
+
+        Channels that can share a connection between messages override this.
+
+        Returns:
+            dict: Success status by message id
+        """
+        return {message.id: cls.send(message) for message in messages}
+
 
 class EmailChannel(NotificationChannel):
     """Email notification channel"""
 
+    @staticmethod
+    def build_email(message):
+        """The EmailMessage for ``message``, or None if it has no recipient."""
+        subject, body = message.get_content()
+        to = message.get_recipients()
+
+        # Without this guard, EmailMessage.send() with no recipients
+        # silently sends nothing and the message would be marked SENT.
+        if not to:
+            return None
+
+        email = EmailMessage(
+            subject=f"{settings.EMAIL_SUBJECT_PREFIX} {subject}",
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=to,
+            cc=[message.cc_email] if message.cc_email else None,
+        )
+
+        # Attach the report spreadsheet, if any. Read via the storage
+        # API, so this also works for non-filesystem storages.
+        if message.report and message.report.spreadsheet:
+            email.attach(
+                os.path.basename(message.report.spreadsheet.name),
+                message.report.spreadsheet.read(),
+                XLSX_CONTENT_TYPE,
+            )
+        return email
+
     @classmethod
     def send(cls, message):
         """Send notification via email"""
         try:
-            subject, body = message.get_content()
-            to = message.get_recipients()
-
-            # Without this guard, EmailMessage.send() with no recipients
-            # silently sends nothing and the message would be marked SENT.
-            if not to:
+            email = cls.build_email(message)
+            if email is None:
                 mark_message_failed(message, "No recipient email address")
                 logger.warning(f"No recipient email address for message {message.id}")
                 return False
 
-            email = EmailMessage(
-                subject=f"{settings.EMAIL_SUBJECT_PREFIX} {subject}",
-                body=body,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=to,
-                cc=[message.cc_email] if message.cc_email else None,
-            )
-
-            # Attach the report spreadsheet, if any. Read via the storage
-            # API, so this also works for non-filesystem storages.
-            if message.report and message.report.spreadsheet:
-                email.attach(
-                    os.path.basename(message.report.spreadsheet.name),
-                    message.report.spreadsheet.read(),
-                    XLSX_CONTENT_TYPE,
-                )
-
             email.send(fail_silently=False)
 
             message.status = Message.STATUS_SENT
             message.sent_at = timezone.now()
             message.save()
-            logger.info(f"Email sent for message {message.id} to {to}")
+            logger.info(f"Email sent for message {message.id} to {email.to}")
             return True
 
         except Exception as e:
@@ -88,6 +108,70 @@ class EmailChannel(NotificationChannel):
             logger.exception(f"Failed to send email for message {message.id}: {str(e)}")
             return False
 
+    @classmethod
+    def send_batch(cls, messages):
+        """
+        Send several messages over one SMTP connection.
+
+        The connection is opened once for the whole batch instead of once per
+        message. When a delivery fails on the connection (dropped session,
+        server timeout), it is reopened and the message retried once before
+        it is marked failed. Each status is written as soon as it is known, so
+        a batch cut short (an unexpected error, a killed worker) does not send
+        its delivered messages again on the next run.
+        """
+        messages = list(messages)
+        results = {}
+        connection = get_connection(fail_silently=False)
+        try:
+            for message in messages:
+                results[message.id] = cls._send_on(connection, message)
+                message.modified_at = timezone.now()
+                Message.objects.filter(pk=message.pk).update(
+                    status=message.status,
+                    sent_at=message.sent_at,
+                    error_message=message.error_message,
+                    modified_at=message.modified_at,
+                )
+        finally:
+            connection.close()
+        return results
+
+    @classmethod
+    def _send_on(cls, connection, message):
+        """Send ``message`` over ``connection``, setting (not saving) its status."""
+        try:
+            email = cls.build_email(message)
+        except Exception as e:
+            message.status, message.error_message = Message.STATUS_FAILED, str(e)
+            logger.exception(f"Failed to build email for message {message.id}")
+            return False
+        if email is None:
+            message.status, message.error_message = Message.STATUS_FAILED, "No recipient email address"
+            logger.warning(f"No recipient email address for message {message.id}")
+            return False
+
+        for attempt in (1, 2):
+            try:
+                connection.open()  # no-op while the session is still up
+                connection.send_messages([email])
+                break
+            except OSError as e:  # smtplib.SMTPException and socket errors
+                logger.warning(f"Sending message {message.id} failed (attempt {attempt}): {e}")
+                connection.close()
+                if attempt == 2:
+                    message.status, message.error_message = Message.STATUS_FAILED, str(e)
+                    return False
+            except Exception as e:
+                message.status, message.error_message = Message.STATUS_FAILED, str(e)
+                logger.exception(f"Failed to send email for message {message.id}")
+                return False
+
+        message.status = Message.STATUS_SENT
+        message.sent_at = timezone.now()
+        logger.info(f"Email sent for message {message.id} to {email.to}")
+        return True
+
 
 # Registry of available channels
 CHANNELS = {
@@ -119,3 +203,23 @@ def send_via_all_channels(message):
             logger.exception(f"Error in {channel_name} channel for message {message.id}: {str(e)}")
 
     return success
+
+
+def send_batch_via_all_channels(messages):
+    """
+    Send messages through all available channels, batched per channel
+
+    Returns:
+        set: Ids of the messages for which any channel succeeded
+    """
+    succeeded = set()
+
+    for channel_name, channel_class in CHANNELS.items():
+        try:
+            results = channel_class.send_batch(messages)
+        except Exception:
+            logger.exception(f"Error in {channel_name} channel for a batch of {len(messages)} messages")
+            continue
+        succeeded.update(message_id for message_id, success in results.items() if success)
+
+    return succeeded
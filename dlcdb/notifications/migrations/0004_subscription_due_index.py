@@ -0,0 +1,18 @@
+# Generated by Django 6.0.8 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0081_contract_changed_at'),
+        ('notifications', '0003_message_cc_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['is_active', 'next_scheduled'], name='notificatio_is_acti_49a4ae_idx'),
+        ),
+    ]
@@ -205,6 +205,12 @@ class Subscription(models.Model):
             subscriber=self.subscriber,
         )
 
+    class Meta:
+        indexes = [
+            # The scheduler reads the due subscriptions: active, next_scheduled passed.
+            models.Index(fields=["is_active", "next_scheduled"]),
+        ]
+
 
 class Message(models.Model):
     STATUS_PENDING = "pending"
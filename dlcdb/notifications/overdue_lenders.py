@@ -9,6 +9,7 @@ on every run.
 """
 
 import logging
+from itertools import groupby
 
 from django.template.loader import render_to_string
 from django.utils import timezone
@@ -38,13 +39,28 @@ def create_overdue_lender_messages(*, now=None) -> list[Message]:
     if mode == Recipient.NONE:
         return []
 
+    # One query for all groups, ordered so each (person, tenant) group is a
+    # consecutive run of rows; the mail template reads the device's type and
+    # manufacturer as well. Ordered by the ids the groups are keyed on: ordering
+    # by the relations would sort by their Meta.ordering (names, tenants
+    # case-insensitively), which can interleave two groups.
+    overdue_records = overdue_records.select_related(
+        "person", "device__tenant", "device__device_type", "device__manufacturer"
+    ).order_by("person_id", "device__tenant_id", "pk")
+
+    # Contact address and footer context only depend on the tenant.
+    tenant_context = {}
+
     messages = []
-    groups = set(overdue_records.values_list("person__pk", "device__tenant"))
-    for lender_pk, tenant_pk in groups:
-        records = list(overdue_records.filter(person__pk=lender_pk, device__tenant=tenant_pk))
+    for (_, tenant_pk), group in groupby(
+        overdue_records, key=lambda record: (record.person_id, record.device.tenant_id)
+    ):
+        records = list(group)
         person = records[0].person
         tenant = records[0].device.tenant
-        it_email = get_contact_email(tenant)
+        if tenant_pk not in tenant_context:
+            tenant_context[tenant_pk] = (get_contact_email(tenant), email_footer_context(tenant=tenant))
+        it_email, footer_context = tenant_context[tenant_pk]
 
         if mode == Recipient.IT:
             # Testdrive: the lender's mail is rerouted to IT, no lender copy.
@@ -61,15 +77,17 @@ def create_overdue_lender_messages(*, now=None) -> list[Message]:
             "person": person,
             "records": records,
             "records_count": len(records),
-            **email_footer_context(tenant=tenant),
+            **footer_context,
         }
-        message = Message.objects.create(
-            recipient_email=recipient,
-            cc_email=cc,
-            subject=render_to_string("notifications/emails/overdue_lenders_subject.txt", context).strip(),
-            body=render_to_string("notifications/emails/overdue_lenders_body.txt", context),
+        messages.append(
+            Message(
+                recipient_email=recipient,
+                cc_email=cc,
+                subject=render_to_string("notifications/emails/overdue_lenders_subject.txt", context).strip(),
+                body=render_to_string("notifications/emails/overdue_lenders_body.txt", context),
+            )
         )
-        messages.append(message)
 
+    messages = Message.objects.bulk_create(messages)
     logger.info(f"Created {len(messages)} overdue lender messages")
     return messages
@@ -141,19 +141,20 @@ def create_report_messages(subscriptions, *, now=None, update_window=True) -> li
     """
     now = now or timezone.localtime(timezone.now())
     report_records = get_affected_records(subscriptions[0], now)
-    records = report_records.records
+
+    # One read of the records feeds the report (title count, body, spreadsheet)
+    # and every subscriber's mail body.
+    record_rows = get_records_as_text(records=report_records.records, event=subscriptions[0].event)
 
     report = None
-    record_rows = []
-    if records:
+    if record_rows:
         report = create_report(
-            records=records,
+            rows=record_rows,
             event=subscriptions[0].event,
             condition=subscriptions[0].condition,
             window_start=report_records.window_start,
             window_end=now,
         )
-        record_rows = get_records_as_text(records=records, event=subscriptions[0].event)
 
     messages = []
     for subscription in subscriptions:
@@ -7,21 +7,28 @@ import datetime
 from datetime import timedelta
 
 from django.conf import settings
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
 import huey
 from huey.contrib.djhuey import db_periodic_task, db_task, lock_task
+from simple_history.utils import bulk_update_with_history
 
 from dlcdb.core.models import Device
 from dlcdb.lending.models import LendingConfiguration
+from dlcdb.licenses.models import LicensesConfiguration
 from .models import Subscription, Message
-from .channels import send_via_all_channels
+from .channels import send_batch_via_all_channels, send_via_all_channels
 from .intervals import NotificationInterval, INTERVAL_DETAILS
 from .overdue_lenders import create_overdue_lender_messages
 from .reports import create_report_message, create_report_messages, get_window_start
 
 logger = logging.getLogger(__name__)
 
+# How old a license contract change must be before it is applied, see
+# _update_license_subscriptions.
+LICENSE_CHANGE_SETTLE = timedelta(seconds=30)
+
 
 #######################################################################
 # task utilities
@@ -44,12 +51,54 @@ def _ensure_aware_dt(dt):
     return dt
 
 
+def _blocking_statuses(interval):
+    """
+    Message statuses that keep a device subscription from queueing another.
+
+    An unsent message is reused instead of queueing a duplicate. One-shots
+    (POINT_IN_TIME) fire once, ever: their sent message keeps blocking,
+    since _update_license_subscriptions re-arms next_scheduled when the
+    contract expiration date changes.
+    """
+    statuses = [Message.STATUS_PENDING, Message.STATUS_FAILED]
+    if interval == NotificationInterval.POINT_IN_TIME.value:
+        statuses.append(Message.STATUS_SENT)
+    return statuses
+
+
+def _reschedule_after_queueing(subscription):
+    """Move next_scheduled on after a message was queued (unsaved)."""
+    # Only reschedule for regular intervals, not for POINT_IN_TIME
+    if subscription.interval != NotificationInterval.POINT_IN_TIME.value:
+        subscription.schedule_next_message()
+    else:
+        # For point-in-time, just clear the next_scheduled since it's a one-time event
+        subscription.next_scheduled = None
+
+
 def _update_subscription_after_send(subscription):
     """Record a successful send. Rescheduling happens at message creation."""
     subscription.last_sent = timezone.now()
     subscription.save()
 
 
+def _send_all(message_ids):
+    """
+    Send the given messages, in batches sharing one SMTP session each.
+
+    NOTIFICATIONS_SEND_BATCH_SIZE caps a batch (mail servers limit the
+    messages per session); 0 sends every message in its own task.
+    """
+    batch_size = settings.NOTIFICATIONS_SEND_BATCH_SIZE
+    if batch_size < 1:
+        for message_id in message_ids:
+            send_message(message_id)
+        return
+
+    for start in range(0, len(message_ids), batch_size):
+        send_messages(message_ids[start : start + batch_size])
+
+
 def _process_messages_for_interval(interval):
     """
     Process all pending messages for a specific interval.
@@ -79,13 +128,10 @@ def _process_messages_for_interval(interval):
             logger.info(f"Not at the beginning of {interval.value} interval. Skipping message processing.")
             return
 
-    message_count = 0
-    for message in pending_messages:
-        # Send the message
-        message_id = message.id
-        logger.info(f"Processing {interval.value} message {message_id}")
-        send_message(message_id)
-        message_count += 1
+    message_ids = list(pending_messages.order_by("id").values_list("id", flat=True))
+    message_count = len(message_ids)
+    logger.info(f"Processing {interval.value} messages {message_ids}")
+    _send_all(message_ids)
 
     if message_count > 0:
         logger.info(f"Processed {message_count} messages for {interval.value} interval")
@@ -127,74 +173,64 @@ def _process_all_notification_intervals():
 
 def _update_license_subscriptions():
     """
-    Check for device/license changes and update related subscriptions.
-    Monitors fields like contract_expiration_date and updates subscriptions accordingly.
+    Reschedule the point-in-time subscriptions of licenses whose contract
+    expiration date changed since the last run.
+
+    Device.save() stamps contract_changed_at on every change of the date, and
+    LicensesConfiguration.subscriptions_synced_until keeps the stamp up to
+    which changes have been applied, so each change is handled once. Changes
+    younger than LICENSE_CHANGE_SETTLE wait for the next run: the stamp is
+    taken before the saving transaction commits, so a younger one could still
+    turn up behind the mark.
     """
+    config = LicensesConfiguration.load()
+    synced_until = timezone.now() - LICENSE_CHANGE_SETTLE
 
-    logger.info("Checking for license changes that require subscription updates")
+    changed_devices = Device.objects.filter(contract_changed_at__lte=synced_until)
+    if config.subscriptions_synced_until is not None:
+        changed_devices = changed_devices.filter(contract_changed_at__gt=config.subscriptions_synced_until)
 
-    # Find recently modified devices
-    back_in_time_minutes = 60 * 48
-    recent_time = timezone.now() - timedelta(minutes=back_in_time_minutes)
-    modified_devices = Device.objects.filter(modified_at__gte=recent_time)
+    subscriptions = Subscription.objects.filter(
+        device__in=changed_devices,
+        interval=NotificationInterval.POINT_IN_TIME.value,
+        is_active=True,
+        event__in=[
+            Subscription.NotificationEventChoices.CONTRACT_EXPIRES_SOON,
+            Subscription.NotificationEventChoices.CONTRACT_EXPIRED,
+        ],
+        device__contract_expiration_date__isnull=False,
+    ).select_related("device")
+
+    updated = []
+    for subscription in subscriptions:
+        device = subscription.device
+        expiration_date = _ensure_aware_dt(device.contract_expiration_date)
+
+        # For CONTRACT_EXPIRES_SOON, 30 days before expiration; for
+        # CONTRACT_EXPIRED, the expiration date.
+        if subscription.event == Subscription.NotificationEventChoices.CONTRACT_EXPIRES_SOON:
+            subscription.schedule_next_message(datetime_obj=expiration_date - timedelta(days=30))
+        else:
+            subscription.schedule_next_message(datetime_obj=expiration_date)
+        subscription.save()
+        updated.append(subscription)
+        logger.info(
+            f"Updated subscription {subscription.id} for device {device.id}, "
+            f"event {subscription.event}, next_scheduled={subscription.next_scheduled}"
+        )
 
-    if not modified_devices.exists():
-        logger.info("No recently modified devices found")
-        return 0
+    # Update any existing pending messages
+    for message in Message.objects.filter(subscription__in=updated, status=Message.STATUS_PENDING).select_related(
+        "subscription__device", "subscription__subscriber"
+    ):
+        message.generate_content(force=True)
+        logger.info(f"Updated content for message {message.id}")
 
-    logger.info(f"Found {modified_devices.count()} recently modified devices")
-    update_count = 0
+    LicensesConfiguration.objects.filter(pk=config.pk).update(subscriptions_synced_until=synced_until)
 
-    for device in modified_devices:
-        # Get all point-in-time subscriptions for this device
-        subscriptions = Subscription.objects.filter(
-            device=device, interval=NotificationInterval.POINT_IN_TIME.value, is_active=True
-        )
-        if not subscriptions.exists():
-            continue
-
-        # Update each subscription based on its event type
-        for subscription in subscriptions:
-            updated = False
-
-            # For CONTRACT_EXPIRES_SOON, set to 30 days before expiration
-            if (
-                subscription.event == Subscription.NotificationEventChoices.CONTRACT_EXPIRES_SOON
-                and device.contract_expiration_date
-            ):
-                expiration_date = _ensure_aware_dt(device.contract_expiration_date)
-                if expiration_date:  # Only proceed if not None
-                    notify_date = expiration_date - timedelta(days=30)
-                    subscription.schedule_next_message(datetime_obj=notify_date)
-                    updated = True
-
-            # For CONTRACT_EXPIRED, set to expiration date
-            elif (
-                subscription.event == Subscription.NotificationEventChoices.CONTRACT_EXPIRED
-                and device.contract_expiration_date
-            ):
-                expiration_date = _ensure_aware_dt(device.contract_expiration_date)
-                if expiration_date:  # Only proceed if not None
-                    subscription.schedule_next_message(datetime_obj=expiration_date)
-                    updated = True
-
-            # Save if updated
-            if updated:
-                subscription.save()
-                update_count += 1
-                logger.info(
-                    f"Updated subscription {subscription.id} for device {device.id}, "
-                    f"event {subscription.event}, next_scheduled={subscription.next_scheduled}"
-                )
-
-                # Update any existing pending messages
-                messages = Message.objects.filter(subscription=subscription, status=Message.STATUS_PENDING)
-                for message in messages:
-                    message.generate_content(force=True)
-                    logger.info(f"Updated content for message {message.id}")
-
-    logger.info(f"Updated {update_count} subscriptions based on device changes")
-    return update_count
+    if updated:
+        logger.info(f"Updated {len(updated)} subscriptions based on license contract changes")
+    return len(updated)
 
 
 #######################################################################
@@ -226,6 +262,35 @@ def send_message(message_id):
     return success
 
 
+@db_task()
+def send_messages(message_ids):
+    """Send several messages by ID, each channel handling them as one batch"""
+    messages = list(
+        Message.objects.select_related("subscription", "subscription__subscriber", "report")
+        .filter(id__in=message_ids)
+        .order_by("id")
+    )
+    missing = set(message_ids) - {message.id for message in messages}
+    if missing:
+        logger.error(f"Messages with IDs {sorted(missing)} not found")
+    if not messages:
+        return 0
+
+    sent = send_batch_via_all_channels(messages)
+
+    # Record the sends on the subscriptions, once per subscription.
+    subscriptions = {
+        message.subscription_id: message.subscription
+        for message in messages
+        if message.id in sent and message.subscription is not None
+    }
+    for subscription in subscriptions.values():
+        _update_subscription_after_send(subscription)
+
+    logger.info(f"Sent {len(sent)} of {len(messages)} messages in one batch")
+    return len(sent)
+
+
 @db_task()
 def queue_messages_for_interval(interval):
     """Create messages for all active subscriptions with the given interval."""
@@ -259,13 +324,29 @@ def queue_messages_for_interval(interval):
             subscription.schedule_next_message()
             subscription.save()
 
-    for subscription in Subscription.objects.filter(interval=interval.value, is_active=True).exclude(
-        event__in=Subscription.REPORT_EVENTS
-    ):
-        result = queue_message(subscription.id)
-        subscription_count += 1
-        if result:  # If a message ID was returned
-            message_count += 1
+    # Device subscriptions: same rules as queue_message, applied to all due
+    # subscriptions at once. The (is_active, next_scheduled) index keeps this
+    # proportional to the due subscriptions, not to all of them.
+    due_subscriptions = list(
+        Subscription.objects.filter(
+            interval=interval.value, is_active=True, next_scheduled__isnull=False, next_scheduled__lte=now
+        )
+        .exclude(event__in=Subscription.REPORT_EVENTS)
+        .annotate(
+            has_blocking_message=Exists(
+                Message.objects.filter(subscription=OuterRef("pk"), status__in=_blocking_statuses(interval.value))
+            )
+        )
+    )
+    subscription_count += len(due_subscriptions)
+
+    queued = [subscription for subscription in due_subscriptions if not subscription.has_blocking_message]
+    messages = Message.objects.bulk_create([Message(subscription=subscription) for subscription in queued])
+    message_count += len(messages)
+    for subscription in queued:
+        _reschedule_after_queueing(subscription)
+        subscription.modified_at = now
+    bulk_update_with_history(queued, Subscription, ["next_scheduled", "modified_at"])
 
     logger.info(
         f"Processed {subscription_count} subscriptions, created {message_count} new messages for {interval.value} interval"
@@ -296,14 +377,10 @@ def queue_message(subscription_id):
         # nothing matched and notify_no_updates is off).
         message = create_report_message(subscription)
     else:
-        # Reuse an unsent message instead of queueing a duplicate. One-shots
-        # (POINT_IN_TIME) fire once, ever: their sent message keeps blocking,
-        # since _update_license_subscriptions may re-arm next_scheduled on
-        # any device edit.
-        blocking_statuses = [Message.STATUS_PENDING, Message.STATUS_FAILED]
-        if subscription.interval == NotificationInterval.POINT_IN_TIME.value:
-            blocking_statuses.append(Message.STATUS_SENT)
-        existing_message = Message.objects.filter(subscription=subscription, status__in=blocking_statuses).first()
+        # Reuse an unsent message instead of queueing a duplicate.
+        existing_message = Message.objects.filter(
+            subscription=subscription, status__in=_blocking_statuses(subscription.interval)
+        ).first()
         if existing_message:
             logger.info(
                 f"Skipping subscription {subscription.id}: unsent message {existing_message.id} "
@@ -312,12 +389,7 @@ def queue_message(subscription_id):
             return existing_message.id
         message, _ = subscription.create_message()
 
-    # Only reschedule for regular intervals, not for POINT_IN_TIME
-    if subscription.interval != NotificationInterval.POINT_IN_TIME.value:
-        subscription.schedule_next_message()
-    else:
-        # For point-in-time, just clear the next_scheduled since it's a one-time event
-        subscription.next_scheduled = None
+    _reschedule_after_queueing(subscription)
     subscription.save()
 
     if message:
@@ -342,8 +414,7 @@ def notify_overdue_lenders():
     if recipient_mode == LendingConfiguration.OverdueNotificationRecipient.NONE:
         return
 
-    for message in create_overdue_lender_messages():
-        send_message(message.id)
+    _send_all([message.id for message in create_overdue_lender_messages()])
 
 
 @db_periodic_task(huey.crontab(minute="*"))  # Run every minute
@@ -351,12 +422,12 @@ def notify_overdue_lenders():
 def process_notification_system():
     """
     Main periodic task that coordinates all notification system processing.
-    - Updates license subscriptions based on device changes
+    - Updates license subscriptions based on contract date changes
     - Processes notification intervals that are due
     """
     logger.info("Starting notification system processing")
 
-    # First update subscriptions for any changed licenses
+    # First update subscriptions for licenses whose contract date changed
     _update_license_subscriptions()
 
     # Then process all notification intervals
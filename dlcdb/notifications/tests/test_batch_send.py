@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Batched delivery: one mail connection per batch, reopened when it drops,
+and the per-message outcome stored for every message of the batch.
+"""
+
+import smtplib
+from datetime import timedelta
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from dlcdb.core.models import Person
+from dlcdb.notifications.intervals import NotificationInterval
+from dlcdb.notifications.models import Message, Subscription
+from dlcdb.notifications.tasks import send_messages
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend counting connections; drops the session on selected recipients."""
+
+    opened = 0
+    drop_for = {}  # recipient -> number of times the send fails
+    kill_for = set()  # recipients whose send kills the worker
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connection = None
+
+    def open(self):
+        if self.connection:
+            return False
+        self.connection = object()
+        CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self.connection = None
+
+    def send_messages(self, messages):
+        for message in messages:
+            for recipient in message.to:
+                if recipient in self.kill_for:
+                    raise SystemExit
+                if self.drop_for.get(recipient):
+                    self.drop_for[recipient] -= 1
+                    raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="dlcdb.notifications.tests.test_batch_send.CountingBackend")
+class BatchSendTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+        CountingBackend.drop_for = {}
+        CountingBackend.kill_for = set()
+
+    def create_messages(self, *recipients):
+        return [
+            Message.objects.create(recipient_email=recipient, subject="Overdue", body="Please return.")
+            for recipient in recipients
+        ]
+
+    def test_one_connection_per_batch(self):
+        messages = self.create_messages("a@example.org", "b@example.org", "c@example.org")
+
+        with self.assertNumQueries(4):  # load the batch, one status update per message
+            sent = send_messages.call_local([message.id for message in messages])
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        for message in Message.objects.all():
+            self.assertEqual(message.status, Message.STATUS_SENT)
+            self.assertIsNotNone(message.sent_at)
+
+    def test_dropped_connection_is_reopened_and_the_message_retried(self):
+        messages = self.create_messages("a@example.org", "b@example.org", "c@example.org")
+        CountingBackend.drop_for = {"b@example.org": 1}
+
+        sent = send_messages.call_local([message.id for message in messages])
+
+        self.assertEqual(sent, 3)
+        self.assertEqual(CountingBackend.opened, 2)
+        self.assertEqual([email.to for email in mail.outbox], [["a@example.org"], ["b@example.org"], ["c@example.org"]])
+
+    def test_a_batch_cut_short_keeps_the_status_of_what_it_delivered(self):
+        """A worker killed mid-batch must not send the first mail again next run."""
+        delivered, pending = self.create_messages("a@example.org", "b@example.org")
+        CountingBackend.kill_for = {"b@example.org"}
+
+        with self.assertRaises(SystemExit):
+            send_messages.call_local([delivered.id, pending.id])
+
+        delivered.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(delivered.status, Message.STATUS_SENT)
+        self.assertEqual(pending.status, Message.STATUS_PENDING)
+
+    def test_a_failing_message_does_not_stop_the_batch(self):
+        refused, delivered = self.create_messages("a@example.org", "b@example.org")
+        no_email = Person.objects.create(first_name="Erika", last_name="Musterfrau")
+        unaddressed = Message.objects.create(
+            subscription=Subscription.objects.create(
+                event=Subscription.NotificationEventChoices.MOVED,
+                subscriber=no_email,
+                interval=NotificationInterval.IMMEDIATELY.value,
+            ),
+            subject="Moved",
+            body="Moved.",
+        )
+        CountingBackend.drop_for = {"a@example.org": 2}
+
+        sent = send_messages.call_local([refused.id, delivered.id, unaddressed.id])
+
+        self.assertEqual(sent, 1)
+        self.assertEqual([email.to for email in mail.outbox], [["b@example.org"]])
+        refused.refresh_from_db()
+        delivered.refresh_from_db()
+        unaddressed.refresh_from_db()
+        self.assertEqual(refused.status, Message.STATUS_FAILED)
+        self.assertIn("unexpectedly closed", refused.error_message)
+        self.assertEqual(delivered.status, Message.STATUS_SENT)
+        self.assertEqual(unaddressed.status, Message.STATUS_FAILED)
+        self.assertEqual(unaddressed.error_message, "No recipient email address")
+
+    def test_sent_messages_are_recorded_on_their_subscription(self):
+        subscriber = Person.objects.create(first_name="Max", last_name="Mustermann", email="max@example.org")
+        subscription = Subscription.objects.create(
+            event=Subscription.NotificationEventChoices.MOVED,
+            subscriber=subscriber,
+            interval=NotificationInterval.IMMEDIATELY.value,
+            next_scheduled=timezone.now() - timedelta(minutes=5),
+        )
+        first = Message.objects.create(subscription=subscription, subject="Moved", body="Moved.")
+        second = Message.objects.create(subscription=subscription, subject="Moved", body="Moved again.")
+
+        send_messages.call_local([first.id, second.id])
+
+        subscription.refresh_from_db()
+        self.assertIsNotNone(subscription.last_sent)
+        self.assertEqual(len(mail.outbox), 2)
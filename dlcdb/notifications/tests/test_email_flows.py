@@ -8,19 +8,33 @@ subscription creation via the services API, message queueing and delivery
 through the email channel.
 """
 
+import importlib
 from datetime import timedelta
 
+from django.apps import apps
 from django.conf import settings
 from django.core import mail
+from django.db import connection
+from django.db.models import F
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from dlcdb.core.models import Device, DeviceType, Person
+from dlcdb.licenses.models import LicensesConfiguration
 from dlcdb.organization.models import Branding
 from dlcdb.notifications.intervals import NotificationInterval
 from dlcdb.notifications.models import Message, Subscription
 from dlcdb.notifications.services import create_license_subscriptions, delete_license_subscriptions
-from dlcdb.notifications.tasks import queue_message, send_message
+from dlcdb.notifications.tasks import (
+    _update_license_subscriptions,
+    queue_message,
+    queue_messages_for_interval,
+    send_message,
+)
+
+# The module name is not a valid identifier, so it cannot be imported directly.
+_backfill_migration = importlib.import_module("dlcdb.core.migrations.0084_backfill_contract_changed_at")
 
 
 def create_license_device():
@@ -202,7 +216,7 @@ class MessageDeliveryTests(TestCase):
         self.assertEqual(Message.objects.count(), 1)
 
     def test_one_shot_subscription_fires_only_once(self):
-        # A device edit re-arms next_scheduled for POINT_IN_TIME subscriptions
+        # A contract date change re-arms next_scheduled for POINT_IN_TIME subscriptions
         # (_update_license_subscriptions); the sent message must keep blocking.
         subscription = self.create_due_subscription(Subscription.NotificationEventChoices.CONTRACT_EXPIRED)
 
@@ -235,3 +249,137 @@ class MessageDeliveryTests(TestCase):
 
         self.assertNotEqual(first_id, second_id)
         self.assertEqual(Message.objects.count(), 2)
+
+
+class LicenseChangeTrackingTests(TestCase):
+    def setUp(self):
+        self.subscriber = Person.objects.create(first_name="Max", last_name="Mustermann", email="max@example.org")
+        self.device = create_license_device()
+        self.subscription = Subscription.objects.create(
+            event=Subscription.NotificationEventChoices.CONTRACT_EXPIRED,
+            subscriber=self.subscriber,
+            device=self.device,
+            interval=NotificationInterval.POINT_IN_TIME.value,
+            next_scheduled=timezone.now() + timedelta(days=1),
+        )
+
+    def change_contract(self, device, expiration_date):
+        device = Device.objects.get(pk=device.pk)
+        device.contract_expiration_date = expiration_date
+        device.save()
+
+    def a_minute_passes(self):
+        """Move the change stamps and the high-water mark a minute into the past."""
+        a_minute = timedelta(minutes=1)
+        Device.objects.filter(contract_changed_at__isnull=False).update(
+            contract_changed_at=F("contract_changed_at") - a_minute
+        )
+        LicensesConfiguration.objects.filter(subscriptions_synced_until__isnull=False).update(
+            subscriptions_synced_until=F("subscriptions_synced_until") - a_minute
+        )
+
+    def test_only_contract_date_changes_are_stamped(self):
+        device = Device.objects.get(pk=self.device.pk)
+        self.assertIsNone(device.contract_changed_at)
+
+        device.note = "Renewal pending"
+        device.save()
+        self.assertIsNone(Device.objects.get(pk=device.pk).contract_changed_at)
+
+        device.contract_expiration_date += timedelta(days=365)
+        device.save(update_fields=["contract_expiration_date"])
+        self.assertIsNotNone(Device.objects.get(pk=device.pk).contract_changed_at)
+
+    def test_changed_licenses_are_rescheduled_once(self):
+        untouched = Device.objects.create(
+            edv_id="lic002", is_licence=True, contract_expiration_date=timezone.now().date() + timedelta(days=60)
+        )
+        untouched_subscription = Subscription.objects.create(
+            event=Subscription.NotificationEventChoices.CONTRACT_EXPIRED,
+            subscriber=self.subscriber,
+            device=untouched,
+            interval=NotificationInterval.POINT_IN_TIME.value,
+            next_scheduled=timezone.now() + timedelta(days=2),
+        )
+        new_date = timezone.localdate() + timedelta(days=400)
+        self.change_contract(self.device, new_date)
+        self.a_minute_passes()
+
+        self.assertEqual(_update_license_subscriptions(), 1)
+        self.subscription.refresh_from_db()
+        self.assertEqual(timezone.localdate(self.subscription.next_scheduled), new_date)
+        untouched_subscription.refresh_from_db()
+        self.assertEqual(untouched_subscription.next_scheduled.date(), (timezone.now() + timedelta(days=2)).date())
+
+        # Nothing changed since: the next run touches no subscription.
+        self.assertEqual(_update_license_subscriptions(), 0)
+
+        self.change_contract(untouched, new_date)
+        self.a_minute_passes()
+        self.assertEqual(_update_license_subscriptions(), 1)
+
+    def test_contract_dates_from_before_the_stamp_are_synced_on_the_first_run(self):
+        """Migration 0084 stamps existing contract dates, so the first run (no mark yet) picks them up."""
+        self.assertIsNone(Device.objects.get(pk=self.device.pk).contract_changed_at)
+        Device.objects.filter(pk=self.device.pk).update(modified_at=timezone.now() - timedelta(minutes=1))
+
+        _backfill_migration.forwards(apps, None)
+
+        self.assertEqual(_update_license_subscriptions(), 1)
+        self.subscription.refresh_from_db()
+        self.assertEqual(
+            timezone.localdate(self.subscription.next_scheduled),
+            Device.objects.get(pk=self.device.pk).contract_expiration_date,
+        )
+
+    def test_unsettled_changes_wait_for_the_next_run(self):
+        self.change_contract(self.device, self.device.contract_expiration_date + timedelta(days=365))
+
+        self.assertEqual(_update_license_subscriptions(), 0)
+        self.a_minute_passes()
+        self.assertEqual(_update_license_subscriptions(), 1)
+
+
+class DueSubscriptionQueueingTests(TestCase):
+    def setUp(self):
+        self.subscriber = Person.objects.create(first_name="Max", last_name="Mustermann", email="max@example.org")
+
+    def create_subscription(self, edv_id, next_scheduled, event=Subscription.NotificationEventChoices.MOVED):
+        return Subscription.objects.create(
+            event=event,
+            subscriber=self.subscriber,
+            device=Device.objects.create(edv_id=edv_id),
+            interval=NotificationInterval.IMMEDIATELY.value,
+            next_scheduled=next_scheduled,
+        )
+
+    def test_only_due_subscriptions_without_unsent_message_are_queued(self):
+        due = self.create_subscription("due001", timezone.now() - timedelta(minutes=5))
+        blocked = self.create_subscription("due002", timezone.now() - timedelta(minutes=5))
+        pending = Message.objects.create(subscription=blocked)
+        not_due = self.create_subscription("due003", timezone.now() + timedelta(days=1))
+
+        self.assertEqual(queue_messages_for_interval.call_local(NotificationInterval.IMMEDIATELY), 1)
+
+        self.assertEqual(Message.objects.filter(subscription=due, status=Message.STATUS_PENDING).count(), 1)
+        self.assertEqual(list(Message.objects.filter(subscription=blocked)), [pending])
+        self.assertFalse(Message.objects.filter(subscription=not_due).exists())
+        due.refresh_from_db()
+        self.assertGreater(due.next_scheduled, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(due.history.count(), 2)
+
+    def test_queries_do_not_grow_with_the_number_of_subscriptions(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                queue_messages_for_interval.call_local(NotificationInterval.IMMEDIATELY)
+            return len(queries)
+
+        self.create_subscription("due010", timezone.now() - timedelta(minutes=5))
+        few = count_queries()
+        for index in range(5):
+            self.create_subscription(f"due02{index}", timezone.now() - timedelta(minutes=5))
+            self.create_subscription(f"due03{index}", timezone.now() + timedelta(days=1))
+        many = count_queries()
+
+        self.assertEqual(few, many)
+        self.assertEqual(Message.objects.count(), 6)
@@ -13,7 +13,9 @@ from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -26,6 +28,7 @@ from dlcdb.organization.models import Branding
 from dlcdb.tenants.models import Tenant
 from dlcdb.notifications.intervals import NotificationInterval
 from dlcdb.notifications.models import Message, Subscription
+from dlcdb.notifications.overdue_lenders import create_overdue_lender_messages
 from dlcdb.notifications.tasks import notify_overdue_lenders, queue_messages_for_interval, send_message
 from dlcdb.reporting.models import Report
 
@@ -388,6 +391,39 @@ class OverdueLendersMailTests(ImmediateHueyMixin, TestCase):
         self.assertIn("ntb121", by_cc["it-b@example.org"].body)
         self.assertNotIn("ntb120", by_cc["it-b@example.org"].body)
 
+    def test_tenants_named_alike_do_not_split_a_lenders_mail(self):
+        # Tenant names that differ only in case sort together case-insensitively;
+        # the lender still gets one mail per tenant.
+        tenant_upper = Tenant.objects.create(name="IT")
+        tenant_lower = Tenant.objects.create(name="it")
+        self.create_lent_record(self.lender1, edv_id="ntb150", overdue_days=10, tenant=tenant_upper)
+        self.create_lent_record(self.lender1, edv_id="ntb151", overdue_days=10, tenant=tenant_lower)
+        self.create_lent_record(self.lender1, edv_id="ntb152", overdue_days=10, tenant=tenant_upper)
+
+        notify_overdue_lenders.call_local()
+
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_queries_do_not_grow_with_the_number_of_lenders(self):
+        tenant = Tenant.objects.create(name="Tenant D", contact_email="it-d@example.org")
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                messages = create_overdue_lender_messages()
+            return len(messages), len(queries)
+
+        self.create_lent_record(self.lender1, edv_id="ntb130", overdue_days=10, tenant=tenant)
+        self.create_lent_record(self.lender1, edv_id="ntb131", overdue_days=10, tenant=tenant)
+        count_queries()  # the first run creates the configuration singletons
+        few = count_queries()
+        for index in range(5):
+            lender = Person.objects.create(first_name="Lender", last_name=str(index), email=f"l{index}@example.org")
+            self.create_lent_record(lender, edv_id=f"ntb14{index}", overdue_days=10, tenant=tenant)
+        many = count_queries()
+
+        self.assertEqual((few[0], many[0]), (1, 6))
+        self.assertEqual(few[1], many[1])
+
     def test_it_cc_falls_back_to_branding_then_default(self):
         self.set_lending_config(overdue_notifications_recipient="lender_and_it")
         branding = Branding.load()
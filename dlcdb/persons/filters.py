@@ -5,10 +5,9 @@
 """Filters used by the person overview."""
 
 import django_filters
-from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
-from dlcdb.core.models import OrganizationalUnit, Person
+from dlcdb.core.models import OrganizationalUnit, Person, SearchDocument
 
 
 class PersonFilter(django_filters.FilterSet):
@@ -39,12 +38,6 @@ class PersonFilter(django_filters.FilterSet):
         ]
 
     def search_filter(self, queryset, name, value):
-        # Mirrors the admin's search_fields, including the UDB-mirrored names.
-        return queryset.filter(
-            Q(last_name__icontains=value)
-            | Q(first_name__icontains=value)
-            | Q(email__icontains=value)
-            | Q(udb_person_last_name__icontains=value)
-            | Q(udb_person_first_name__icontains=value)
-            | Q(udb_person_email_internal_business__icontains=value)
-        )
+        # Matches the fields of SEARCH_INDEXES["person"] (core/models/search_document.py),
+        # which mirror the admin's search_fields, including the UDB-mirrored names.
+        return SearchDocument.objects.search(queryset, "person", value)
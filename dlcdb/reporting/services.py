@@ -16,19 +16,27 @@ from django.core.files import File
 from django.utils.text import slugify
 
 from .models import Report
-from .utils.representations import get_records_as_spreadsheet, get_records_as_text
+from .utils.representations import get_records_as_text, get_rows_as_spreadsheet
 
 
-def create_report(*, records, event, condition="", window_start, window_end) -> Report:
+def create_report(*, records=None, rows=None, event, condition="", window_start, window_end) -> Report:
     """
     Create and persist a Report for the given records, covering the time
     window [window_start, window_end].
+
+    The records are read once; the title count, the text body and the
+    spreadsheet are all built from those rows. Callers that need the rows
+    themselves build them with ``get_records_as_text`` and pass ``rows``
+    instead of ``records``.
     """
+    if rows is None:
+        rows = get_records_as_text(records=records, event=event, condition=condition)
+
     title = "DLCDB Report: from {from_date} to {to_date} for {event} ({count})".format(
         from_date=window_start.date(),
         to_date=window_end.date(),
         event=event,
-        count=records.count(),
+        count=len(rows),
     )
 
     # Spreadsheet titles must not exceed 31 characters.
@@ -38,12 +46,11 @@ def create_report(*, records, event, condition="", window_start, window_end) ->
         to_date=window_end.date(),
     )
 
-    text_rows = get_records_as_text(records=records, title=title, event=event, condition=condition)
-    spreadsheet = get_records_as_spreadsheet(records=records, title=spreadsheet_title, event=event)
+    spreadsheet = get_rows_as_spreadsheet(rows=rows, title=spreadsheet_title, event=event)
     filename = "{}_{}.xlsx".format(slugify(title), uuid.uuid1())
 
     return Report.objects.create(
         title=title,
-        body=text_rows,
+        body=rows,
         spreadsheet=File(spreadsheet, name=filename),
     )
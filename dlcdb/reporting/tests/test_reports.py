@@ -10,23 +10,32 @@ import io
 import tempfile
 
 import openpyxl
+import pytest
 
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
-from dlcdb.core.models import Device, DeviceType, InRoomRecord, Record
+from dlcdb.core.models import Device, DeviceType, InRoomRecord, Manufacturer, Record, Room
 from dlcdb.reporting.services import create_report
 from dlcdb.reporting.settings import EXPOSED_FIELDS
-from dlcdb.reporting.utils.representations import get_records_as_spreadsheet
+from dlcdb.reporting.utils.representations import (
+    get_column_headers,
+    get_records_as_spreadsheet,
+    get_rows_as_spreadsheet,
+)
 
 TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix="dlcdb-test-media-")
 
 
-def create_inroom_records(count):
+def create_inroom_records(count, room=None, manufacturer=None):
     device_type, _ = DeviceType.objects.get_or_create(name="Notebook", prefix="ntb")
     for i in range(count):
-        device = Device.objects.create(device_type=device_type, edv_id=f"ntb90{i}", sap_id=f"90{i}")
-        InRoomRecord.objects.create(device=device)
+        device = Device.objects.create(
+            device_type=device_type, edv_id=f"ntb90{i}", sap_id=f"90{i}", manufacturer=manufacturer
+        )
+        InRoomRecord.objects.create(device=device, room=room)
     return Record.objects.active_records().filter(record_type=Record.INROOM)
 
 
@@ -62,3 +71,37 @@ class CreateReportTests(TestCase):
         self.assertTrue(report.body)
         self.assertTrue(report.spreadsheet.name.endswith(".xlsx"))
         self.assertGreater(report.spreadsheet.size, 0)
+
+    def test_create_report_reads_the_records_once(self):
+        now = timezone.localtime(timezone.now())
+
+        def _queries(count):
+            Record.objects.all().delete()
+            records = create_inroom_records(
+                count,
+                room=Room.objects.create(number=f"R{count}"),
+                manufacturer=Manufacturer.objects.create(name=f"Maker {count}"),
+            )
+            with CaptureQueriesContext(connection) as captured:
+                report = create_report(records=records, event=Record.INROOM, window_start=now, window_end=now)
+            self.assertIn(f"({count})", report.title)
+            return [query["sql"] for query in captured.captured_queries]
+
+        few, many = _queries(1), _queries(5)
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(len([sql for sql in many if sql.startswith('SELECT "core_record"')]), 1)
+
+
+@pytest.mark.parametrize("event", [Record.INROOM, Record.LENT, Record.REMOVED])
+def test_write_only_spreadsheet_holds_the_cells_of_the_documented_layout(event):
+    headers = get_column_headers(event)
+    rows = [[f"value {n}-{column}" if column % 3 else "" for column in range(len(headers))] for n in range(20)]
+
+    content = get_rows_as_spreadsheet(rows=rows, title="same", event=event).read()
+
+    worksheet = openpyxl.load_workbook(io.BytesIO(content)).active
+    cells = [[cell.value for cell in row] for row in worksheet.iter_rows()]
+    # Rows 1-2 blank, row 3 the column names, row 4 blank, data from row 5;
+    # empty values come back as empty cells.
+    blank = [None] * len(headers)
+    assert cells == [blank, blank, list(headers), blank, *[[value or None for value in row] for row in rows]]
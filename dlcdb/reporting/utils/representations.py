@@ -4,14 +4,15 @@
 
 import datetime
 
-from copy import copy
-from tempfile import NamedTemporaryFile
+from io import BytesIO
 
 from openpyxl import Workbook
-from openpyxl.styles import NamedStyle, Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle, Font, Alignment
 from openpyxl.utils import get_column_letter
 
 from django.core.files.base import ContentFile
+from django.db.models import QuerySet
 from django.utils.text import slugify
 
 from ..settings import EXPOSED_FIELDS
@@ -47,107 +48,100 @@ def get_record_data_row(record, event):
     return row
 
 
+def get_related_paths(event):
+    """
+    The ``select_related`` paths the EXPOSED_FIELDS of an event walk through,
+    e.g. ``["device", "device__manufacturer"]``.
+    """
+    paths = set()
+    for item in EXPOSED_FIELDS:
+        if event in item.get("used_for"):
+            models = item.get("model")
+            paths.update("__".join(models[: i + 1]) for i in range(len(models)))
+    return sorted(paths)
+
+
 def get_records_as_text(records=None, title=None, event=None, condition=None):
     """
     Build a string representation of affected records. Could be used as an email body.
+
+    A queryset is read in one query, joining every relation EXPOSED_FIELDS
+    reads. The rows can be handed on to ``get_rows_as_spreadsheet``, so a
+    report needs to read its records only once.
     """
-    result = []
-    for record in records:
-        result.append(get_record_data_row(record, event))
+    if isinstance(records, QuerySet):
+        records = records.select_related(*get_related_paths(event))
 
-    return result
+    return [get_record_data_row(record, event) for record in records]
 
 
 def get_records_as_spreadsheet(records=None, title=None, event=None):
     """
     Return records wrapped in a spreadsheet file (xlsx).
     """
+    return get_rows_as_spreadsheet(rows=get_records_as_text(records=records, event=event), title=title, event=event)
+
+
+def get_column_headers(event):
+    """
+    The spreadsheet column names for an event, e.g. ``device-sap_id``.
+    """
+    return [
+        "{model_name}-{field}".format(
+            model_name="".join(item.get("model")) if item.get("model") else "Record",
+            field=item.get("field"),
+        )
+        for item in EXPOSED_FIELDS
+        if event in item.get("used_for")
+    ]
+
+
+def get_rows_as_spreadsheet(rows=None, title=None, event=None):
+    """
+    Return rows built by ``get_records_as_text`` wrapped in a spreadsheet file (xlsx).
 
-    with NamedTemporaryFile(suffix="xlsx") as tmp:
-        # Creating xlsx via openpyxl
-        workbook = Workbook()
-
-        _base_font = Font(name="DejaVu Sans Mono")  # Nimbus Mono
-
-        title_style = NamedStyle(name="title_style")
-        title_style.font = copy(_base_font)
-        title_style.font = Font(bold=True, color="FFFFFFFF")
-        title_style.alignment = Alignment(horizontal="left", vertical="center")
-        title_style.fill = PatternFill(fill_type="solid", bgColor="000000")
-
-        header_style = NamedStyle(name="header_style")
-        header_style.font = copy(_base_font)
-        header_style.font = Font(bold=True)
-        header_style.alignment = Alignment(horizontal="right", vertical="top")
-
-        body_style = NamedStyle(name="body_style")
-        body_style.font = copy(_base_font)
-        body_style.alignment = Alignment(horizontal="left", vertical="top")
-
-        ws = workbook.active
-        ws.title = slugify(title) if title else ""
-
-        # row 1: title
-        # _title = title if title else ''
-        # ws.append([_title])
-        # # ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=ws.max_column)
-        # ws.merge_cells('A1:X1')
-        # title_row = ws[1]
-        # for cell in title_row:
-        #     cell.style = title_style
-
-        # row 1: -blank-
-        ws.append([])
-
-        # row 2: -blank-
-        ws.append([])
-
-        # row 3: column names
-        # ws.append(EXPOSED_FIELDS_RECORD + EXPOSED_FIELDS_DEVICE)
-        col_headers_row = []
-        for item in EXPOSED_FIELDS:
-            if event in item.get("used_for"):
-                header_str = "{model_name}-{field}".format(
-                    model_name="".join(item.get("model")) if item.get("model") else "Record",
-                    field=item.get("field"),
-                )
-                col_headers_row.append(header_str)
-        ws.append(col_headers_row)
-
-        column_header_row = ws[3]
-        for cell in column_header_row:
-            cell.style = header_style
-
-        # row 4: -blank-
-        ws.append([])
-
-        # row 5+: data
-        for record in records:
-            ws.append(get_record_data_row(record, event))
-
-        # for row in ws.iter_rows(min_row=5, max_row=ws.max_row):
-        #     print('Row number:', str(row[0].row))
-        #     row[0].style = body
-
-        # for row_cells in ws.iter_rows(min_row=ws._current_row, max_row=ws._current_row):
-        for row_cells in ws.iter_rows():
-            for cell in row_cells:
-                cell.style = body_style
-
-        # Optimized column widths
-        # see: https://stackoverflow.com/questions/13197574/openpyxl-adjust-column-width-size
-        column_widths = []
-        for row in ws.iter_rows(min_row=3):
-            for i, cell in enumerate(row):
-                if cell.value:
-                    try:
-                        column_widths[i] = max(column_widths[i], len(cell.value))
-                    except IndexError:
-                        column_widths.append(len(cell.value))
-
-        for i, column_width in enumerate(column_widths):
+    The workbook is write-only: each row is serialised as it is appended
+    instead of being kept as cell objects until the file is saved, so memory
+    stays flat however many rows a report has. Column widths are fixed before
+    the first row is written, which is why ``rows`` must be a sequence rather
+    than a one-shot iterator.
+
+    Layout: rows 1-2 blank, row 3 the column names, row 4 blank, data from row 5.
+    """
+    headers = get_column_headers(event)
+
+    workbook = Workbook(write_only=True)
+    body_style = NamedStyle(name="body_style")
+    body_style.font = Font(name="DejaVu Sans Mono")
+    body_style.alignment = Alignment(horizontal="left", vertical="top")
+    workbook.add_named_style(body_style)
+
+    ws = workbook.create_sheet(slugify(title) if title else None)
+
+    # Optimized column widths: the longest value in each column.
+    column_widths = [0] * len(headers)
+    for row in [headers, *rows]:
+        for i, value in enumerate(row):
+            column_widths[i] = max(column_widths[i], len(value))
+    for i, column_width in enumerate(column_widths):
+        if column_width:
             ws.column_dimensions[get_column_letter(i + 1)].width = column_width
 
-        workbook.save(tmp.name)
-        content_file_obj = ContentFile(tmp.read())
-        return content_file_obj
+    def styled(values):
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = body_style.name
+            cells.append(cell)
+        return cells
+
+    ws.append([])
+    ws.append([])
+    ws.append(styled(headers))
+    ws.append([])
+    for row in rows:
+        ws.append(styled(row))
+
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return ContentFile(buffer.getvalue())
@@ -5,10 +5,9 @@
 """Filters used by the room overview."""
 
 import django_filters
-from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
-from dlcdb.core.models import Room
+from dlcdb.core.models import Room, SearchDocument
 
 
 class RoomFilter(django_filters.FilterSet):
@@ -54,12 +53,8 @@ class RoomFilter(django_filters.FilterSet):
         ]
 
     def search_filter(self, queryset, name, value):
-        return queryset.filter(
-            Q(number__icontains=value)
-            | Q(nickname__icontains=value)
-            | Q(description__icontains=value)
-            | Q(note__icontains=value)
-        )
+        # Matches the fields of SEARCH_INDEXES["room"] (core/models/search_document.py).
+        return SearchDocument.objects.search(queryset, "room", value)
 
     def boolean_choice_filter(self, queryset, name, value):
         return queryset.filter(**{name: value == "true"}) if value else queryset
@@ -123,6 +123,33 @@ EMAIL_BACKEND = env.str("EMAIL_BACKEND", default="django.core.mail.backends.cons
 EMAIL_HOST = env.str("EMAIL_HOST", default="")
 EMAIL_PORT = env.int("EMAIL_PORT", default=0)
 
+# Dashboard tiles and charts are cached per tenant and language. An entry is
+# rebuilt after any device or record write, from whichever process, unless it
+# is younger than DASHBOARD_CACHE_GRACE seconds; it expires after
+# DASHBOARD_CACHE_TIMEOUT seconds in any case. Entries are held per process
+# unless CACHES["default"] is shared (e.g. memcached), so each process builds
+# its own, and warm_dashboard refuses to run against a per-process cache.
+DASHBOARD_CACHE_TIMEOUT = env.int("DASHBOARD_CACHE_TIMEOUT", default=600)
+DASHBOARD_CACHE_GRACE = env.int("DASHBOARD_CACHE_GRACE", default=0)
+
+# The dashboard's global search queries its sources on up to
+# GLOBAL_SEARCH_WORKERS threads at once, started for each search; 0 queries
+# them one after another. Each thread opens a database connection of its own
+# and closes it when done, regardless of CONN_MAX_AGE, so every search in
+# progress can hold that many connections besides the request's: budget for
+# it in the database's connection limit. A source that has not answered
+# within GLOBAL_SEARCH_TIMEOUT seconds is shown as a link to its list instead.
+GLOBAL_SEARCH_WORKERS = env.int("GLOBAL_SEARCH_WORKERS", default=6)
+GLOBAL_SEARCH_TIMEOUT = env.float("GLOBAL_SEARCH_TIMEOUT", default=2.0)
+
+# How long a user's tenant resolution (CurrentTenantMiddleware) is cached.
+# Changes to groups and tenants invalidate it in every process once they are
+# committed (the generation it is keyed by is kept in the database); each
+# process re-reads that generation at most every TENANT_GENERATION_GRACE
+# seconds, so other processes pick a change up within that time.
+TENANT_CACHE_TIMEOUT = env.int("TENANT_CACHE_TIMEOUT", default=300)
+TENANT_GENERATION_GRACE = env.int("TENANT_GENERATION_GRACE", default=2)
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -388,9 +415,17 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    # 'PAGE_SIZE': 10,
+    "DEFAULT_PAGINATION_CLASS": "dlcdb.api.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
 }
 
+# The API's "changed since" feeds release a change only once it is this many
+# seconds old, so that a transaction still open when a client polls cannot
+# commit a row behind the client's cursor. On PostgreSQL the feeds also wait for
+# every older open transaction (see dlcdb/api/pagination.py); elsewhere a
+# transaction that runs longer than this can be missed by the feeds.
+API_CHANGE_FEED_SETTLE = env.int("API_CHANGE_FEED_SETTLE", default=30)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "DLCDB API",
     "DESCRIPTION": "Device Life Cycle Database API",
@@ -424,6 +459,11 @@ MORE_WHITENOISE = [
 
 DLCDB_BASE_URL = env("DLCDB_BASE_URL", default="http://127.0.0.1:8000")
 
+# Periodic notification runs send their messages in batches of at most this
+# many, each batch over a single SMTP session. 0 sends every message in its
+# own task and session.
+NOTIFICATIONS_SEND_BATCH_SIZE = env.int("NOTIFICATIONS_SEND_BATCH_SIZE", default=100)
+
 # Overdue-lender notification flags now live on the LendingConfiguration
 # singleton (admin-editable); see dlcdb/lending/models.py.
 
@@ -10,3 +10,8 @@ class TenantsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "dlcdb.tenants"
     verbose_name = _("Tenants")
+
+    def ready(self):
+        from . import signals
+
+        signals.connect()
@@ -5,6 +5,8 @@
 from django.db import models
 from django.db.models.functions import Lower
 
+from .shortcuts import forget_tenant_resolutions
+
 
 class TenantManager(models.Manager):
     def get_current(self, request=None):
@@ -59,6 +61,11 @@ class Tenant(models.Model):
     def __str__(self):
         return f"{self.name}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Users resolve to a cached copy of their tenant.
+        forget_tenant_resolutions()
+
     class Meta:
         ordering = [Lower("name")]
 
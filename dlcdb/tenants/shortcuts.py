@@ -2,39 +2,105 @@
 #
 # SPDX-License-Identifier: EUPL-1.2
 
+from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
 
+from dlcdb.core.utils.data_generation import advance_generation, read_generation
 
-def get_current_tenant(request):
+# Cached resolutions are keyed by user and this generation (a row of
+# core.DataGeneration); advancing it (see forget_tenant_resolutions)
+# invalidates all of them at once. It lives in the database, not in the
+# per-process default cache, so that a membership revoked in one process is
+# not still granted by the cached resolutions of another.
+TENANT_GENERATION_PK = 2
+
+# Each process reuses the generation it read for TENANT_GENERATION_GRACE
+# seconds, so a cached resolution costs no query.
+TENANT_GENERATION_KEY = "tenants:generation"
+
+
+def _advance_generation():
+    try:
+        advance_generation(TENANT_GENERATION_PK)
+    except DatabaseError:
+        # A schema from before core.DataGeneration, e.g. while migrations
+        # replay data migrations: there are no generations to advance yet.
+        if "core_datageneration" in connection.introspection.table_names():
+            raise
+    cache.delete(TENANT_GENERATION_KEY)
+
+
+def forget_tenant_resolutions():
     """
-    Get current ``Tenant`` object based on request.user.groups.
+    Invalidate every cached user -> tenant resolution.
+
+    Called whenever group memberships or tenants change, see
+    ``Tenant.save()`` and ``signals.py``. The generation advances once the
+    transaction commits: a resolution cached before that read the old
+    memberships and is keyed by the old generation. This process sees the new
+    generation right away, the others within ``TENANT_GENERATION_GRACE``
+    seconds.
     """
+    transaction.on_commit(_advance_generation)
+
+
+def _current_generation():
+    generation = cache.get(TENANT_GENERATION_KEY)
+    if generation is None:
+        generation = read_generation(TENANT_GENERATION_PK)
+        cache.set(TENANT_GENERATION_KEY, generation, settings.TENANT_GENERATION_GRACE)
+    return generation
+
+
+def _resolve_tenant(user):
+    """``(tenants, groups)``: the tenants matching ``user``'s groups, and the groups."""
 
     from .models import Tenant
 
-    tenant = request_user_groups = None
+    groups = list(user.groups.all())
+    # Multiple tenant matches are possible, so we could not use .get()
+    tenants = list(Tenant.objects.filter(groups__in=groups).distinct())
+    return tenants, groups
+
+
+def get_current_tenant(request):
+    """
+    Get current ``Tenant`` object based on request.user.groups.
+
+    The resolution is cached per user (``TENANT_CACHE_TIMEOUT`` seconds at
+    most), so most requests resolve their tenant without a query.
+    """
+
+    tenant = None
 
     if request.user.is_authenticated and not request.user.is_superuser:
+        # The account's creation time as well as its pk: a pk can be reused, by
+        # a new account or after a rolled back transaction, the pair cannot.
+        account = f"{request.user.pk}:{request.user.date_joined.timestamp()}"
+        cache_key = f"tenants:user:{account}:{_current_generation()}"
         try:
-            request_user_groups = request.user.groups.all()
-            _tenant = (
-                Tenant.objects.filter(groups__in=request_user_groups)
-                # Multiple tenent matches ares possible, so we could not use .get()
-                # https://docs.djangoproject.com/en/3.2/ref/models/querysets/#get
-                .distinct()
-            )
-            _tenant_count = _tenant.count()
+            resolved = cache.get(cache_key)
+            if resolved is None:
+                resolved = _resolve_tenant(request.user)
+                cache.set(cache_key, resolved, settings.TENANT_CACHE_TIMEOUT)
+            tenants, request_user_groups = resolved
         except Exception as e:
-            messages.error(f"Something went wrong getting a tenant from a request! Error was: {e}")
-            pass
+            messages.add_message(
+                request,
+                messages.ERROR,
+                f"Something went wrong getting a tenant for user '{request.user}'! Error was: {e}",
+            )
+            return None
 
-        if _tenant_count >= 2:
+        if len(tenants) >= 2:
             messages.add_message(
                 request,
                 messages.ERROR,
-                f"Expected one matched tenant, but got mulitple: '{_tenant}'. Tenant-scoped querysets will not return any objects!",
+                f"Expected one matched tenant, but got mulitple: '{tenants}'. Tenant-scoped querysets will not return any objects!",
             )
-        elif _tenant_count == 0:
+        elif len(tenants) == 0:
             # Check if this message already exists to avoid duplicates
             error_msg = f"Could not find a tenant for user '{request.user}' with groups '{request_user_groups}'. Tenant-scoped querysets will not return any objects!"
             existing_messages = [str(msg) for msg in messages.get_messages(request)]
@@ -44,13 +110,7 @@ def get_current_tenant(request):
                     messages.ERROR,
                     error_msg,
                 )
-        elif _tenant_count == 1:
-            tenant = _tenant.get()
         else:
-            messages.add_message(
-                request,
-                messages.ERROR,
-                f"Something went wrong getting a tenant for user '{request.user}' with groups '{request_user_groups}'. Tenant-scoped querysets will not return any objects!",
-            )
+            tenant = tenants[0]
 
     return tenant
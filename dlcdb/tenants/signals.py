@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Invalidation of the cached user -> tenant resolutions (see shortcuts.py).
+
+Signals rather than save() hooks: group memberships change through m2m
+managers (the admin, and the LDAP backend mirroring groups on every login),
+and groups are django.contrib.auth's model, so there is no save() of ours
+that every change passes through. Deletions are caught with post_delete, as
+bulk deletes (the admin's delete action) do not call delete(); other tenant
+changes are handled in ``Tenant.save()``.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import Tenant
+from .shortcuts import forget_tenant_resolutions
+
+
+def _membership_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        forget_tenant_resolutions()
+
+
+def _deleted(sender, **kwargs):
+    # Deleting a group or tenant drops its memberships without an m2m_changed signal.
+    forget_tenant_resolutions()
+
+
+def _user_saved(sender, created, raw, **kwargs):
+    # A new account may reuse the primary key of a deleted one. Fixture loads
+    # (raw) run before anything is resolved.
+    if created and not raw:
+        forget_tenant_resolutions()
+
+
+def connect():
+    User = get_user_model()
+    m2m_changed.connect(_membership_changed, sender=User.groups.through, dispatch_uid="tenants_user_groups")
+    m2m_changed.connect(_membership_changed, sender=Tenant.groups.through, dispatch_uid="tenants_tenant_groups")
+    post_delete.connect(_deleted, sender=Group, dispatch_uid="tenants_group_deleted")
+    post_delete.connect(_deleted, sender=Tenant, dispatch_uid="tenants_tenant_deleted")
+    post_save.connect(_user_saved, sender=User, dispatch_uid="tenants_user_created")
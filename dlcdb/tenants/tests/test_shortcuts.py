@@ -0,0 +1,106 @@
+# SPDX-FileCopyrightText: 2026 Thomas Breitner
+#
+# SPDX-License-Identifier: EUPL-1.2
+
+"""
+Tenant resolution in ``CurrentTenantMiddleware``: cached per user, and
+forgotten as soon as group memberships or tenants change.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.db.models import F
+from django.test import RequestFactory
+
+from dlcdb.core.models import DataGeneration
+from dlcdb.tenants.models import Tenant
+from dlcdb.tenants.shortcuts import TENANT_GENERATION_PK, get_current_tenant
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def group(tenant):
+    group = Group.objects.create(name="Pytest group")
+    tenant.groups.add(group)
+    return group
+
+
+def _resolve(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    request._messages = CookieStorage(request)
+    return get_current_tenant(request)
+
+
+def test_resolution_is_cached(user, tenant, group, django_assert_num_queries):
+    user.groups.add(group)
+    assert _resolve(user) == tenant
+
+    with django_assert_num_queries(0):
+        assert _resolve(user) == tenant
+
+
+def test_membership_changes_are_picked_up(user, tenant, group, django_capture_on_commit_callbacks):
+    # The generation advances when the change commits.
+    with django_capture_on_commit_callbacks(execute=True):
+        other_group = Group.objects.create(name="Other group")
+        other = Tenant.objects.create(name="Other tenant")
+        other.groups.add(other_group)
+        user.groups.add(group)
+    assert _resolve(user) == tenant
+
+    with django_capture_on_commit_callbacks(execute=True):
+        user.groups.set([other_group])
+    assert _resolve(user) == other
+
+    with django_capture_on_commit_callbacks(execute=True):
+        other.groups.remove(other_group)
+        tenant.groups.add(other_group)
+    assert _resolve(user) == tenant
+
+
+def test_tenant_changes_are_picked_up(user, tenant, group, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        user.groups.add(group)
+    assert _resolve(user).contact_email == ""
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tenant.contact_email = "it@example.org"
+        tenant.save()
+    assert _resolve(user).contact_email == "it@example.org"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        group.delete()
+    assert _resolve(user) is None
+
+
+def test_a_change_from_another_process_is_picked_up(user, tenant, group, django_capture_on_commit_callbacks, settings):
+    # Re-read the generation on every request instead of within the grace period.
+    settings.TENANT_GENERATION_GRACE = 0
+    with django_capture_on_commit_callbacks(execute=True):
+        user.groups.add(group)
+    assert _resolve(user) == tenant
+
+    # Committed by another process, which advances the generation in the
+    # database and leaves this process's cache alone.
+    with django_capture_on_commit_callbacks(execute=False):
+        user.groups.remove(group)
+    DataGeneration.objects.filter(pk=TENANT_GENERATION_PK).update(value=F("value") + 1)
+
+    assert _resolve(user) is None
+
+
+def test_a_reused_primary_key_does_not_inherit_a_resolution(user, tenant, group):
+    user.groups.add(group)
+    assert _resolve(user) == tenant
+
+    # The generation has not advanced (the changes were never committed), as
+    # after a rolled back transaction.
+    pk = user.pk
+    user.delete()
+    newcomer = get_user_model().objects.create(pk=pk, username="newcomer")
+
+    assert _resolve(newcomer) is None